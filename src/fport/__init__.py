@@ -8,9 +8,10 @@ from here instead of directly accessing submodules.
 Exports:
     - SessionPolicy, create_session_policy : Manage Ports and Sessions
     - Port                                : Interface for sending data
-    - SessionState                        : Read-only session state
+    - SessionState, EndReason             : Read-only session state
     - SendFunction, ListenFunction        : Protocols for callbacks
     - DeniedError, OccupiedError          : Exceptions for connection control
+    - OverheadBudget, DeliveryMode        : Listener overhead governor settings
     - __version__                         : Package version
 
 Design note:
@@ -27,9 +28,10 @@ See also:
 
 from .policy import SessionPolicy, create_session_policy
 from .port import Port
-from .session import SessionState
+from .session import SessionState, EndReason
 from .protocols import SendFunction, ListenFunction
 from .exceptions import DeniedError, OccupiedError
+from .governor import OverheadBudget, DeliveryMode
 
 from .observer import ProcessObserver
 
@@ -38,9 +40,10 @@ __version__ = '1.0.3'
 __all__ = (
     'SessionPolicy', 'create_session_policy',
     'Port',
-    'SessionState',
+    'SessionState', 'EndReason',
     'SendFunction', 'ListenFunction',
     'DeniedError', 'OccupiedError',
+    'OverheadBudget', 'DeliveryMode',
     '__version__')
 
 def example():
@@ -0,0 +1,36 @@
+"""
+Fork safety helpers for fport.
+
+A lock held by another thread at the time of os.fork() stays locked
+forever in the child process. Objects owning such locks register a
+reinitializer here, which is called in the child right after a fork.
+
+Owners are held weakly. The reinitializer receives the owner and must
+not keep a reference to it by itself.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+
+_reinitializers: WeakKeyDictionary[Any, Callable[[Any], None]] = WeakKeyDictionary()
+
+
+def register(owner: object, reinit: Callable[[Any], None]) -> None:
+    """Call `reinit(owner)` in the child process after each fork."""
+    _reinitializers[owner] = reinit
+
+
+def _after_fork_in_child() -> None:
+    for owner, reinit in list(_reinitializers.items()):
+        try:
+            reinit(owner)
+        except Exception:
+            pass
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child = _after_fork_in_child)
@@ -0,0 +1,31 @@
+"""
+Wake-up helper for multiprocessing.connection listeners.
+
+A thread blocked in Listener.accept() is woken by connecting to the
+listener. Connecting with multiprocessing.connection.Client would wait
+for the authentication challenge, which never comes if the accepting
+thread has already stopped; a plain socket connection does not wait.
+The accepting side sees a failed handshake and checks its closing flag.
+"""
+
+from __future__ import annotations
+
+import socket
+from multiprocessing.connection import address_type
+from typing import Any
+
+
+def wake_listener(address: Any, family: str | None = None, timeout: float = 1.0) -> None:
+    """Connect to and disconnect from a listener at `address`. Never raises."""
+    try:
+        family = family or address_type(address)
+        sock = socket.socket(getattr(socket, family))
+    except Exception:
+        return
+    try:
+        sock.settimeout(timeout)
+        sock.connect(address)
+    except Exception:
+        pass
+    finally:
+        sock.close()
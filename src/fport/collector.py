@@ -0,0 +1,212 @@
+"""
+Out-of-process collector for fport.
+
+The collector receives batches streamed by
+`fport.listeners.SocketStreamer` and feeds each message into a
+ListenFunction, so that listener work runs outside the instrumented
+process.
+
+Library usage:
+
+    observer = ProcessObserver(conditions)
+    with Collector("/tmp/fport.sock", observer.listen) as collector:
+        collector.serve(until = done_event)
+
+Command line usage:
+
+    python -m fport.collector --unix /tmp/fport.sock --listener mypkg.checks:observer
+    python -m fport.collector --tcp 127.0.0.1:7711 --listener mypkg.checks:listen
+
+The ``--listener`` target is imported as ``module:attribute``. If it has
+a ``listen`` attribute (such as a ProcessObserver), that is used;
+otherwise the target itself must be callable. Without ``--listener``,
+messages are printed. The authkey is read from the environment
+variable FPORT_COLLECTOR_AUTHKEY; it is required with ``--tcp``.
+
+Design note:
+    Messages of all connected senders are delivered to the listener one
+    at a time; per sender, the order of sending is kept.
+
+    Received batches are unpickled, so a sender can run code in the
+    collector. TCP listeners therefore require an authkey; Unix domain
+    sockets rely on file permissions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import threading
+from multiprocessing.connection import Connection, Listener, address_type, wait
+from time import monotonic
+from typing import Any
+
+from ._wakeup import wake_listener
+from .protocols import ListenFunction
+
+
+AUTHKEY_ENV = 'FPORT_COLLECTOR_AUTHKEY'
+
+
+class Collector:
+    """Receives streamed messages and delivers them to a listener.
+
+    Raises:
+        ValueError: If the address is a TCP address and `authkey` is None.
+    """
+
+    def __init__(
+            self,
+            address: Any,
+            listener: ListenFunction,
+            *,
+            family: str | None = None,
+            authkey: bytes | None = None):
+        if authkey is None and (family or address_type(address)) == 'AF_INET':
+            raise ValueError("a TCP collector requires an authkey")
+        self._listener = listener
+        self._family = family
+        self._server = Listener(address, family, authkey = authkey)
+        self._deliver_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._readers: list[threading.Thread] = []
+        self._closing = threading.Event()
+        self._received = 0
+        self._errors = 0
+
+    @property
+    def address(self) -> Any:
+        return self._server.address
+
+    @property
+    def received(self) -> int:
+        return self._received
+
+    @property
+    def errors(self) -> int:
+        """Number of messages on which the listener raised."""
+        return self._errors
+
+    def serve(self, until: threading.Event | None = None) -> None:
+        """Accept senders until `until` is set or close() is called."""
+        acceptor = threading.Thread(target = self._accept_loop, name = 'fport-collector-accept', daemon = True)
+        acceptor.start()
+        while not self._closing.is_set():
+            if until is not None and until.wait(0.05):
+                break
+            if until is None:
+                self._closing.wait(0.05)
+        self.close()
+        acceptor.join(1.0)
+
+    def _accept_loop(self) -> None:
+        while not self._closing.is_set():
+            try:
+                conn = self._server.accept()
+            except Exception:
+                continue
+            reader = threading.Thread(
+                target = self._read_loop, args = (conn,), name = 'fport-collector-read', daemon = True)
+            with self._lock:
+                self._readers.append(reader)
+            reader.start()
+
+    def _read_loop(self, conn: Connection) -> None:
+        listener = self._listener
+        try:
+            while True:
+                if not wait([conn], 0.05):
+                    if self._closing.is_set():
+                        return
+                    continue
+                try:
+                    batch = conn.recv()
+                except EOFError:
+                    return
+                with self._deliver_lock:
+                    for tag, args, kwargs in batch:
+                        try:
+                            listener(tag, *args, **kwargs)
+                        except Exception:
+                            self._errors += 1
+                    self._received += len(batch)
+        except Exception:
+            return
+        finally:
+            conn.close()
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Stop accepting senders and wait for connected ones to finish."""
+        if self._closing.is_set():
+            return
+        with self._lock:
+            readers = list(self._readers)
+        # Drain senders that are still connected before stopping the readers.
+        deadline = monotonic() + timeout
+        for reader in readers:
+            reader.join(max(0.0, deadline - monotonic()))
+        self._closing.set()
+        # Wake up the accept loop, which then sees the closing flag.
+        wake_listener(self._server.address, self._family)
+        try:
+            self._server.close()
+        except Exception:
+            pass
+
+    def __enter__(self) -> Collector:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close(timeout = 0)
+        return False
+
+
+def _load_listener(spec: str) -> ListenFunction:
+    module_name, _, attr = spec.partition(':')
+    if not attr:
+        raise ValueError(f"listener must be 'module:attribute' but receives '{spec}'")
+    target = importlib.import_module(module_name)
+    for name in attr.split('.'):
+        target = getattr(target, name)
+    listen = getattr(target, 'listen', target)
+    if not callable(listen):
+        raise TypeError(f"'{spec}' is not callable")
+    return listen
+
+
+def _print_listener(tag: str, *args, **kwargs) -> None:
+    print(f"Received: {tag}, args={args}, kwargs={kwargs}", flush = True)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog = 'python -m fport.collector', description = __doc__.splitlines()[1])
+    where = parser.add_mutually_exclusive_group(required = True)
+    where.add_argument('--unix', metavar = 'PATH', help = 'Unix domain socket path')
+    where.add_argument('--tcp', metavar = 'HOST:PORT', help = 'TCP address, usually on localhost')
+    parser.add_argument('--listener', metavar = 'MODULE:ATTR', help = 'ListenFunction or object with listen()')
+    options = parser.parse_args(argv)
+
+    if options.unix:
+        address, family = options.unix, 'AF_UNIX'
+    else:
+        host, _, port = options.tcp.rpartition(':')
+        address, family = (host or '127.0.0.1', int(port)), 'AF_INET'
+    authkey = os.environ.get(AUTHKEY_ENV)
+    if family == 'AF_INET' and not authkey:
+        parser.error(f"--tcp requires an authkey in the environment variable {AUTHKEY_ENV}")
+    listener = _load_listener(options.listener) if options.listener else _print_listener
+
+    collector = Collector(address, listener, family = family,
+                          authkey = authkey.encode() if authkey else None)
+    print(f"fport collector listening on {collector.address}", flush = True)
+    try:
+        collector.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.close(timeout = 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Listener overhead governor for fport.
+
+Listeners run inline on the sender's thread, so an expensive listener
+on a hot Port takes CPU time from the implementation side. When a
+SessionPolicy is created with an OverheadBudget, each session measures
+the time spent in the message validator and the listener against the
+wall time of fixed windows. When a window exceeds the budget the
+session degrades its delivery mode, and it recovers when the estimated
+cost of the better mode fits into the budget again.
+
+Delivery modes:
+    FULL      every message is delivered.
+    SAMPLED   one in `sample_every` messages is delivered.
+    DETACHED  no message is delivered; the session stays registered.
+
+Every transition is recorded and can be read through
+``SessionState.governor``.
+
+Design note:
+    The bookkeeping follows the rules of Port.send(): it is done without
+    locks, and windows are evaluated lazily by the sending thread, so a
+    Port that stops sending keeps its current mode until the next send.
+"""
+
+from __future__ import annotations
+
+import enum
+from collections import deque
+from dataclasses import dataclass
+from time import perf_counter_ns
+
+
+class DeliveryMode(enum.Enum):
+    FULL = 'deliver every message'
+    SAMPLED = 'deliver sampled messages'
+    DETACHED = 'deliver no message'
+
+
+@dataclass(frozen = True, slots = True)
+class OverheadBudget:
+    """Configuration of the overhead governor.
+
+    Attributes:
+        budget: Allowed fraction of wall time spent in the listener (0 < budget <= 1).
+        window: Length of a measurement window in seconds.
+        mode: Mode to degrade to first. SAMPLED degrades further to DETACHED
+            if the sampled cost still exceeds the budget.
+        sample_every: One in this many messages is delivered while SAMPLED.
+        recover_after: Consecutive windows within budget required before
+            stepping back to a better mode.
+        max_transitions: Number of most recent transitions kept.
+    """
+    budget: float
+    window: float = 1.0
+    mode: DeliveryMode = DeliveryMode.SAMPLED
+    sample_every: int = 10
+    recover_after: int = 3
+    max_transitions: int = 256
+
+    def __post_init__(self):
+        if not 0 < self.budget <= 1:
+            raise ValueError("budget must be in (0, 1]")
+        if self.window <= 0:
+            raise ValueError("window must be positive")
+        if self.mode is DeliveryMode.FULL:
+            raise ValueError("mode must be SAMPLED or DETACHED")
+        if self.sample_every < 1 or self.recover_after < 1 or self.max_transitions < 1:
+            raise ValueError("sample_every, recover_after and max_transitions must be positive")
+
+
+@dataclass(frozen = True, slots = True)
+class GovernorTransition:
+    """A change of delivery mode.
+
+    Attributes:
+        at_ns: perf_counter_ns() when the change happened.
+        before: Mode before the change.
+        after: Mode after the change.
+        ratio: Measured listener time / wall time of the window that caused it.
+    """
+    at_ns: int
+    before: DeliveryMode
+    after: DeliveryMode
+    ratio: float
+
+
+class OverheadGovernor:
+    """Per-session governor state. Read through SessionState.governor."""
+
+    __slots__ = ('_config', '_window_ns', '_window_start', '_spent', '_mode',
+                 '_skip', '_calm', '_transitions')
+    def __init__(self, config: OverheadBudget):
+        self._config = config
+        self._window_ns = int(config.window * 1_000_000_000)
+        self._window_start = perf_counter_ns()
+        self._spent = 0
+        self._mode = DeliveryMode.FULL
+        self._skip = 0
+        self._calm = 0
+        self._transitions: deque[GovernorTransition] = deque(maxlen = config.max_transitions)
+
+    def _admit(self) -> bool:
+        """Whether the current message should be delivered."""
+        now = perf_counter_ns()
+        if now - self._window_start >= self._window_ns:
+            self._roll(now)
+        mode = self._mode
+        if mode is DeliveryMode.FULL:
+            return True
+        if mode is DeliveryMode.DETACHED:
+            return False
+        self._skip += 1
+        if self._skip >= self._config.sample_every:
+            self._skip = 0
+            return True
+        return False
+
+    def _charge(self, elapsed_ns: int) -> None:
+        self._spent += elapsed_ns
+
+    def _roll(self, now: int) -> None:
+        config = self._config
+        ratio = self._spent / (now - self._window_start)
+        self._window_start = now
+        self._spent = 0
+        mode = self._mode
+        if ratio > config.budget:
+            self._calm = 0
+            if mode is DeliveryMode.FULL:
+                self._switch(now, config.mode, ratio)
+            elif mode is DeliveryMode.SAMPLED:
+                self._switch(now, DeliveryMode.DETACHED, ratio)
+            return
+        if mode is DeliveryMode.FULL:
+            return
+        # Estimated cost in the next better mode.
+        if mode is DeliveryMode.SAMPLED:
+            better = DeliveryMode.FULL
+            estimate = ratio * config.sample_every
+        else:
+            better = DeliveryMode.SAMPLED if config.mode is DeliveryMode.SAMPLED else DeliveryMode.FULL
+            estimate = 0.0
+        if estimate > config.budget:
+            self._calm = 0
+            return
+        self._calm += 1
+        if self._calm >= config.recover_after:
+            self._switch(now, better, ratio)
+
+    def _switch(self, now: int, mode: DeliveryMode, ratio: float) -> None:
+        self._transitions.append(GovernorTransition(now, self._mode, mode, ratio))
+        self._mode = mode
+        self._skip = 0
+        self._calm = 0
+
+    @property
+    def config(self) -> OverheadBudget:
+        return self._config
+
+    @property
+    def mode(self) -> DeliveryMode:
+        """Current delivery mode."""
+        return self._mode
+
+    @property
+    def transitions(self) -> tuple[GovernorTransition, ...]:
+        """Most recent mode transitions, oldest first."""
+        return tuple(self._transitions)
@@ -0,0 +1,22 @@
+
+from .span import SpanAggregator, SpanStat
+from .histogram import Histogram, HistogramListener
+from .trace import ChromeTraceWriter
+from .stream import SocketStreamer
+from .recorder import FlightRecorder, Record, RecordWriter, read_records
+from .pipeline import Pipeline, CompiledPipeline
+from .coalesce import Coalescer, Debouncer
+from .metrics import WindowedMetrics, MetricsServer, MetricsFileWriter
+from .columnar import ColumnarCapture
+
+__all__ = (
+    'SpanAggregator', 'SpanStat',
+    'Histogram', 'HistogramListener',
+    'ChromeTraceWriter',
+    'SocketStreamer',
+    'FlightRecorder', 'Record', 'RecordWriter', 'read_records',
+    'Pipeline', 'CompiledPipeline',
+    'Coalescer', 'Debouncer',
+    'WindowedMetrics', 'MetricsServer', 'MetricsFileWriter',
+    'ColumnarCapture',
+)
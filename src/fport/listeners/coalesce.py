@@ -0,0 +1,182 @@
+
+from __future__ import annotations
+
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable
+
+from ..protocols import ListenFunction
+
+
+_NOTHING = object()
+
+
+def _same(a: Any, b: Any) -> bool:
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+def _emit(downstream: ListenFunction, count_key: str | None,
+          tag: str, args: tuple, kwargs: dict, count: int) -> None:
+    if count_key is not None:
+        kwargs = {**kwargs, count_key: count}
+    downstream(tag, *args, **kwargs)
+
+
+class Coalescer:
+    """Listener that merges runs of identical consecutive messages.
+
+    A run of messages with equal tag, args and kwargs is passed on once to
+    `downstream` (a ListenFunction or an object with `listen`, such as a
+    ProcessObserver). If `count_key` is given, the run length is added
+    as that keyword argument; by default messages are passed on
+    unchanged, so that existing conditions keep working. A run is passed on when a different message
+    arrives, when it reaches `max_run` messages, or on flush().
+
+    Note:
+        The last run stays held until it ends; call flush() when the
+        session is over.
+    """
+
+    __slots__ = ('_lock', '_downstream', '_count_key', '_max_run',
+                 '_tag', '_args', '_kwargs', '_count', '_received', '_emitted')
+
+    def __init__(
+            self,
+            downstream: ListenFunction | Any,
+            *,
+            count_key: str | None = None,
+            max_run: int | None = None):
+        if max_run is not None and max_run < 1:
+            raise ValueError("max_run must be positive")
+        self._lock = Lock()
+        self._downstream: ListenFunction = getattr(downstream, 'listen', downstream)
+        self._count_key = count_key
+        self._max_run = max_run
+        self._tag: Any = _NOTHING
+        self._args: tuple = ()
+        self._kwargs: dict = {}
+        self._count = 0
+        self._received = 0
+        self._emitted = 0
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        with self._lock:
+            self._received += 1
+            if (self._tag is not _NOTHING and tag == self._tag
+                    and _same(args, self._args) and _same(kwargs, self._kwargs)):
+                self._count += 1
+                if self._max_run is not None and self._count >= self._max_run:
+                    self._flush()
+                return
+            self._flush()
+            self._tag, self._args, self._kwargs, self._count = tag, args, kwargs, 1
+
+    def _flush(self) -> None:
+        if self._tag is _NOTHING:
+            return
+        tag, args, kwargs, count = self._tag, self._args, self._kwargs, self._count
+        self._tag, self._args, self._kwargs, self._count = _NOTHING, (), {}, 0
+        self._emitted += 1
+        _emit(self._downstream, self._count_key, tag, args, kwargs, count)
+
+    def flush(self) -> None:
+        """Pass on the run being held."""
+        with self._lock:
+            self._flush()
+
+    @property
+    def received(self) -> int:
+        return self._received
+
+    @property
+    def emitted(self) -> int:
+        """Number of messages passed on to downstream."""
+        return self._emitted
+
+
+class Debouncer:
+    """Listener that passes on at most one message per tag and time window.
+
+    The first message of a tag opens a window of `interval` seconds.
+    Messages of the tag arriving within the window replace the held one;
+    when the window is over, the last message is passed on to
+    `downstream`, with the number of merged messages in the keyword
+    `count_key` if given.
+
+    Windows are closed on the next message of the same tag, on poll(),
+    or on flush(); no timer thread is used. Only `tags` are debounced
+    (all tags if None); other tags are passed on at once.
+    """
+
+    __slots__ = ('_lock', '_downstream', '_interval', '_tags', '_count_key', '_clock',
+                 '_pending', '_received', '_emitted')
+
+    def __init__(
+            self,
+            downstream: ListenFunction | Any,
+            interval: float,
+            *,
+            tags: tuple[str, ...] | list[str] | None = None,
+            count_key: str | None = None,
+            clock: Callable[[], float] = monotonic):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self._lock = Lock()
+        self._downstream: ListenFunction = getattr(downstream, 'listen', downstream)
+        self._interval = interval
+        self._tags = frozenset(tags) if tags is not None else None
+        self._count_key = count_key
+        self._clock = clock
+        # tag -> [window start, args, kwargs, count]
+        self._pending: dict[str, list[Any]] = {}
+        self._received = 0
+        self._emitted = 0
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        with self._lock:
+            self._received += 1
+            if self._tags is not None and tag not in self._tags:
+                self._emitted += 1
+                self._downstream(tag, *args, **kwargs)
+                return
+            now = self._clock()
+            held = self._pending.get(tag)
+            if held is not None:
+                if now - held[0] < self._interval:
+                    held[1], held[2] = args, kwargs
+                    held[3] += 1
+                    return
+                self._emit(tag)
+            self._pending[tag] = [now, args, kwargs, 1]
+
+    def _emit(self, tag: str) -> None:
+        _, args, kwargs, count = self._pending.pop(tag)
+        self._emitted += 1
+        _emit(self._downstream, self._count_key, tag, args, kwargs, count)
+
+    def poll(self) -> None:
+        """Pass on the messages whose window is over."""
+        with self._lock:
+            now = self._clock()
+            for tag in [t for t, held in self._pending.items() if now - held[0] >= self._interval]:
+                self._emit(tag)
+
+    def flush(self) -> None:
+        """Pass on every held message."""
+        with self._lock:
+            for tag in list(self._pending):
+                self._emit(tag)
+
+    @property
+    def received(self) -> int:
+        return self._received
+
+    @property
+    def emitted(self) -> int:
+        """Number of messages passed on to downstream."""
+        return self._emitted
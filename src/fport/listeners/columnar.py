@@ -0,0 +1,274 @@
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import math
+import os
+import re
+from array import array
+from threading import Lock
+from typing import Any, Iterable
+
+
+_MISSING = object()
+
+
+class _Column:
+    '''Growable column: a typed array for bool/int/float values, a list otherwise.'''
+
+    __slots__ = ('kind', 'data')
+
+    def __init__(self, kind: str = ''):
+        self.kind = kind
+        self.data: Any = self._empty(kind)
+
+    @staticmethod
+    def _empty(kind: str) -> Any:
+        if kind == 'int':
+            return array('q')
+        if kind == 'float':
+            return array('d')
+        if kind == 'bool':
+            return array('b')
+        return []
+
+    def clear(self) -> None:
+        self.data = self._empty(self.kind)
+
+    def _convert(self, kind: str) -> None:
+        old = self.data
+        self.kind = kind
+        if kind == 'float':
+            self.data = array('d', (float(v) for v in old))
+        else:
+            values = [bool(v) for v in old] if isinstance(old, array) and old.typecode == 'b' else list(old)
+            self.data = values
+
+    def append(self, value: Any) -> None:
+        kind = self.kind
+        if kind == 'float':
+            if type(value) is float or type(value) is int:
+                self.data.append(value)
+                return
+            if value is _MISSING:
+                self.data.append(math.nan)
+                return
+        elif kind == 'int':
+            if type(value) is int:
+                try:
+                    self.data.append(value)
+                    return
+                except OverflowError:
+                    pass
+            elif type(value) is float or value is _MISSING:
+                self._convert('float')
+                self.data.append(math.nan if value is _MISSING else value)
+                return
+        elif kind == 'bool':
+            if type(value) is bool:
+                self.data.append(value)
+                return
+        elif kind == '':
+            if type(value) is bool:
+                self.kind, self.data = 'bool', array('b', [value])
+                return
+            if type(value) is int and -2**63 <= value < 2**63:
+                self.kind, self.data = 'int', array('q', [value])
+                return
+            if type(value) is float:
+                self.kind, self.data = 'float', array('d', [value])
+                return
+            self.kind = 'object'
+        if self.kind != 'object':
+            self._convert('object')
+        self.data.append(None if value is _MISSING else value)
+
+    def values(self) -> list[Any]:
+        if self.kind == 'bool':
+            return [bool(v) for v in self.data]
+        return list(self.data)
+
+    def to_numpy(self, np: Any) -> Any:
+        if self.kind == 'bool':
+            return np.frombuffer(self.data, dtype = np.int8).astype(bool)
+        if self.kind in ('int', 'float'):
+            return np.array(self.data, dtype = self.data.typecode)
+        result = np.empty(len(self.data), dtype = object)
+        result[:] = self.data
+        return result
+
+
+class _Table:
+    __slots__ = ('fields', 'names', 'columns', 'rows', 'chunks', 'base', 'column_names')
+
+    def __init__(self, fields: tuple[int | str, ...]):
+        self.fields = fields
+        self.names = tuple(str(f) for f in fields)
+        self.columns = tuple(_Column() for _ in fields)
+        self.rows = 0
+        self.chunks = 0
+        self.base: str | None = None
+        self.column_names: tuple[str, ...] = ()
+
+
+def _file_name(name: str, taken: set[str]) -> str:
+    '''File name part for `name`, unique within `taken` (which it is added to).'''
+    safe = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+    if safe != name or not safe.strip('.'):
+        safe = f"{safe}-{hashlib.sha1(name.encode('utf-8', 'surrogatepass')).hexdigest()[:8]}"
+    unique = safe
+    n = 1
+    while unique in taken:
+        unique = f'{safe}-{n}'
+        n += 1
+    taken.add(unique)
+    return unique
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("NumPy conversion requires numpy") from e
+    return numpy
+
+
+class ColumnarCapture:
+    """Listener that stores message fields per tag in typed columns.
+
+    Each tag gets a table whose columns are the argument positions
+    (named "0", "1", ...) and keyword names of its first message, or the
+    fields given in `fields` for the tag. Columns of bool, int and float
+    values are stdlib arrays (one to eight bytes per value); an int
+    column becomes float when a float or a missing value arrives, and
+    any column becomes a list of objects for other values. Missing fields
+    are NaN in float columns and None in object columns; fields beyond
+    the table are counted in `dropped`.
+
+    With `spill_dir` and `spill_rows`, a table is written out and cleared
+    every `spill_rows` rows and on flush(): appended to ``<tag>.csv``, or
+    as ``<tag>.<column>.<chunk>.npy`` files with `spill_format` 'npy'
+    (requires NumPy). Characters other than letters, digits, ``_``, ``.``
+    and ``-`` in file names are replaced and a short hash of the original
+    name is appended, so every tag gets its own files.
+    """
+
+    __slots__ = ('_lock', '_fields', '_tables', '_spill_dir', '_spill_rows', '_spill_format',
+                 '_spilled', '_dropped', '_file_names')
+
+    def __init__(
+            self,
+            *,
+            fields: dict[str, Iterable[int | str]] | None = None,
+            spill_dir: str | os.PathLike | None = None,
+            spill_rows: int | None = None,
+            spill_format: str = 'csv'):
+        if (spill_dir is None) != (spill_rows is None):
+            raise ValueError("spill_dir and spill_rows must be given together")
+        if spill_rows is not None and spill_rows < 1:
+            raise ValueError("spill_rows must be positive")
+        if spill_format not in ('csv', 'npy'):
+            raise ValueError(f"spill_format must be 'csv' or 'npy' but receives '{spill_format}'")
+        if spill_dir is not None and spill_format == 'npy':
+            _numpy()
+        self._lock = Lock()
+        self._fields = {tag: tuple(f) for tag, f in (fields or {}).items()}
+        self._tables: dict[str, _Table] = {}
+        self._spill_dir = os.fspath(spill_dir) if spill_dir is not None else None
+        self._spill_rows = spill_rows
+        self._spill_format = spill_format
+        self._spilled: list[str] = []
+        self._dropped = 0
+        self._file_names: set[str] = set()
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        with self._lock:
+            table = self._tables.get(tag)
+            if table is None:
+                fields = self._fields.get(tag)
+                if fields is None:
+                    fields = tuple(range(len(args))) + tuple(kwargs)
+                table = self._tables[tag] = _Table(fields)
+            used = 0
+            for column, field in zip(table.columns, table.fields):
+                if isinstance(field, int):
+                    if field < len(args):
+                        column.append(args[field])
+                        used += 1
+                    else:
+                        column.append(_MISSING)
+                elif field in kwargs:
+                    column.append(kwargs[field])
+                    used += 1
+                else:
+                    column.append(_MISSING)
+            self._dropped += len(args) + len(kwargs) - used
+            table.rows += 1
+            if self._spill_rows is not None and table.rows >= self._spill_rows:
+                self._spill(tag, table)
+
+    @property
+    def tags(self) -> tuple[str, ...]:
+        return tuple(self._tables)
+
+    @property
+    def dropped(self) -> int:
+        """Number of fields not stored because they are not columns of the tag's table."""
+        return self._dropped
+
+    @property
+    def spilled(self) -> tuple[str, ...]:
+        """Files written by spilling."""
+        return tuple(self._spilled)
+
+    def rows(self, tag: str) -> int:
+        """Number of rows of `tag` held in memory."""
+        return self._tables[tag].rows
+
+    def columns(self, tag: str) -> dict[str, list[Any]]:
+        """Copy of the rows of `tag` held in memory, as lists by column name."""
+        with self._lock:
+            table = self._tables[tag]
+            return {name: column.values() for name, column in zip(table.names, table.columns)}
+
+    def to_numpy(self, tag: str) -> dict[str, Any]:
+        """Copy of the rows of `tag` held in memory, as NumPy arrays by column name."""
+        np = _numpy()
+        with self._lock:
+            table = self._tables[tag]
+            return {name: column.to_numpy(np) for name, column in zip(table.names, table.columns)}
+
+    def flush(self) -> None:
+        """Spill the rows held in memory. Does nothing without `spill_dir`."""
+        if self._spill_dir is None:
+            return
+        with self._lock:
+            for tag, table in self._tables.items():
+                if table.rows:
+                    self._spill(tag, table)
+
+    def _spill(self, tag: str, table: _Table) -> None:
+        first = table.base is None
+        if first:
+            table.base = os.path.join(self._spill_dir, _file_name(tag, self._file_names))
+            names: set[str] = set()
+            table.column_names = tuple(_file_name(name, names) for name in table.names)
+        if self._spill_format == 'csv':
+            path = f'{table.base}.csv'
+            if first:
+                with open(path, 'w', newline = '', encoding = 'utf-8') as f:
+                    csv.writer(f).writerow(table.names)
+                self._spilled.append(path)
+            with open(path, 'a', newline = '', encoding = 'utf-8') as f:
+                csv.writer(f).writerows(zip(*(column.values() for column in table.columns)))
+        else:
+            np = _numpy()
+            for name, column in zip(table.column_names, table.columns):
+                path = f'{table.base}.{name}.{table.chunks:05d}.npy'
+                np.save(path, column.to_numpy(np), allow_pickle = column.kind == 'object')
+                self._spilled.append(path)
+        table.chunks += 1
+        for column in table.columns:
+            column.clear()
+        table.rows = 0
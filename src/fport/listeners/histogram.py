@@ -0,0 +1,247 @@
+
+from __future__ import annotations
+
+import math
+from array import array
+from threading import Lock
+
+from ..protocols import ListenFunction
+from ..span import is_span_message
+from .span import _SpanMatcher
+
+
+class Histogram:
+    """Log-linear bucketed histogram of non-negative integers.
+
+    Values below ``2 ** sub_bucket_bits`` are counted exactly. Larger
+    values share a bucket with values of the same magnitude, so that
+    the relative error of a reported value is at most
+    ``2 / 2 ** sub_bucket_bits``. Values that do not fit into
+    ``max_bits`` bits are counted in the last bucket.
+
+    Memory is fixed at construction time.
+    """
+
+    __slots__ = ('_bits', '_max_bits', '_counts', '_total', '_sum', '_min', '_max')
+
+    def __init__(self, sub_bucket_bits: int = 7, max_bits: int = 64):
+        if not 1 <= sub_bucket_bits < max_bits:
+            raise ValueError("sub_bucket_bits must be in [1, max_bits)")
+        self._bits = sub_bucket_bits
+        self._max_bits = max_bits
+        sub = 1 << sub_bucket_bits
+        self._counts = array('Q', bytes(8 * (sub + (max_bits - sub_bucket_bits) * (sub >> 1))))
+        self._total = 0
+        self._sum = 0
+        self._min = -1
+        self._max = -1
+
+    def _index(self, value: int) -> int:
+        bits = self._bits
+        sub = 1 << bits
+        if value < sub:
+            return value
+        length = value.bit_length()
+        if length > self._max_bits:
+            return len(self._counts) - 1
+        exp = length - bits
+        half = sub >> 1
+        return sub + (exp - 1) * half + ((value >> exp) - half)
+
+    def _highest_equivalent(self, index: int) -> int:
+        bits = self._bits
+        sub = 1 << bits
+        if index < sub:
+            return index
+        half = sub >> 1
+        exp, mantissa = divmod(index - sub, half)
+        exp += 1
+        return ((mantissa + half + 1) << exp) - 1
+
+    def record(self, value: int, count: int = 1) -> None:
+        """Count `value` `count` times. Negative values raise ValueError."""
+        value = int(value)
+        if value < 0:
+            raise ValueError("value must be non-negative")
+        self._counts[self._index(value)] += count
+        self._total += count
+        self._sum += value * count
+        if self._min < 0 or value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """Return the highest value equivalent to the given percentile (0-100)."""
+        if self._total == 0:
+            return 0
+        target = max(1, -(-self._total * percentile // 100))
+        seen = 0
+        for index, n in enumerate(self._counts):
+            if not n:
+                continue
+            seen += n
+            if seen >= target:
+                return min(self._highest_equivalent(index), self._max)
+        return self._max
+
+    def percentiles(self, *percentiles: float) -> dict[float, int]:
+        return {p: self.value_at_percentile(p) for p in (percentiles or (50, 90, 99, 99.9))}
+
+    def merge(self, other: Histogram) -> None:
+        """Add all counts of `other`, which must have the same layout."""
+        if (self._bits, self._max_bits) != (other._bits, other._max_bits):
+            raise ValueError("histogram layouts differ")
+        counts = self._counts
+        for index, n in enumerate(other._counts):
+            if n:
+                counts[index] += n
+        self._total += other._total
+        self._sum += other._sum
+        if other._min >= 0 and (self._min < 0 or other._min < self._min):
+            self._min = other._min
+        if other._max > self._max:
+            self._max = other._max
+
+    def copy(self) -> Histogram:
+        other = Histogram(self._bits, self._max_bits)
+        other.merge(self)
+        return other
+
+    def reset(self) -> None:
+        counts = self._counts
+        for index in range(len(counts)):
+            counts[index] = 0
+        self._total = 0
+        self._sum = 0
+        self._min = -1
+        self._max = -1
+
+    def __getstate__(self):
+        return (self._bits, self._max_bits, self._counts.tobytes(),
+                self._total, self._sum, self._min, self._max)
+
+    def __setstate__(self, st) -> None:
+        self._bits, self._max_bits, raw, self._total, self._sum, self._min, self._max = st
+        self._counts = array('Q')
+        self._counts.frombytes(raw)
+
+    @property
+    def count(self) -> int:
+        return self._total
+
+    @property
+    def min(self) -> int:
+        return self._min
+
+    @property
+    def max(self) -> int:
+        return self._max
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._total if self._total else 0.0
+
+
+class HistogramListener:
+    """Listener that records latency/value distributions per tag.
+
+    Span messages are paired and their durations in nanoseconds are
+    recorded under the span tag; at most `max_open_spans` unfinished
+    spans are kept, dropping the oldest beyond that.
+
+    For other messages, the positional argument at `value_at` is
+    multiplied by `scale` if given (e.g. ``scale = 1e9`` for seconds to
+    nanoseconds) and recorded, rounded, if it is a finite non-negative
+    number. Without `scale`, floats must be whole numbers. Anything else
+    is counted in `rejected`, or passed to `listener` if given.
+    """
+
+    __slots__ = ('_lock', '_matcher', '_histograms', '_bits', '_max_bits',
+                 '_value_at', '_scale', '_listener', '_rejected')
+
+    def __init__(
+            self,
+            *,
+            value_at: int = 0,
+            sub_bucket_bits: int = 7,
+            max_bits: int = 64,
+            scale: float | None = None,
+            max_open_spans: int = 4096,
+            listener: ListenFunction | None = None):
+        Histogram(sub_bucket_bits, max_bits)  # validates the layout
+        if scale is not None and not (math.isfinite(scale) and scale > 0):
+            raise ValueError("scale must be a positive finite number")
+        self._lock = Lock()
+        self._matcher = _SpanMatcher(max_open_spans)
+        self._histograms: dict[str, Histogram] = {}
+        self._bits = sub_bucket_bits
+        self._max_bits = max_bits
+        self._value_at = value_at
+        self._scale = scale
+        self._listener = listener
+        self._rejected = 0
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        if is_span_message(args):
+            with self._lock:
+                value = self._matcher.match(args)
+                if value is not None:
+                    self._get(tag).record(value)
+            return
+        try:
+            value = args[self._value_at]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise TypeError
+            if self._scale is not None:
+                value = value * self._scale
+            if isinstance(value, float):
+                if not math.isfinite(value) or (self._scale is None and not value.is_integer()):
+                    raise ValueError
+                value = round(value)
+            if value < 0:
+                raise ValueError
+        except (IndexError, ValueError, TypeError, OverflowError):
+            if self._listener is not None:
+                self._listener(tag, *args, **kwargs)
+            else:
+                self._rejected += 1
+            return
+        with self._lock:
+            self._get(tag).record(value)
+
+    def _get(self, tag: str) -> Histogram:
+        histogram = self._histograms.get(tag)
+        if histogram is None:
+            histogram = self._histograms[tag] = Histogram(self._bits, self._max_bits)
+        return histogram
+
+    def snapshot(self) -> dict[str, Histogram]:
+        """Return copies of all histograms. The listener keeps recording."""
+        with self._lock:
+            return {tag: h.copy() for tag, h in self._histograms.items()}
+
+    def get_histogram(self, tag: str) -> Histogram:
+        with self._lock:
+            return self._histograms[tag].copy()
+
+    def merge(self, other: HistogramListener | dict[str, Histogram]) -> None:
+        """Merge histograms from another listener or from a snapshot."""
+        source = other.snapshot() if isinstance(other, HistogramListener) else other
+        with self._lock:
+            for tag, histogram in source.items():
+                self._get(tag).merge(histogram)
+
+    def reset(self) -> dict[str, Histogram]:
+        """Clear all histograms and return what they held."""
+        with self._lock:
+            histograms = self._histograms
+            self._histograms = {}
+            self._matcher.clear()
+            self._rejected = 0
+        return histograms
+
+    @property
+    def rejected(self) -> int:
+        """Number of messages that carried no recordable value."""
+        return self._rejected
@@ -0,0 +1,274 @@
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _TagWindow:
+    __slots__ = ('total', 'value_total', 'index', 'count', 'sum', 'min', 'max',
+                 'last_count', 'last_sum', 'last_min', 'last_max')
+
+    def __init__(self, index: int):
+        self.total = 0
+        self.value_total = 0.0
+        self.index = index
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last_count = 0
+        self.last_sum = 0.0
+        self.last_min = math.inf
+        self.last_max = -math.inf
+
+    def roll(self, index: int) -> None:
+        if index == self.index:
+            return
+        if index == self.index + 1:
+            self.last_count, self.last_sum = self.count, self.sum
+            self.last_min, self.last_max = self.min, self.max
+        else:
+            self.last_count, self.last_sum = 0, 0.0
+            self.last_min, self.last_max = math.inf, -math.inf
+        self.index = index
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+
+class WindowedMetrics:
+    """Listener that keeps per-tag metrics over tumbling time windows.
+
+    For each tag, the number of messages and the sum, minimum and maximum
+    of the numeric argument at `value_at` are kept for the current window
+    and the last completed one, together with running totals. Each
+    message costs a constant amount of work and memory does not grow
+    with traffic. At most `max_tags` tags are tracked; messages of
+    further tags are only counted in `dropped`.
+
+    The last completed window is exposed in the Prometheus text format
+    by render(), serve() (an HTTP endpoint) or write_to() (a file
+    rewritten periodically):
+
+        fport_messages_total{tag="..."}        counter
+        fport_value_sum_total{tag="..."}       counter
+        fport_window_messages{tag="..."}       gauge
+        fport_window_rate{tag="..."}           gauge, messages per second
+        fport_window_value_sum/min/max/mean{tag="..."}   gauge
+    """
+
+    __slots__ = ('_lock', '_window', '_value_at', '_clock', '_prefix', '_max_tags',
+                 '_tags', '_dropped')
+
+    def __init__(
+            self,
+            window: float = 10.0,
+            *,
+            value_at: int = 0,
+            prefix: str = 'fport',
+            max_tags: int = 1000,
+            clock: Callable[[], float] = monotonic):
+        if window <= 0 or max_tags < 1:
+            raise ValueError("window and max_tags must be positive")
+        self._lock = Lock()
+        self._window = window
+        self._value_at = value_at
+        self._clock = clock
+        self._prefix = _metric_name(prefix)
+        self._max_tags = max_tags
+        self._tags: dict[str, _TagWindow] = {}
+        self._dropped = 0
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        index = int(self._clock() // self._window)
+        value = args[self._value_at] if len(args) > self._value_at else None
+        numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+        with self._lock:
+            entry = self._tags.get(tag)
+            if entry is None:
+                if len(self._tags) >= self._max_tags:
+                    self._dropped += 1
+                    return
+                entry = self._tags[tag] = _TagWindow(index)
+            entry.roll(index)
+            entry.total += 1
+            entry.count += 1
+            if numeric:
+                entry.value_total += value
+                entry.sum += value
+                if value < entry.min:
+                    entry.min = value
+                if value > entry.max:
+                    entry.max = value
+
+    @property
+    def dropped(self) -> int:
+        """Number of messages of tags beyond `max_tags`."""
+        return self._dropped
+
+    def render(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        index = int(self._clock() // self._window)
+        with self._lock:
+            for entry in self._tags.values():
+                entry.roll(index)
+            rows = [(tag, e.total, e.value_total, e.last_count, e.last_sum, e.last_min, e.last_max)
+                    for tag, e in self._tags.items()]
+            dropped = self._dropped
+
+        p = self._prefix
+        families: list[tuple[str, str, str, Callable[[tuple], float | None]]] = [
+            (f'{p}_messages_total', 'counter', 'Messages received per tag.', lambda r: r[1]),
+            (f'{p}_value_sum_total', 'counter', 'Sum of numeric values per tag.', lambda r: r[2]),
+            (f'{p}_window_messages', 'gauge', 'Messages in the last window.', lambda r: r[3]),
+            (f'{p}_window_rate', 'gauge', 'Messages per second in the last window.',
+             lambda r: r[3] / self._window),
+            (f'{p}_window_value_sum', 'gauge', 'Sum of values in the last window.', lambda r: r[4]),
+            (f'{p}_window_value_min', 'gauge', 'Minimum value in the last window.',
+             lambda r: r[5] if r[5] != math.inf else None),
+            (f'{p}_window_value_max', 'gauge', 'Maximum value in the last window.',
+             lambda r: r[6] if r[6] != -math.inf else None),
+            (f'{p}_window_value_mean', 'gauge', 'Mean value in the last window.',
+             lambda r: r[4] / r[3] if r[3] and r[5] != math.inf else None),
+        ]
+        lines = []
+        for name, kind, help_text, get in families:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for row in rows:
+                value = get(row)
+                if value is not None:
+                    lines.append(f'{name}{{tag="{_escape(row[0])}"}} {_format(value)}')
+        lines.append(f'# HELP {p}_dropped_messages_total Messages of untracked tags.')
+        lines.append(f'# TYPE {p}_dropped_messages_total counter')
+        lines.append(f'{p}_dropped_messages_total {dropped}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, address: tuple[str, int] = ('127.0.0.1', 0)) -> MetricsServer:
+        """Serve render() over HTTP from a background thread."""
+        return MetricsServer(self, address)
+
+    def write_to(self, path: str | os.PathLike, interval: float = 10.0) -> MetricsFileWriter:
+        """Rewrite `path` with render() every `interval` seconds from a background thread."""
+        return MetricsFileWriter(self, path, interval)
+
+
+def _metric_name(name: str) -> str:
+    cleaned = ''.join(c if c.isalnum() or c in '_:' else '_' for c in name)
+    return cleaned if cleaned and not cleaned[0].isdigit() else f'_{cleaned}'
+
+
+def _escape(label: str) -> str:
+    return str(label).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class MetricsServer:
+    """HTTP endpoint exposing WindowedMetrics.render() on every path."""
+
+    def __init__(self, metrics: WindowedMetrics, address: tuple[str, int]):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(address, Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target = self._server.serve_forever, name = 'fport-metrics-http', daemon = True)
+        self._thread.start()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> MetricsServer:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+class MetricsFileWriter:
+    """Rewrites a file with WindowedMetrics.render() periodically.
+
+    The file is replaced atomically, so a reader (such as the node
+    exporter textfile collector) never sees a partial file. close()
+    writes once more before returning.
+    """
+
+    def __init__(self, metrics: WindowedMetrics, path: str | os.PathLike, interval: float):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self._metrics = metrics
+        self._path = os.fspath(path)
+        self._interval = interval
+        self._stop = threading.Event()
+        self._error: Exception | None = None
+        self._thread = threading.Thread(target = self._run, name = 'fport-metrics-file', daemon = True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            stopping = self._stop.wait(self._interval)
+            self.write()
+            if stopping:
+                return
+
+    def write(self) -> None:
+        """Rewrite the file now."""
+        tmp = f'{self._path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp, 'w', encoding = 'utf-8') as f:
+                f.write(self._metrics.render())
+            os.replace(tmp, self._path)
+        except Exception as e:
+            self._error = e
+
+    @property
+    def error(self) -> Exception | None:
+        """The last error raised while writing, if any."""
+        return self._error
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self) -> MetricsFileWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
@@ -0,0 +1,158 @@
+
+from __future__ import annotations
+
+import itertools
+from typing import Any, Callable
+
+from ..protocols import ListenFunction
+
+
+Message = tuple[str, tuple, dict]
+
+
+class Pipeline:
+    """Builder of listener pipelines fused into a single function.
+
+    Stages receive a message as ``(tag, args, kwargs)``:
+
+        filter_tags(*tags)   pass only messages with one of the tags
+        filter(pred)         pass messages for which pred(tag, args, kwargs) is true
+        map(fn)              replace the message by fn(tag, args, kwargs)
+        sink(listener)       call listener(tag, *args, **kwargs)
+        batch(size, sink)    call sink(list_of_messages) every `size` messages
+        tee(*pipelines)      pass the message to each branch in turn
+
+    A pipeline ends with sink, batch or tee. build() generates one
+    function with every stage inlined, so a message costs one call plus
+    a call per user callable, not a call per stage.
+
+        compiled = (Pipeline()
+                    .filter_tags("value")
+                    .map(lambda tag, args, kwargs: (tag, (args[0] * 2,), kwargs))
+                    .tee(Pipeline().sink(observer), Pipeline().batch(100, save)))
+        with policy.session(compiled.listen, port):
+            ...
+        compiled.flush()
+
+    Exceptions raised by stages are not caught; the port reports them as
+    a listener failure.
+    """
+
+    __slots__ = ('_stages', '_closed')
+
+    def __init__(self):
+        self._stages: list[tuple[Any, ...]] = []
+        self._closed = False
+
+    def _add(self, stage: tuple[Any, ...], terminal: bool = False) -> Pipeline:
+        if self._closed:
+            raise ValueError("pipeline already ends with a sink, batch or tee")
+        self._stages.append(stage)
+        self._closed = terminal
+        return self
+
+    def filter_tags(self, *tags: str) -> Pipeline:
+        return self._add(('filter_tags', frozenset(tags)))
+
+    def filter(self, pred: Callable[[str, tuple, dict], bool]) -> Pipeline:
+        return self._add(('filter', pred))
+
+    def map(self, fn: Callable[[str, tuple, dict], Message]) -> Pipeline:
+        return self._add(('map', fn))
+
+    def sink(self, listener: ListenFunction | Any) -> Pipeline:
+        """End with a ListenFunction or an object with `listen`."""
+        return self._add(('sink', getattr(listener, 'listen', listener)), terminal = True)
+
+    def batch(self, size: int, sink: Callable[[list[Message]], None]) -> Pipeline:
+        if size < 1:
+            raise ValueError("size must be positive")
+        return self._add(('batch', size, sink), terminal = True)
+
+    def tee(self, *branches: Pipeline) -> Pipeline:
+        if not branches:
+            raise ValueError("tee requires at least one branch")
+        for branch in branches:
+            if not branch._closed:
+                raise ValueError("each branch must end with a sink, batch or tee")
+        return self._add(('tee', tuple(branches)), terminal = True)
+
+    def build(self) -> CompiledPipeline:
+        if not self._closed:
+            raise ValueError("pipeline must end with a sink, batch or tee")
+        return CompiledPipeline(self)
+
+
+class CompiledPipeline:
+    """A built Pipeline. `listen` is the generated ListenFunction."""
+
+    __slots__ = ('listen', 'source', '_flushers')
+
+    def __init__(self, pipeline: Pipeline):
+        names: dict[str, Any] = {}
+        flushers: list[Callable[[], None]] = []
+        lines = ['def listen(tag, *args, **kwargs):']
+        counter = itertools.count()
+        _emit(pipeline, lines, 1, ('tag', 'args', 'kwargs'), names, flushers, counter)
+        self.source = '\n'.join(lines) + '\n'
+        exec(compile(self.source, '<fport-pipeline>', 'exec'), names)
+        self.listen: ListenFunction = names['listen']
+        self._flushers = tuple(flushers)
+
+    def flush(self) -> None:
+        """Hand messages waiting in batch stages to their sinks."""
+        for flush in self._flushers:
+            flush()
+
+
+def _emit(
+        pipeline: Pipeline,
+        lines: list[str],
+        depth: int,
+        message: tuple[str, str, str],
+        names: dict[str, Any],
+        flushers: list[Callable[[], None]],
+        counter: itertools.count) -> None:
+    tag, args, kwargs = message
+    for stage in pipeline._stages:
+        n = next(counter)
+        pad = '    ' * depth
+        kind = stage[0]
+        if kind == 'filter_tags':
+            names[f'_tags{n}'] = stage[1]
+            lines.append(f'{pad}if {tag} in _tags{n}:')
+            depth += 1
+        elif kind == 'filter':
+            names[f'_pred{n}'] = stage[1]
+            lines.append(f'{pad}if _pred{n}({tag}, {args}, {kwargs}):')
+            depth += 1
+        elif kind == 'map':
+            names[f'_map{n}'] = stage[1]
+            tag, args, kwargs = f'tag{n}', f'args{n}', f'kwargs{n}'
+            lines.append(f'{pad}{tag}, {args}, {kwargs} = _map{n}({message[0]}, {message[1]}, {message[2]})')
+            message = (tag, args, kwargs)
+        elif kind == 'sink':
+            names[f'_sink{n}'] = stage[1]
+            lines.append(f'{pad}_sink{n}({tag}, *{args}, **{kwargs})')
+        elif kind == 'batch':
+            _, size, sink = stage
+            buffer: list[Message] = []
+            names[f'_buf{n}'] = buffer
+            names[f'_flush{n}'] = flush = _batch_flusher(buffer, sink)
+            flushers.append(flush)
+            lines.append(f'{pad}_buf{n}.append(({tag}, {args}, {kwargs}))')
+            lines.append(f'{pad}if len(_buf{n}) >= {size}:')
+            lines.append(f'{pad}    _flush{n}()')
+        elif kind == 'tee':
+            for branch in stage[1]:
+                _emit(branch, lines, depth, message, names, flushers, counter)
+
+
+def _batch_flusher(buffer: list[Message], sink: Callable[[list[Message]], None]) -> Callable[[], None]:
+    def flush() -> None:
+        if not buffer:
+            return
+        items = buffer[:]
+        del buffer[:len(items)]
+        sink(items)
+    return flush
@@ -0,0 +1,279 @@
+
+from __future__ import annotations
+
+import itertools
+import os
+import pickle
+import struct
+from threading import Lock
+from time import perf_counter_ns
+from typing import IO, Callable, Iterator, NamedTuple
+
+from ..protocols import ListenFunction
+
+
+MAGIC = b'FPORTREC\x01'
+
+_LENGTH = struct.Struct('>I')
+
+
+class Record(NamedTuple):
+    '''A recorded message. `seq` orders records of one recorder.'''
+    seq: int
+    t_ns: int
+    tag: str
+    args: tuple
+    kwargs: dict
+
+
+class RecordWriter:
+    """Writer of the binary recorder format.
+
+    The format is the magic bytes ``FPORTREC\\x01`` followed by frames of
+    a 4-byte big-endian length and a pickled Record. Arguments that
+    cannot be pickled are stored as their repr() strings.
+
+    A RecordWriter is also a listener that records every message it
+    receives.
+    """
+
+    __slots__ = ('_lock', '_file', '_owns_file', '_seq', '_closed')
+
+    def __init__(self, file: str | os.PathLike | IO[bytes]):
+        if isinstance(file, (str, os.PathLike)):
+            self._file = open(file, 'wb')
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        self._lock = Lock()
+        self._seq = itertools.count()
+        self._closed = False
+        self._file.write(MAGIC)
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        self.write(Record(next(self._seq), perf_counter_ns(), tag, args, kwargs))
+
+    def write(self, record: Record) -> None:
+        data = _dumps(record)
+        with self._lock:
+            if self._closed:
+                return
+            self._file.write(_LENGTH.pack(len(data)))
+            self._file.write(data)
+
+    def write_all(self, records: list[Record]) -> None:
+        for record in records:
+            self.write(record)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._owns_file:
+                self._file.close()
+            else:
+                self._file.flush()
+
+    def __enter__(self) -> RecordWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+def _dumps(record: Record) -> bytes:
+    try:
+        return pickle.dumps(tuple(record))
+    except Exception:
+        args = tuple(_safe_repr(a) for a in record.args)
+        kwargs = {k: _safe_repr(v) for k, v in record.kwargs.items()}
+        return pickle.dumps((record.seq, record.t_ns, str(record.tag), args, kwargs))
+
+
+def _safe_repr(value: object) -> str:
+    try:
+        return repr(value)
+    except Exception:
+        return f'<{type(value).__name__}>'
+
+
+def read_records(file: str | os.PathLike | IO[bytes]) -> Iterator[Record]:
+    """Iterate over the records of a file in the binary recorder format.
+
+    A truncated last frame is ignored. Only read files from trusted
+    sources: records are unpickled.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as f:
+            yield from read_records(f)
+        return
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a fport recording")
+    while True:
+        header = file.read(_LENGTH.size)
+        if len(header) < _LENGTH.size:
+            return
+        (length,) = _LENGTH.unpack(header)
+        data = file.read(length)
+        if len(data) < length:
+            return
+        yield Record(*pickle.loads(data))
+
+
+class FlightRecorder:
+    """Listener that keeps recent messages and dumps them when triggered.
+
+    The last `capacity` messages are kept in a preallocated ring (one ring
+    per tag if `per_tag` is True; rings of new tags are allocated on their
+    first message). When a trigger fires, the ring contents, the
+    triggering message and the next `post_trigger` messages are written
+    as one dump in the binary recorder format to `directory`.
+
+    Triggers:
+        trigger_tags: Tags that fire on arrival.
+        trigger: Predicate ``(tag, args, kwargs) -> bool``.
+        observer: A ProcessObserver. Messages are passed on to it and
+            the recorder fires whenever its `violation_count` changes:
+            on the first violation of a condition or sequence rule, or
+            the first wrong tag.
+
+    After `max_dumps` dumps the recorder keeps forwarding to the
+    observer but stops recording.
+
+    Note:
+        Arguments are kept by reference until they are dumped.
+    """
+
+    __slots__ = ('_lock', '_capacity', '_per_tag', '_ring', '_rings', '_index', '_indexes',
+                 '_seq', '_trigger_tags', '_trigger', '_observer', '_observer_listen',
+                 '_post_trigger', '_pending', '_remaining', '_directory', '_on_dump',
+                 '_max_dumps', '_dumps')
+
+    def __init__(
+            self,
+            directory: str | os.PathLike,
+            *,
+            capacity: int = 4096,
+            per_tag: bool = False,
+            trigger_tags: tuple[str, ...] | list[str] = (),
+            trigger: Callable[[str, tuple, dict], bool] | None = None,
+            observer: object | None = None,
+            post_trigger: int = 0,
+            max_dumps: int = 1,
+            on_dump: Callable[[str], None] | None = None):
+        if capacity < 1 or post_trigger < 0 or max_dumps < 1:
+            raise ValueError("capacity and max_dumps must be positive and post_trigger non-negative")
+        self._lock = Lock()
+        self._capacity = capacity
+        self._per_tag = per_tag
+        self._ring: list[Record | None] = [None] * capacity
+        self._rings: dict[str, list[Record | None]] = {}
+        self._index = 0
+        self._indexes: dict[str, int] = {}
+        self._seq = 0
+        self._trigger_tags = frozenset(trigger_tags)
+        self._trigger = trigger
+        self._observer = observer
+        self._observer_listen: ListenFunction | None = getattr(observer, 'listen', None)
+        self._post_trigger = post_trigger
+        self._pending: list[Record] | None = None
+        self._remaining = 0
+        self._directory = os.fspath(directory)
+        self._on_dump = on_dump
+        self._max_dumps = max_dumps
+        self._dumps: list[str] = []
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        fired = False
+        observer_listen = self._observer_listen
+        if observer_listen is not None:
+            observer = self._observer
+            before = observer.violation_count  # type: ignore[union-attr]
+            observer_listen(tag, *args, **kwargs)
+            fired = observer.violation_count != before  # type: ignore[union-attr]
+        if not fired:
+            fired = tag in self._trigger_tags or (
+                self._trigger is not None and self._trigger(tag, args, kwargs))
+
+        with self._lock:
+            if len(self._dumps) >= self._max_dumps:
+                return
+            record = Record(self._seq, perf_counter_ns(), tag, args, kwargs)
+            self._seq += 1
+            pending = self._pending
+            if pending is not None:
+                pending.append(record)
+                self._remaining -= 1
+                if self._remaining <= 0:
+                    self._dump()
+                return
+            if fired:
+                self._pending = self._snapshot()
+                self._pending.append(record)
+                self._remaining = self._post_trigger
+                if self._remaining <= 0:
+                    self._dump()
+                return
+            self._store(tag, record)
+
+    def _store(self, tag: str, record: Record) -> None:
+        if not self._per_tag:
+            self._ring[self._index % self._capacity] = record
+            self._index += 1
+            return
+        ring = self._rings.get(tag)
+        if ring is None:
+            ring = self._rings[tag] = [None] * self._capacity
+        index = self._indexes.get(tag, 0)
+        ring[index % self._capacity] = record
+        self._indexes[tag] = index + 1
+
+    def _snapshot(self) -> list[Record]:
+        rings = self._rings.values() if self._per_tag else (self._ring,)
+        records = [r for ring in rings for r in ring if r is not None]
+        records.sort(key = lambda r: r.seq)
+        for ring in rings:
+            for i in range(len(ring)):
+                ring[i] = None
+        self._index = 0
+        self._indexes.clear()
+        return records
+
+    def _dump(self) -> None:
+        records = self._pending or []
+        self._pending = None
+        path = os.path.join(self._directory, f'fport-flight-{os.getpid()}-{len(self._dumps)}.rec')
+        with RecordWriter(path) as writer:
+            writer.write_all(records)
+        self._dumps.append(path)
+        if self._on_dump is not None:
+            self._on_dump(path)
+
+    def flush(self) -> None:
+        """Dump a triggered capture now, without waiting for all post-trigger messages."""
+        with self._lock:
+            if self._pending is not None:
+                self._dump()
+
+    def trigger_now(self) -> None:
+        """Fire the trigger manually; the next `post_trigger` messages complete the dump."""
+        with self._lock:
+            if self._pending is not None or len(self._dumps) >= self._max_dumps:
+                return
+            self._pending = self._snapshot()
+            self._remaining = self._post_trigger
+            if self._remaining <= 0:
+                self._dump()
+
+    @property
+    def dumps(self) -> tuple[str, ...]:
+        """Paths of the dumps written so far."""
+        return tuple(self._dumps)
+
+    @property
+    def triggered(self) -> bool:
+        """Whether a dump is waiting for post-trigger messages."""
+        return self._pending is not None
@@ -0,0 +1,135 @@
+
+from __future__ import annotations
+
+from threading import Lock
+
+from ..protocols import ListenFunction
+from ..span import SpanPhase, is_span_message
+
+
+class _SpanMatcher:
+    """Pairs span begin/end events and yields durations. Not thread-safe.
+
+    At most `max_open` spans are kept open; beyond that the oldest is
+    dropped, since its END may never arrive (sampling, a detached
+    session, a lost message).
+    """
+
+    __slots__ = ('_open', '_max_open', '_dropped')
+    def __init__(self, max_open: int = 4096):
+        if max_open < 1:
+            raise ValueError("max_open_spans must be positive")
+        self._open: dict[int, int] = {}
+        self._max_open = max_open
+        self._dropped = 0
+
+    def match(self, args: tuple) -> int | None:
+        """Return the duration when args end an open span, otherwise None."""
+        phase, span_id, _parent, t_ns = args
+        if phase is SpanPhase.BEGIN:
+            open_ = self._open
+            open_[span_id] = t_ns
+            if len(open_) > self._max_open:
+                del open_[next(iter(open_))]
+                self._dropped += 1
+            return None
+        begin = self._open.pop(span_id, None)
+        if begin is None:
+            return None
+        return t_ns - begin
+
+    def clear(self) -> None:
+        self._open.clear()
+        self._dropped = 0
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+
+class SpanAggregator:
+    """Listener that pairs span begin/end messages into per-tag latency totals.
+
+    Messages that are not span events are passed to `listener` if given,
+    otherwise ignored. At most `max_open_spans` unfinished spans are
+    kept; the oldest is dropped beyond that.
+    """
+
+    __slots__ = ('_lock', '_matcher', '_stats', '_listener')
+
+    def __init__(self, listener: ListenFunction | None = None, *, max_open_spans: int = 4096):
+        self._lock = Lock()
+        self._matcher = _SpanMatcher(max_open_spans)
+        self._stats: dict[str, SpanStat] = {}
+        self._listener = listener
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        if not is_span_message(args):
+            if self._listener is not None:
+                self._listener(tag, *args, **kwargs)
+            return
+        with self._lock:
+            duration = self._matcher.match(args)
+            if duration is None:
+                return
+            stat = self._stats.get(tag)
+            if stat is None:
+                stat = self._stats[tag] = SpanStat()
+            stat._add(duration)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._matcher.clear()
+            self._stats.clear()
+
+    @property
+    def open_spans(self) -> int:
+        """Number of spans that have begun but not ended."""
+        return len(self._matcher)
+
+    @property
+    def dropped_spans(self) -> int:
+        """Number of unfinished spans dropped to stay within `max_open_spans`."""
+        return self._matcher.dropped
+
+    def get_all(self) -> dict[str, SpanStat]:
+        with self._lock:
+            return {k: v._copy() for k, v in self._stats.items()}
+
+    def get_stat(self, tag: str) -> SpanStat:
+        with self._lock:
+            return self._stats[tag]._copy()
+
+
+class SpanStat:
+    '''Latency totals of completed spans for a tag, in nanoseconds.'''
+
+    __slots__ = ('count', 'total_ns', 'min_ns', 'max_ns')
+    def __init__(self):
+        self.count: int = 0
+        self.total_ns: int = 0
+        self.min_ns: int = -1
+        self.max_ns: int = -1
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def _add(self, duration: int) -> None:
+        self.count += 1
+        self.total_ns += duration
+        if self.min_ns < 0 or duration < self.min_ns:
+            self.min_ns = duration
+        if duration > self.max_ns:
+            self.max_ns = duration
+
+    def _copy(self) -> SpanStat:
+        other = SpanStat()
+        other.count = self.count
+        other.total_ns = self.total_ns
+        other.min_ns = self.min_ns
+        other.max_ns = self.max_ns
+        return other
@@ -0,0 +1,136 @@
+
+from __future__ import annotations
+
+import pickle
+import threading
+from collections import deque
+from multiprocessing.connection import Client, Connection
+from typing import Any
+
+
+class SocketStreamer:
+    """Listener that streams messages to a collector process.
+
+    Messages are appended to a bounded queue and shipped in batches by a
+    background thread over a Unix domain socket (address is a path) or
+    localhost TCP (address is a ``(host, port)`` tuple), using the
+    length-prefixed framing of `multiprocessing.connection`. The
+    receiving side is `fport.collector`.
+
+    The calling thread only appends. When the queue holds `max_pending`
+    messages, further messages are dropped and counted in `dropped`.
+    Messages whose arguments cannot be pickled are dropped as well.
+
+    Note:
+        The connection is opened in the background thread; a failure to
+        connect or send stops the streamer and is kept in `error`.
+        The collector unpickles what it receives, so use an `authkey`
+        (shared with the collector) whenever other local users can
+        reach the address.
+    """
+
+    def __init__(
+            self,
+            address: Any,
+            *,
+            authkey: bytes | None = None,
+            family: str | None = None,
+            batch_size: int = 256,
+            flush_interval: float = 0.05,
+            max_pending: int = 100_000):
+        if batch_size < 1 or max_pending < 1:
+            raise ValueError("batch_size and max_pending must be positive")
+        self._address = address
+        self._authkey = authkey
+        self._family = family
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._pending: deque[tuple[str, tuple, dict]] = deque()
+        self._wakeup = threading.Event()
+        self._closing = False
+        self._sent = 0
+        self._dropped = 0
+        self._error: Exception | None = None
+        self._thread = threading.Thread(target = self._run, name = 'fport-streamer', daemon = True)
+        self._thread.start()
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        pending = self._pending
+        if len(pending) >= self._max_pending or self._closing:
+            self._dropped += 1
+            return
+        pending.append((tag, args, kwargs))
+        if len(pending) >= self._batch_size:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        conn: Connection | None = None
+        try:
+            conn = Client(self._address, self._family, authkey = self._authkey)
+            while True:
+                self._wakeup.wait(self._flush_interval)
+                self._wakeup.clear()
+                closing = self._closing
+                while self._pending:
+                    self._send_batch(conn)
+                if closing:
+                    return
+        except Exception as e:
+            self._error = e
+            self._closing = True
+            self._dropped += len(self._pending)
+            self._pending.clear()
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+    def _send_batch(self, conn: Connection) -> None:
+        pending = self._pending
+        batch = []
+        for _ in range(min(self._batch_size, len(pending))):
+            batch.append(pending.popleft())
+        try:
+            data = pickle.dumps(batch)
+        except Exception:
+            # Find and drop the messages that cannot be pickled.
+            kept = []
+            for message in batch:
+                try:
+                    pickle.dumps(message)
+                    kept.append(message)
+                except Exception:
+                    self._dropped += 1
+            batch = kept
+            data = pickle.dumps(batch)
+        conn.send_bytes(data)
+        self._sent += len(batch)
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Send what is queued and close the connection."""
+        self._closing = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+
+    def __enter__(self) -> SocketStreamer:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    @property
+    def sent(self) -> int:
+        """Number of messages handed to the connection."""
+        return self._sent
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @property
+    def error(self) -> Exception | None:
+        return self._error
@@ -0,0 +1,135 @@
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from threading import Lock
+from time import perf_counter_ns
+from typing import IO
+
+from ..span import SpanPhase, is_span_message
+
+
+class ChromeTraceWriter:
+    """Listener that streams messages in the Chrome Trace Event format.
+
+    The output is a JSON array that is written incrementally and can be
+    loaded by chrome://tracing or Perfetto. Span messages become
+    begin/end ("B"/"E") events, other messages become instant ("i")
+    events. Payloads are written as abbreviated reprs.
+
+    Events are buffered and written in chunks of `buffer_events`.
+    Call close() (or use the writer as a context manager) to flush the
+    buffer and terminate the array; viewers also accept an unterminated
+    array, so a capture cut short is still readable.
+    """
+
+    __slots__ = ('_lock', '_file', '_owns_file', '_buffer', '_buffer_events',
+                 '_payload_limit', '_pid', '_threads', '_first', '_closed')
+
+    def __init__(
+            self,
+            file: str | os.PathLike | IO[str],
+            *,
+            payload_limit: int = 64,
+            buffer_events: int = 256):
+        if isinstance(file, (str, os.PathLike)):
+            self._file = open(file, 'w', encoding = 'utf-8')
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        self._lock = Lock()
+        self._buffer: list[str] = []
+        self._buffer_events = max(1, buffer_events)
+        self._payload_limit = payload_limit
+        self._pid = os.getpid()
+        self._threads: set[int] = set()
+        self._first = True
+        self._closed = False
+        self._file.write('[\n')
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        tid = threading.get_ident()
+        if is_span_message(args):
+            phase, span_id, parent_id, t_ns = args
+            event = {
+                'name': tag, 'cat': 'span',
+                'ph': 'B' if phase is SpanPhase.BEGIN else 'E',
+                'ts': t_ns / 1000, 'pid': self._pid, 'tid': tid,
+                'args': {'span_id': span_id, 'parent_id': parent_id},
+            }
+        else:
+            event = {
+                'name': tag, 'cat': 'message', 'ph': 'i', 's': 't',
+                'ts': perf_counter_ns() / 1000, 'pid': self._pid, 'tid': tid,
+                'args': self._abbreviate(args, kwargs),
+            }
+        with self._lock:
+            if self._closed:
+                return
+            if tid not in self._threads:
+                self._threads.add(tid)
+                self._buffer.append(json.dumps({
+                    'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid,
+                    'args': {'name': threading.current_thread().name},
+                }))
+            self._buffer.append(json.dumps(event))
+            if len(self._buffer) >= self._buffer_events:
+                self._write_buffer()
+
+    def _abbreviate(self, args: tuple, kwargs: dict) -> dict[str, str]:
+        limit = self._payload_limit
+        result = {}
+        for i, value in enumerate(args):
+            result[str(i)] = _short_repr(value, limit)
+        for key, value in kwargs.items():
+            result[key] = _short_repr(value, limit)
+        return result
+
+    def _write_buffer(self) -> None:
+        if not self._buffer:
+            return
+        chunk = ',\n'.join(self._buffer)
+        self._file.write(chunk if self._first else ',\n' + chunk)
+        self._first = False
+        self._buffer.clear()
+
+    def flush(self) -> None:
+        """Write buffered events without terminating the array."""
+        with self._lock:
+            if self._closed:
+                return
+            self._write_buffer()
+            self._file.flush()
+
+    def close(self) -> None:
+        """Write buffered events, terminate the array and release the file."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._write_buffer()
+            self._file.write('\n]\n')
+            if self._owns_file:
+                self._file.close()
+            else:
+                self._file.flush()
+
+    def __enter__(self) -> ChromeTraceWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+def _short_repr(value: object, limit: int) -> str:
+    try:
+        text = repr(value)
+    except Exception:
+        text = f'<{type(value).__name__}>'
+    if len(text) > limit:
+        text = text[:max(0, limit - 3)] + '...'
+    return text
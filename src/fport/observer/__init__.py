@@ -1,8 +1,24 @@
 
 from .observer import ProcessObserver, ExceptionKind
+from .summary import ValueSummary
+from .sequence import SequenceRule, SequenceObservation
+from .invariant import Invariant, Monotonic, DeltaBounds, RateLimit
+from .pattern import PatternIndex
+from .memo import pure, PureCondition, MemoCache
+from .offload import OffloadedObserver
+from .batch import vectorized, VectorizedCondition, BatchObserver
+from .snapshot import ObserverSnapshot, ObservationSnapshot, merge_snapshots
 
 __all__ = (
     'ProcessObserver',
+    'ValueSummary',
+    'SequenceRule', 'SequenceObservation',
+    'Invariant', 'Monotonic', 'DeltaBounds', 'RateLimit',
+    'PatternIndex',
+    'pure', 'PureCondition', 'MemoCache',
+    'OffloadedObserver',
+    'vectorized', 'VectorizedCondition', 'BatchObserver',
+    'ObserverSnapshot', 'ObservationSnapshot', 'merge_snapshots',
     
 )
 
@@ -0,0 +1,191 @@
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Callable, Iterable
+
+from .observer import ProcessObserver
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("vectorized conditions require numpy") from e
+    return numpy
+
+
+class VectorizedCondition:
+    '''A condition evaluated on arrays of many messages at once.
+
+    `fn` receives one NumPy array per field (argument position or
+    keyword name) and returns a boolean array. Fields are stored with
+    the `array` typecode `dtype` ('d' for float64, 'q' for int64, ...).
+
+    Called with the arguments of a single message, it evaluates arrays
+    of length one, so it also works in a plain ProcessObserver.
+    '''
+
+    __slots__ = ('_fn', '_fields', '_dtype', '__wrapped__')
+
+    def __init__(self, fn: Callable[..., Any], fields: Iterable[int | str] = (0,), dtype: str = 'd'):
+        self._fn = fn
+        self._fields = tuple(fields)
+        if not self._fields:
+            raise ValueError("at least one field is required")
+        array(dtype)
+        self._dtype = dtype
+        self.__wrapped__ = fn
+
+    @property
+    def fields(self) -> tuple[int | str, ...]:
+        return self._fields
+
+    @property
+    def dtype(self) -> str:
+        return self._dtype
+
+    def evaluate(self, *columns: Any) -> Any:
+        '''Boolean array for the given columns.'''
+        np = _numpy()
+        return np.asarray(self._fn(*columns), dtype = bool)
+
+    def __call__(self, *args, **kwargs) -> bool:
+        np = _numpy()
+        columns = [np.asarray([args[f] if isinstance(f, int) else kwargs[f]], dtype = self._dtype)
+                   for f in self._fields]
+        return bool(self.evaluate(*columns)[0])
+
+
+def vectorized(fn: Callable[..., Any] | None = None, *, fields: Iterable[int | str] = (0,), dtype: str = 'd'):
+    '''Declare a vectorized condition. Usable as ``vectorized(fn)`` or ``@vectorized(fields = ...)``.'''
+    if fn is None:
+        return lambda f: VectorizedCondition(f, fields, dtype)
+    return VectorizedCondition(fn, fields, dtype)
+
+
+class _Batch:
+    __slots__ = ('key', 'condition', 'columns', 'seqs', 'size')
+
+    def __init__(self, key: str, condition: VectorizedCondition):
+        self.key = key
+        self.condition = condition
+        self.columns = tuple(array(condition.dtype) for _ in condition.fields)
+        self.seqs = array('q')
+        self.size = 0
+
+
+_UNKNOWN = object()
+
+
+class BatchObserver:
+    '''Listener that evaluates vectorized conditions of a ProcessObserver per chunk.
+
+    For tags whose condition is a VectorizedCondition, the fields of each
+    message are appended to typed arrays and the condition is evaluated
+    once per `chunk_size` messages (and on flush()). `count`,
+    `violation`, `first_violation_at` and `fail_reason` are exact; the
+    violation handler is called once per chunk containing violations.
+    `first_violation_seq` is taken when the violating message arrives.
+    Sequence rules and `recent_tags` see batched tags as they arrive, but
+    the `recent_tags` of a batched violation are copied when its chunk is
+    evaluated. Summaries and context are not kept for batched tags. Other tags are passed to the observer as they arrive.
+
+    evaluate() checks columns that are already in memory, such as those of
+    a capture, without going through listen(); their sequence number is
+    taken when evaluate() is called, and they do not advance sequence
+    rules or recent tags.
+
+    Call flush() before reading results from `observer`. NumPy is
+    required.
+    '''
+
+    __slots__ = ('_observer', '_chunk_size', '_batches', '_np')
+
+    def __init__(self, observer: ProcessObserver, *, chunk_size: int = 65536):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self._np = _numpy()
+        self._observer = observer
+        self._chunk_size = chunk_size
+        self._batches: dict[str, _Batch | None] = {}
+
+    @property
+    def observer(self) -> ProcessObserver:
+        return self._observer
+
+    def _batch_of(self, tag: str) -> _Batch | None:
+        observer = self._observer
+        key = observer._resolve(tag)
+        condition = observer._conditions.get(key) if key is not None else None
+        batch = _Batch(key, condition) if isinstance(condition, VectorizedCondition) else None
+        self._batches[tag] = batch
+        return batch
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        batch = self._batches.get(tag, _UNKNOWN)
+        if batch is _UNKNOWN:
+            batch = self._batch_of(tag)
+        if batch is None:
+            self._observer.listen(tag, *args, **kwargs)
+            return
+        try:
+            for column, field in zip(batch.columns, batch.condition.fields):
+                column.append(args[field] if isinstance(field, int) else kwargs[field])
+        except (IndexError, KeyError, TypeError, OverflowError) as e:
+            for column in batch.columns:
+                del column[batch.size:]
+            self._flush_batch(tag, batch)
+            self._observer._observe(tag, args, kwargs, (False, e))
+            return
+        batch.seqs.append(self._observer._seq_source())
+        self._observer._observe_arrival(tag)
+        batch.size += 1
+        if batch.size >= self._chunk_size:
+            self._flush_batch(tag, batch)
+
+    def _flush_batch(self, tag: str, batch: _Batch) -> None:
+        if batch.size == 0:
+            return
+        np = self._np
+        columns = [np.frombuffer(column, dtype = column.typecode) for column in batch.columns]
+        self._record(tag, batch.key, batch.condition, batch.size, columns, batch.seqs)
+        # New arrays: the old ones cannot be resized while NumPy views export their buffers.
+        batch.columns = tuple(array(batch.condition.dtype) for _ in batch.condition.fields)
+        batch.seqs = array('q')
+        batch.size = 0
+
+    def _record(
+            self, tag: str, key: str, condition: VectorizedCondition, size: int, columns: list[Any],
+            seqs: array | None) -> None:
+        try:
+            mask = condition.evaluate(*columns)
+            if mask.shape != (size,):
+                raise ValueError(f"vectorized condition returned shape {mask.shape} for {size} messages")
+        except Exception as e:
+            self._observer._observe_batch(tag, key, size, 0, e, seqs[0] if seqs else None)
+            return
+        first_failed = -1 if mask.all() else int(self._np.argmin(mask))
+        seq = seqs[first_failed] if seqs and first_failed >= 0 else None
+        self._observer._observe_batch(tag, key, size, first_failed, None, seq)
+
+    def flush(self) -> None:
+        '''Evaluate every pending chunk.'''
+        for tag, batch in self._batches.items():
+            if batch is not None:
+                self._flush_batch(tag, batch)
+
+    def evaluate(self, tag: str, *columns: Any) -> None:
+        '''Record the messages given as columns (one array per field) for `tag`.'''
+        batch = self._batches.get(tag, _UNKNOWN)
+        if batch is _UNKNOWN:
+            batch = self._batch_of(tag)
+        if batch is None:
+            raise ValueError(f"'{tag}' has no vectorized condition")
+        self._flush_batch(tag, batch)
+        np = self._np
+        arrays = [np.asarray(c) for c in columns]
+        if len(arrays) != len(batch.condition.fields) or len({len(a) for a in arrays}) > 1:
+            raise ValueError("one column of equal length per field is required")
+        if arrays and len(arrays[0]):
+            self._record(tag, batch.key, batch.condition, len(arrays[0]), arrays, None)
@@ -0,0 +1,142 @@
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from time import monotonic
+from typing import Any, Callable
+
+
+_UNSET = object()
+
+
+def _value(args: tuple, kwargs: dict, key: int | str) -> Any:
+    return args[key] if isinstance(key, int) else kwargs[key]
+
+
+class Invariant(ABC):
+    '''Base of stateful conditions relating a message to earlier ones of its tag.
+
+    An invariant is used as a condition of ProcessObserver. It keeps a
+    constant amount of state, which ProcessObserver clears on
+    reset_observations(). On a violation, `reason` describes it and is
+    used as the `fail_reason` of the Observation.
+
+    Note:
+        The state belongs to one tag; use a separate instance per tag.
+    '''
+
+    __slots__ = ('_reason',)
+
+    def __init__(self):
+        self._reason = ''
+
+    @abstractmethod
+    def __call__(self, *args, **kwargs) -> bool:
+        '''Check a message, updating the state; set `reason` when returning False.'''
+
+    def reset(self) -> None:
+        self._reason = ''
+
+    @property
+    def reason(self) -> str:
+        '''Description of the last violation.'''
+        return self._reason
+
+
+class Monotonic(Invariant):
+    '''Values at `value_at` must not decrease (or increase, if `decreasing`).'''
+
+    __slots__ = ('_value_at', '_strict', '_decreasing', '_last')
+
+    def __init__(self, value_at: int | str = 0, *, strict: bool = False, decreasing: bool = False):
+        super().__init__()
+        self._value_at = value_at
+        self._strict = strict
+        self._decreasing = decreasing
+        self._last: Any = _UNSET
+
+    def reset(self) -> None:
+        super().reset()
+        self._last = _UNSET
+
+    def __call__(self, *args, **kwargs) -> bool:
+        value = _value(args, kwargs, self._value_at)
+        last, self._last = self._last, value
+        if last is _UNSET:
+            return True
+        a, b = (value, last) if self._decreasing else (last, value)
+        ok = a < b if self._strict else a <= b
+        if not ok:
+            direction = 'decreasing' if self._decreasing else 'increasing'
+            self._reason = f"not {'strictly ' if self._strict else ''}{direction}: {last!r} -> {value!r}"
+        return ok
+
+
+class DeltaBounds(Invariant):
+    '''The change of the value at `value_at` from the previous message must be within [min, max].'''
+
+    __slots__ = ('_value_at', '_min', '_max', '_last')
+
+    def __init__(self, min: float | None = None, max: float | None = None, *, value_at: int | str = 0):
+        super().__init__()
+        if min is None and max is None:
+            raise ValueError("min or max is required")
+        if min is not None and max is not None and min > max:
+            raise ValueError("min must not be greater than max")
+        self._value_at = value_at
+        self._min = min
+        self._max = max
+        self._last: Any = _UNSET
+
+    def reset(self) -> None:
+        super().reset()
+        self._last = _UNSET
+
+    def __call__(self, *args, **kwargs) -> bool:
+        value = _value(args, kwargs, self._value_at)
+        last, self._last = self._last, value
+        if last is _UNSET:
+            return True
+        delta = value - last
+        if (self._min is not None and delta < self._min) or (self._max is not None and delta > self._max):
+            self._reason = f"delta {delta!r} out of [{self._min}, {self._max}]: {last!r} -> {value!r}"
+            return False
+        return True
+
+
+class RateLimit(Invariant):
+    '''At most `max_count` messages per `per` seconds.
+
+    Implemented as a token bucket holding up to `max_count` tokens and
+    refilled at `max_count / per` tokens per second, so a burst of
+    `max_count` is allowed after a quiet period.
+    '''
+
+    __slots__ = ('_max_count', '_per', '_clock', '_tokens', '_updated')
+
+    def __init__(self, max_count: int, per: float = 1.0, *, clock: Callable[[], float] = monotonic):
+        super().__init__()
+        if max_count < 1 or per <= 0:
+            raise ValueError("max_count and per must be positive")
+        self._max_count = max_count
+        self._per = per
+        self._clock = clock
+        self._tokens = float(max_count)
+        self._updated: float | None = None
+
+    def reset(self) -> None:
+        super().reset()
+        self._tokens = float(self._max_count)
+        self._updated = None
+
+    def __call__(self, *args, **kwargs) -> bool:
+        now = self._clock()
+        if self._updated is not None:
+            refill = (now - self._updated) * self._max_count / self._per
+            self._tokens = min(float(self._max_count), self._tokens + refill)
+        self._updated = now
+        if self._tokens < 1.0:
+            self._reason = f"more than {self._max_count} messages per {self._per}s"
+            return False
+        self._tokens -= 1.0
+        return True
@@ -0,0 +1,90 @@
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+_MISS = object()
+
+
+class PureCondition:
+    '''A condition marked as pure: its result depends only on its arguments.
+
+    ProcessObserver keeps a bounded LRU of results per tag for such
+    conditions. Calls with unhashable arguments are evaluated directly.
+    Exceptions are not memoized.
+    '''
+
+    __slots__ = ('_fn', '_maxsize', '__wrapped__')
+
+    def __init__(self, fn: Callable[..., bool], maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self._fn = fn
+        self._maxsize = maxsize
+        self.__wrapped__ = fn
+
+    def __call__(self, *args, **kwargs) -> bool:
+        return self._fn(*args, **kwargs)
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+
+def pure(fn: Callable[..., bool] | None = None, *, maxsize: int = 1024):
+    '''Mark a condition as pure. Usable as ``pure(fn)``, ``@pure`` or ``@pure(maxsize = n)``.'''
+    if fn is None:
+        return lambda f: PureCondition(f, maxsize)
+    return PureCondition(fn, maxsize)
+
+
+def _typed(value: Any) -> Any:
+    '''Key part for `value` with its type, also inside tuples and frozensets.
+
+    Types are part of the key so that 1, 1.0 and True are told apart,
+    including in ``(1,)`` and ``(True,)``.
+    '''
+    if isinstance(value, tuple):
+        return (type(value), tuple(map(_typed, value)))
+    if isinstance(value, frozenset):
+        return (type(value), frozenset(map(_typed, value)))
+    return (type(value), value)
+
+
+class MemoCache:
+    '''Bounded LRU of condition results of one tag.'''
+
+    __slots__ = ('_results', '_maxsize', 'hits', 'misses', 'uncached')
+
+    def __init__(self, maxsize: int):
+        self._results: OrderedDict[Any, Any] = OrderedDict()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def call(self, condition: PureCondition, args: tuple, kwargs: dict) -> Any:
+        key: Any = tuple(map(_typed, args))
+        if kwargs:
+            key = (key, tuple((name, _typed(value)) for name, value in kwargs.items()))
+        results = self._results
+        try:
+            result = results.get(key, _MISS)
+        except TypeError:
+            self.uncached += 1
+            return condition(*args, **kwargs)
+        if result is not _MISS:
+            self.hits += 1
+            results.move_to_end(key)
+            return result
+        self.misses += 1
+        result = condition(*args, **kwargs)
+        results[key] = result
+        if len(results) > self._maxsize:
+            results.popitem(last = False)
+        return result
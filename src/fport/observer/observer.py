@@ -2,23 +2,65 @@
 from __future__ import annotations
 
 import enum
-from typing import Callable
+import os
+import re
+import time
+from collections import deque
+from typing import Callable, Iterable
+
+from .summary import ValueSummary
+from .sequence import SequenceObservation, SequenceRule
+from .invariant import Invariant
+from .pattern import PatternIndex, pattern_key
+from .memo import MemoCache, PureCondition
+from .snapshot import ObservationSnapshot, ObserverSnapshot
 
 
 class ProcessObserver:
     __slots__ = ('_conditions', '_global_violation', '_global_fail_reason', '_global_exception',
-                 '_local_violation', '_observations', '_violation_handlers', '_exception_handler')
+                 '_local_violation', '_observations', '_violation_handlers', '_exception_handler',
+                 '_summarize', '_context', '_recent', '_sequences', '_sequence_observations',
+                 '_sequence_index', '_patterns', '_seq_source', '_violation_count')
+
+    def __init__(
+            self,
+            conditions: dict[str, Callable[..., bool]],
+            *,
+            summarize: dict[str, int | str | Iterable[int | str]] | None = None,
+            context: int | dict[str, int] = 0,
+            recent_tags: int = 0,
+            sequences: dict[str, str | SequenceRule] | None = None,
+            patterns: dict[str | re.Pattern, Callable[..., bool]] | None = None,
+            seq_source: Callable[[], int] = time.monotonic_ns):
+        self._conditions = dict(conditions)
+        self._seq_source = seq_source
+        self._patterns: PatternIndex | None = None
+        if patterns:
+            for pattern, condition in patterns.items():
+                key = pattern_key(pattern)
+                if key in self._conditions:
+                    raise ValueError(f"Condition '{key}' is defined twice")
+                self._conditions[key] = condition
+            self._patterns = PatternIndex(patterns)
+        conditions = self._conditions
 
-    def __init__(self, conditions: dict[str, Callable[..., bool]]):
-        self._conditions = conditions
+        self._summarize = _summary_keys(conditions, summarize)
+        self._context = _context_sizes(conditions, context)
+        if recent_tags < 0:
+            raise ValueError("recent_tags must not be negative")
+        self._recent: deque[str] | None = deque(maxlen = recent_tags) if recent_tags else None
+        self._sequences = {name: rule if isinstance(rule, SequenceRule) else SequenceRule(rule)
+                           for name, rule in (sequences or {}).items()}
+        self._reset_sequences()
 
         self._global_violation = False
         self._global_fail_reason = ''
         self._global_exception = None
 
         self._local_violation = False
+        self._violation_count = 0
 
-        self._observations = {tag: Observation() for tag in conditions.keys()}
+        self._observations = {tag: self._new_observation(tag) for tag in conditions.keys()}
 
         self._violation_handlers = {}
 
@@ -31,33 +73,133 @@ class ProcessObserver:
         self._global_exception = None
 
         self._local_violation = False
+        self._violation_count = 0
+
+        self._observations = {tag: self._new_observation(tag) for tag in self._conditions.keys()}
+        for condition in self._conditions.values():
+            if isinstance(condition, Invariant):
+                condition.reset()
+        if self._recent is not None:
+            self._recent.clear()
+        self._reset_sequences()
+
+    def _reset_sequences(self) -> None:
+        self._sequence_observations = {name: SequenceObservation(rule) for name, rule in self._sequences.items()}
+        index: dict[str, list[SequenceObservation]] = {}
+        for seq in self._sequence_observations.values():
+            for tag in seq.rule.alphabet:
+                index.setdefault(tag, []).append(seq)
+        self._sequence_index = {tag: tuple(seqs) for tag, seqs in index.items()}
+
+    def _advance_sequences(self, tag: str, watching: tuple[SequenceObservation, ...]) -> None:
+        for seq in watching:
+            if not seq.violation:
+                state = seq.rule.step(seq.state, tag)
+                if state < 0:
+                    seq.violation = True
+                    seq.first_violation_at = seq.count
+                    seq.first_violation_seq = self._seq_source()
+                    self._violation_count += 1
+                    expected = ', '.join(f"'{t}'" for t in seq.rule.expected(seq.state)) or 'nothing'
+                    seq.fail_reason = f"unexpected '{tag}' at {seq.count}th message, expected {expected}"
+                    self._local_violation = True
+                else:
+                    seq.state = state
+            seq.count += 1
+
+    def _new_observation(self, tag: str) -> Observation:
+        observation = Observation()
+        for key in self._summarize.get(tag, ()):
+            observation.summaries[key] = ValueSummary()
+        size = self._context.get(tag, 0)
+        if size:
+            observation._ring = deque(maxlen = size)
+        condition = self._conditions[tag]
+        if isinstance(condition, PureCondition):
+            observation.memo = MemoCache(condition.maxsize)
+        return observation
 
-        self._observations = {tag: Observation() for tag in self._conditions.keys()}
+    def _on_first_violation(self, observation: Observation, seq: int | None = None) -> None:
+        observation.first_violation_seq = self._seq_source() if seq is None else seq
+        self._violation_count += 1
+        if observation._ring is not None:
+            observation.context = tuple(observation._ring)
+        if self._recent is not None:
+            observation.recent_tags = tuple(self._recent)
 
     
     def listen(self, tag: str, *args, **kwargs) -> None:
+        self._observe(tag, args, kwargs, None)
+
+    def _resolve(self, tag: str) -> str | None:
+        if tag in self._observations:
+            return tag
+        return self._patterns.resolve(tag) if self._patterns is not None else None
+
+    def _arrive(self, tag: str) -> None:
+        '''Record the arrival of a message in recent tags and sequence rules.'''
+        if self._recent is not None:
+            self._recent.append(tag)
+        if self._sequence_index:
+            watching = self._sequence_index.get(tag)
+            if watching is not None:
+                self._advance_sequences(tag, watching)
+
+    def _observe_arrival(self, tag: str) -> None:
+        '''_arrive() for a message whose condition is evaluated later, by _observe_batch().'''
+        try:
+            self._arrive(tag)
+        except Exception as e:
+            if not self._global_violation:
+                self._violation_count += 1
+            self._global_violation = True
+            self._global_fail_reason = "internal error"
+            self._global_exception = e
+            self._call_exception_handler(tag, ExceptionKind.ON_INTERNAL, None, e)
+
+    def _observe(self, tag: str, args: tuple, kwargs: dict, evaluated: tuple[object, Exception | None] | None) -> None:
+        '''Record a message. `evaluated` is the (result, exception) of the condition if already evaluated.'''
         try:
-            if tag not in self._observations:
+            self._arrive(tag)
+            key = self._resolve(tag)
+            if key is None:
+                if tag in self._sequence_index:
+                    return
                 if not self._global_violation:
                     self._global_violation = True
                     self._global_fail_reason = f"wrong tag '{tag}'"
+                    self._violation_count += 1
                 return
             
-            observation = self._observations[tag]
-            condition = self._conditions[tag]
+            observation = self._observations[key]
+            if observation.summaries:
+                _summarize(observation.summaries, args, kwargs)
+            if observation._ring is not None:
+                observation._ring.append((args, kwargs))
+            condition = self._conditions[key]
             pass_ = False
-            try:
-                pass_ = condition(*args, **kwargs)
-            except Exception as e:
+            error = None
+            if evaluated is None:
+                try:
+                    if observation.memo is None:
+                        pass_ = condition(*args, **kwargs)
+                    else:
+                        pass_ = observation.memo.call(condition, args, kwargs)
+                except Exception as e:
+                    error = e
+            else:
+                pass_, error = evaluated
+            if error is not None:
                 self._local_violation = True
                 if not observation.violation:
                     observation.violation = True
                     observation.first_violation_at = observation.count
                     observation.fail_condition = condition
                     observation.fail_reason = f'exception at {tag} at {observation.count}th attempt'
-                    observation.exc = e
-                    self._call_exception_handler(tag, ExceptionKind.ON_CONDITION, observation, e)
-                self._call_violation_handler(tag, observation)
+                    observation.exc = error
+                    self._on_first_violation(observation)
+                    self._call_exception_handler(tag, ExceptionKind.ON_CONDITION, observation, error)
+                self._call_violation_handler(key, observation)
 
 
             if not pass_:
@@ -66,18 +208,57 @@ class ProcessObserver:
                     observation.violation = True
                     observation.first_violation_at = observation.count
                     observation.fail_condition = condition
-                    observation.fail_reason = 'condition violation'
-                self._call_violation_handler(tag, observation)
+                    if isinstance(condition, Invariant):
+                        observation.fail_reason = condition.reason
+                    else:
+                        observation.fail_reason = 'condition violation'
+                    self._on_first_violation(observation)
+                self._call_violation_handler(key, observation)
             
             observation.count += 1
         except Exception as e:
             # overrides all global violations
+            if not self._global_violation:
+                self._violation_count += 1
             self._global_violation = True
             self._global_fail_reason = "internal error"
             self._global_exception = e
             self._call_exception_handler(tag, ExceptionKind.ON_INTERNAL, None, e)
 
 
+    def _observe_batch(
+            self, tag: str, key: str, size: int, first_failed: int, error: Exception | None,
+            seq: int | None = None) -> None:
+        '''Record `size` messages of `key` evaluated at once; `first_failed` is the index of the first failure or -1.
+
+        `seq` is the sequence number of the first failed message, if taken when it arrived.
+        '''
+        try:
+            observation = self._observations[key]
+            if error is not None or first_failed >= 0:
+                self._local_violation = True
+                if not observation.violation:
+                    observation.violation = True
+                    observation.first_violation_at = observation.count + max(first_failed, 0)
+                    observation.fail_condition = self._conditions[key]
+                    if error is not None:
+                        observation.fail_reason = f'exception at {tag} in batch from {observation.count}th attempt'
+                        observation.exc = error
+                    else:
+                        observation.fail_reason = 'condition violation'
+                    self._on_first_violation(observation, seq)
+                    if error is not None:
+                        self._call_exception_handler(tag, ExceptionKind.ON_CONDITION, observation, error)
+                self._call_violation_handler(key, observation)
+            observation.count += size
+        except Exception as e:
+            if not self._global_violation:
+                self._violation_count += 1
+            self._global_violation = True
+            self._global_fail_reason = "internal error"
+            self._global_exception = e
+            self._call_exception_handler(tag, ExceptionKind.ON_INTERNAL, None, e)
+
     def _call_violation_handler(self, tag, observation):
         if tag in self._violation_handlers:
             try:
@@ -105,6 +286,11 @@ class ProcessObserver:
     def local_violation(self):
         return self._local_violation
     
+    @property
+    def violation_count(self) -> int:
+        '''Number of violations so far: violated conditions and sequence rules, plus one for a global violation.'''
+        return self._violation_count
+
     @property
     def global_fail_reason(self) -> str:
         return self._global_fail_reason
@@ -125,6 +311,22 @@ class ProcessObserver:
     def get_unevaluated(self) -> dict[str, Observation]:
         return {k: v for k, v in self._observations.items() if v.count == 0}
 
+    def get_sequences(self) -> dict[str, SequenceObservation]:
+        return {k: v for k, v in self._sequence_observations.items()}
+
+    def finish_sequences(self) -> dict[str, SequenceObservation]:
+        '''Mark sequences that cannot end here as violated and return all violated sequences.'''
+        for seq in self._sequence_observations.values():
+            if not seq.violation and not seq.rule.accepting(seq.state):
+                seq.violation = True
+                seq.first_violation_at = seq.count
+                seq.first_violation_seq = self._seq_source()
+                self._violation_count += 1
+                expected = ', '.join(f"'{t}'" for t in seq.rule.expected(seq.state))
+                seq.fail_reason = f"incomplete sequence, expected {expected}"
+                self._local_violation = True
+        return {k: v for k, v in self._sequence_observations.items() if v.violation}
+
     def set_violation_handler(self, tag: str, fn: Callable[[Observation], None]) -> None:
         if tag not in self._conditions:
             raise ValueError(f"Condition '{tag}' is not defined")
@@ -133,16 +335,78 @@ class ProcessObserver:
     def set_exception_handler(self, fn: Callable[[str, ExceptionKind, Observation | None, Exception], None]) -> None:
         self._exception_handler = fn
 
+    def snapshot(self, source: str | None = None) -> ObserverSnapshot:
+        '''Picklable copy of the results, for merging with those of other workers.'''
+        snapshot = ObserverSnapshot()
+        snapshot.sources = (source if source is not None else str(os.getpid()),)
+        snapshot.global_violation = self._global_violation
+        snapshot.global_fail_reason = self._global_fail_reason
+        snapshot.global_exception = repr(self._global_exception) if self._global_exception is not None else None
+        for key, observation in self._observations.items():
+            item = snapshot.observations[key] = ObservationSnapshot()
+            item.count = observation.count
+            item.summaries = {k: v.copy() for k, v in observation.summaries.items()}
+            item.exc = repr(observation.exc) if observation.exc is not None else None
+            self._copy_violation(item, observation, snapshot.sources[0])
+        for name, seq in self._sequence_observations.items():
+            item = snapshot.sequences[name] = ObservationSnapshot()
+            item.count = seq.count
+            self._copy_violation(item, seq, snapshot.sources[0])
+        return snapshot
+
+    @staticmethod
+    def _copy_violation(item: ObservationSnapshot, observation: Observation | SequenceObservation, source: str) -> None:
+        if observation.violation:
+            item.violation = True
+            item.first_violation_at = observation.first_violation_at
+            item.first_violation_seq = observation.first_violation_seq
+            item.first_violation_source = source
+            item.fail_reason = observation.fail_reason
+
     def get_stat(self, tag: str) -> ConditionStat:
         observation = self._observations[tag]
-        stat = ConditionStat(observation.count, observation.violation, observation.first_violation_at)
+        stat = ConditionStat(observation.count, observation.violation, observation.first_violation_at,
+                             {k: v.copy() for k, v in observation.summaries.items()})
         return stat
 
 
+def _summary_keys(
+        conditions: dict[str, Callable[..., bool]],
+        summarize: dict[str, int | str | Iterable[int | str]] | None) -> dict[str, tuple[int | str, ...]]:
+    if not summarize:
+        return {}
+    keys = {}
+    for tag, spec in summarize.items():
+        if tag not in conditions:
+            raise ValueError(f"Condition '{tag}' is not defined")
+        keys[tag] = (spec,) if isinstance(spec, (int, str)) else tuple(spec)
+    return keys
+
+
+def _context_sizes(conditions: dict[str, Callable[..., bool]], context: int | dict[str, int]) -> dict[str, int]:
+    sizes = dict.fromkeys(conditions, context) if isinstance(context, int) else dict(context)
+    for tag, size in sizes.items():
+        if tag not in conditions:
+            raise ValueError(f"Condition '{tag}' is not defined")
+        if size < 0:
+            raise ValueError("context size must not be negative")
+    return sizes
+
+
+def _summarize(summaries: dict[int | str, ValueSummary], args: tuple, kwargs: dict) -> None:
+    for key, summary in summaries.items():
+        if isinstance(key, int):
+            if -len(args) <= key < len(args):
+                summary.add(args[key])
+        elif key in kwargs:
+            summary.add(kwargs[key])
+
+
 class Observation:
     '''Detailed observation results by condition.'''
 
-    __slots__ = ('count', 'violation', 'first_violation_at', 'exc', 'fail_condition', 'fail_reason')
+    __slots__ = ('count', 'violation', 'first_violation_at', 'exc', 'fail_condition', 'fail_reason',
+                 'summaries', 'context', 'recent_tags', 'memo', 'first_violation_seq', '_ring')
     def __init__(self):
         self.count: int = 0
         self.violation: bool = False
@@ -150,16 +414,24 @@ class Observation:
         self.exc: Exception | None = None
         self.fail_condition: Callable[..., bool] | None = None
         self.fail_reason: str = ''
+        self.summaries: dict[int | str, ValueSummary] = {}
+        self.context: tuple[tuple[tuple, dict], ...] = ()
+        self.recent_tags: tuple[str, ...] = ()
+        self.memo: MemoCache | None = None
+        self.first_violation_seq: int = -1
+        self._ring: deque[tuple[tuple, dict]] | None = None
 
 
 class ConditionStat:
     '''Represents a simplified statistical view for a specific condition.'''
 
-    __slots__ = ('_count', '_violation', '_first_violation_at')
-    def __init__(self, count: int, violation: bool, first_violation_at: int):
+    __slots__ = ('_count', '_violation', '_first_violation_at', '_summaries')
+    def __init__(self, count: int, violation: bool, first_violation_at: int,
+                 summaries: dict[int | str, ValueSummary] | None = None):
         self._count = count
         self._violation = violation
         self._first_violation_at = first_violation_at
+        self._summaries = summaries if summaries is not None else {}
     
     @property
     def count(self) -> int:
@@ -173,6 +445,14 @@ class ConditionStat:
     def first_violation_at(self) -> int:
         return self._first_violation_at
 
+    @property
+    def summaries(self) -> dict[int | str, ValueSummary]:
+        '''Summaries by argument position or keyword name.'''
+        return self._summaries
+
+    def summary(self, key: int | str = 0) -> ValueSummary:
+        return self._summaries[key]
+
 
 class ExceptionKind(enum.Enum):
     ON_CONDITION = 'Exception raised on condition.'
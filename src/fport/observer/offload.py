@@ -0,0 +1,128 @@
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any
+
+from .invariant import Invariant
+from .memo import PureCondition
+from .observer import ProcessObserver
+
+
+def _evaluate(condition: Any, args: tuple, kwargs: dict) -> tuple[object, Exception | None]:
+    try:
+        return condition(*args, **kwargs), None
+    except Exception as e:
+        return False, e
+
+
+class OffloadedObserver:
+    '''Evaluates the conditions of a ProcessObserver on an executor.
+
+    listen() only submits the condition to the executor and queues the
+    message, so the sender does not wait for condition evaluation. A
+    background thread records the results into `observer` in the order
+    the messages were listened, so `first_violation_at`, summaries,
+    context, sequences and the violation/exception handlers behave as
+    with the observer alone; handlers run on that thread.
+
+    Stateful conditions (`Invariant`) and pure conditions (whose results
+    are memoized) are evaluated on the recording thread instead, in order.
+
+    The executor defaults to a ThreadPoolExecutor owned by this object.
+    A ProcessPoolExecutor may be given; conditions, arguments and
+    results must then be picklable.
+
+    Call join() before reading results from `observer`.
+    '''
+
+    def __init__(
+            self,
+            observer: ProcessObserver,
+            *,
+            executor: Executor | None = None,
+            max_workers: int | None = None):
+        self._observer = observer
+        self._owns_executor = executor is None
+        self._executor = executor if executor is not None else ThreadPoolExecutor(
+            max_workers = max_workers, thread_name_prefix = 'fport-observer')
+        self._queue: deque[tuple[str, tuple, dict, Future | None]] = deque()
+        self._cond = threading.Condition()
+        self._unfinished = 0
+        self._closing = False
+        self._thread = threading.Thread(target = self._run, name = 'fport-observer-record', daemon = True)
+        self._thread.start()
+
+    @property
+    def observer(self) -> ProcessObserver:
+        return self._observer
+
+    @property
+    def pending(self) -> int:
+        '''Number of messages not yet recorded.'''
+        return self._unfinished
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        observer = self._observer
+        key = observer._resolve(tag)
+        condition = observer._conditions.get(key) if key is not None else None
+        future = None
+        if condition is not None and not isinstance(condition, (Invariant, PureCondition)):
+            try:
+                future = self._executor.submit(_evaluate, condition, args, kwargs)
+            except RuntimeError:
+                # The executor is shut down; record on the recording thread.
+                future = None
+        with self._cond:
+            if self._closing:
+                return
+            self._queue.append((tag, args, kwargs, future))
+            self._unfinished += 1
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        observer = self._observer
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                tag, args, kwargs, future = self._queue.popleft()
+            try:
+                if future is None:
+                    observer._observe(tag, args, kwargs, None)
+                else:
+                    try:
+                        evaluated = future.result()
+                    except Exception as e:
+                        evaluated = (False, e)
+                    observer._observe(tag, args, kwargs, evaluated)
+            finally:
+                with self._cond:
+                    self._unfinished -= 1
+                    self._cond.notify_all()
+
+    def join(self, timeout: float | None = None) -> bool:
+        '''Wait until every listened message is recorded. Returns False on timeout.'''
+        with self._cond:
+            return self._cond.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def close(self) -> None:
+        '''Record what is queued, stop the recording thread and shut down an owned executor.'''
+        self.join()
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    def __enter__(self) -> OffloadedObserver:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
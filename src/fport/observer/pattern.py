@@ -0,0 +1,109 @@
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from typing import Iterable
+
+
+_GLOB_CHARS = frozenset('*?[')
+
+_TERMINAL = ''
+
+
+def pattern_key(pattern: str | re.Pattern) -> str:
+    '''Key under which the observation of a pattern is kept.'''
+    return pattern.pattern if isinstance(pattern, re.Pattern) else pattern
+
+
+class PatternIndex:
+    '''Resolves tags to the first applicable tag pattern.
+
+    Patterns are glob strings or compiled regular expressions. Globs of
+    the form ``prefix*`` go into a character trie; all other patterns are
+    combined into as few regular expressions as possible; patterns with
+    flags or capture groups are matched on their own, since combining
+    them would renumber their groups. Resolution order is: the longest
+    matching prefix glob, then the first matching other pattern in the
+    given order. Results are cached per tag; the cache is cleared
+    when it holds `cache_size` tags.
+    '''
+
+    __slots__ = ('_trie', '_matchers', '_cache', '_cache_size')
+
+    def __init__(self, patterns: Iterable[str | re.Pattern], cache_size: int = 4096):
+        if cache_size < 1:
+            raise ValueError("cache_size must be positive")
+        self._trie: dict = {}
+        self._cache: dict[str, str | None] = {}
+        self._cache_size = cache_size
+        others: list[tuple[str, re.Pattern]] = []
+        for pattern in patterns:
+            key = pattern_key(pattern)
+            if isinstance(pattern, re.Pattern):
+                others.append((key, pattern))
+            elif pattern.endswith('*') and not _GLOB_CHARS.intersection(pattern[:-1]):
+                self._insert(pattern[:-1], key)
+            else:
+                others.append((key, re.compile(fnmatch.translate(pattern))))
+        self._matchers = _matchers(others)
+
+    def _insert(self, prefix: str, key: str) -> None:
+        node = self._trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(_TERMINAL, key)
+
+    def resolve(self, tag: str) -> str | None:
+        '''Key of the pattern applying to `tag`, or None.'''
+        try:
+            return self._cache[tag]
+        except KeyError:
+            pass
+        key = self._lookup(tag)
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[tag] = key
+        return key
+
+    def _lookup(self, tag: str) -> str | None:
+        node = self._trie
+        found = node.get(_TERMINAL)
+        for char in tag:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(_TERMINAL, found)
+        if found is not None:
+            return found
+        for regex, keys in self._matchers:
+            m = regex.fullmatch(tag)
+            if m is not None:
+                return keys if isinstance(keys, str) else keys[m.lastgroup]
+        return None
+
+
+def _matchers(others: list[tuple[str, re.Pattern]]) -> tuple[tuple[re.Pattern, str | dict[str, str]], ...]:
+    '''Regexes to try in order, with the key of each or, for combined ones, keys by group name.'''
+    matchers: list[tuple[re.Pattern, str | dict[str, str]]] = []
+    run: list[tuple[str, re.Pattern]] = []
+    for key, p in others:
+        if p.groups == 0 and p.flags & ~re.UNICODE == 0:
+            run.append((key, p))
+            continue
+        _combine(run, matchers)
+        run = []
+        matchers.append((p, key))
+    _combine(run, matchers)
+    return tuple(matchers)
+
+
+def _combine(run: list[tuple[str, re.Pattern]], matchers: list[tuple[re.Pattern, str | dict[str, str]]]) -> None:
+    if len(run) > 1:
+        keys = {f'_p{i}': key for i, (key, _) in enumerate(run)}
+        try:
+            matchers.append((re.compile('|'.join(f'(?P<_p{i}>{p.pattern})' for i, (_, p) in enumerate(run))), keys))
+            return
+        except re.error:
+            pass
+    matchers.extend((p, key) for key, p in run)
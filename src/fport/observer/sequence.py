@@ -0,0 +1,221 @@
+
+from __future__ import annotations
+
+import re
+
+
+_TOKEN = re.compile(r'\s*(?:([()|*+?])|([^\s()|*+?]+))')
+
+
+class SequenceRule:
+    '''Ordering rule over tags, compiled to a deterministic automaton.
+
+    The pattern is a regular expression whose symbols are tags:
+    whitespace separates tags, ``|`` is alternation, ``*``/``+``/``?``
+    are repetition and parentheses group.
+
+        SequenceRule("open (read | write)* close")
+
+    Only tags appearing in the pattern are checked; other tags are
+    ignored. A tag with no transition from the current state is a
+    violation. Whether the sequence may end in the current state is
+    given by `accepting`.
+    '''
+
+    __slots__ = ('_pattern', '_alphabet', '_transitions', '_accepting')
+
+    def __init__(self, pattern: str):
+        self._pattern = pattern
+        nfa = _Nfa()
+        start, end = _Parser(pattern, nfa).parse()
+        self._alphabet = frozenset(nfa.symbols)
+        self._transitions, self._accepting = _determinize(nfa, start, end)
+
+    @property
+    def pattern(self) -> str:
+        return self._pattern
+
+    @property
+    def alphabet(self) -> frozenset[str]:
+        '''Tags checked by this rule.'''
+        return self._alphabet
+
+    @property
+    def state_count(self) -> int:
+        return len(self._transitions)
+
+    def step(self, state: int, tag: str) -> int:
+        '''Next state, or -1 if `tag` is not allowed in `state`.'''
+        return self._transitions[state].get(tag, -1)
+
+    def accepting(self, state: int) -> bool:
+        return state in self._accepting
+
+    def expected(self, state: int) -> tuple[str, ...]:
+        '''Tags allowed in `state`.'''
+        return tuple(sorted(self._transitions[state]))
+
+
+class _Nfa:
+    __slots__ = ('edges', 'symbols')
+
+    def __init__(self):
+        # edges[state] is a list of (symbol or None for epsilon, next state)
+        self.edges: list[list[tuple[str | None, int]]] = []
+        self.symbols: set[str] = set()
+
+    def state(self) -> int:
+        self.edges.append([])
+        return len(self.edges) - 1
+
+    def edge(self, a: int, symbol: str | None, b: int) -> None:
+        self.edges[a].append((symbol, b))
+        if symbol is not None:
+            self.symbols.add(symbol)
+
+
+class _Parser:
+    '''Recursive descent parser building a Thompson NFA.'''
+
+    __slots__ = ('_tokens', '_pos', '_nfa', '_pattern')
+
+    def __init__(self, pattern: str, nfa: _Nfa):
+        self._pattern = pattern
+        self._tokens: list[tuple[str, str]] = []
+        pos = 0
+        text = pattern.rstrip()
+        while pos < len(text):
+            m = _TOKEN.match(text, pos)
+            if m is None:
+                raise ValueError(f"invalid sequence pattern '{pattern}'")
+            op, tag = m.groups()
+            self._tokens.append(('op', op) if op else ('tag', tag))
+            pos = m.end()
+        self._pos = 0
+        self._nfa = nfa
+
+    def _peek(self) -> tuple[str, str] | None:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def _error(self) -> ValueError:
+        return ValueError(f"invalid sequence pattern '{self._pattern}'")
+
+    def parse(self) -> tuple[int, int]:
+        if not self._tokens:
+            raise self._error()
+        fragment = self._alternation()
+        if self._peek() is not None:
+            raise self._error()
+        return fragment
+
+    def _alternation(self) -> tuple[int, int]:
+        branches = [self._concatenation()]
+        while self._peek() == ('op', '|'):
+            self._pos += 1
+            branches.append(self._concatenation())
+        if len(branches) == 1:
+            return branches[0]
+        nfa = self._nfa
+        start, end = nfa.state(), nfa.state()
+        for a, b in branches:
+            nfa.edge(start, None, a)
+            nfa.edge(b, None, end)
+        return start, end
+
+    def _concatenation(self) -> tuple[int, int]:
+        parts = []
+        while (token := self._peek()) is not None and token not in (('op', '|'), ('op', ')')):
+            parts.append(self._repetition())
+        if not parts:
+            raise self._error()
+        for (_, b), (c, _) in zip(parts, parts[1:]):
+            self._nfa.edge(b, None, c)
+        return parts[0][0], parts[-1][1]
+
+    def _repetition(self) -> tuple[int, int]:
+        a, b = self._atom()
+        nfa = self._nfa
+        while (token := self._peek()) in (('op', '*'), ('op', '+'), ('op', '?')):
+            self._pos += 1
+            start, end = nfa.state(), nfa.state()
+            nfa.edge(start, None, a)
+            nfa.edge(b, None, end)
+            if token[1] in '*?':
+                nfa.edge(start, None, end)
+            if token[1] in '*+':
+                nfa.edge(b, None, a)
+            a, b = start, end
+        return a, b
+
+    def _atom(self) -> tuple[int, int]:
+        token = self._peek()
+        if token is None:
+            raise self._error()
+        kind, value = token
+        self._pos += 1
+        if kind == 'tag':
+            start, end = self._nfa.state(), self._nfa.state()
+            self._nfa.edge(start, value, end)
+            return start, end
+        if value == '(':
+            fragment = self._alternation()
+            if self._peek() != ('op', ')'):
+                raise self._error()
+            self._pos += 1
+            return fragment
+        raise self._error()
+
+
+def _closure(nfa: _Nfa, states: set[int]) -> frozenset[int]:
+    stack = list(states)
+    seen = set(states)
+    while stack:
+        state = stack.pop()
+        for symbol, nxt in nfa.edges[state]:
+            if symbol is None and nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    return frozenset(seen)
+
+
+def _determinize(nfa: _Nfa, start: int, end: int) -> tuple[list[dict[str, int]], frozenset[int]]:
+    '''Subset construction. State 0 is the start state.'''
+    initial = _closure(nfa, {start})
+    ids = {initial: 0}
+    order = [initial]
+    transitions: list[dict[str, int]] = []
+    for subset in order:
+        moves: dict[str, set[int]] = {}
+        for state in subset:
+            for symbol, nxt in nfa.edges[state]:
+                if symbol is not None:
+                    moves.setdefault(symbol, set()).add(nxt)
+        row = {}
+        for symbol, targets in moves.items():
+            target = _closure(nfa, targets)
+            if target not in ids:
+                ids[target] = len(order)
+                order.append(target)
+            row[symbol] = ids[target]
+        transitions.append(row)
+    accepting = frozenset(i for subset, i in ids.items() if end in subset)
+    return transitions, accepting
+
+
+class SequenceObservation:
+    '''Observation results of a sequence rule.'''
+
+    __slots__ = ('rule', 'state', 'count', 'violation', 'first_violation_at', 'first_violation_seq', 'fail_reason')
+    def __init__(self, rule: SequenceRule):
+        self.rule: SequenceRule = rule
+        self.state: int = 0
+        self.count: int = 0
+        self.violation: bool = False
+        self.first_violation_at: int = -1
+        self.first_violation_seq: int = -1
+        self.fail_reason: str = ''
+
+    @property
+    def complete(self) -> bool:
+        '''Whether the messages so far form a complete sequence.'''
+        return not self.violation and self.rule.accepting(self.state)
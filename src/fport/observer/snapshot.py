@@ -0,0 +1,141 @@
+
+from __future__ import annotations
+
+import pickle
+from typing import Iterable
+
+from .summary import ValueSummary
+
+
+_FORMAT_VERSION = 1
+
+
+class ObservationSnapshot:
+    '''Results of one condition (or sequence rule) at the time of the snapshot.
+
+    `first_violation_at` is counted in the messages of the source given
+    by `first_violation_source`; `first_violation_seq` orders first
+    violations across sources.
+    '''
+
+    __slots__ = ('count', 'violation', 'first_violation_at', 'first_violation_seq',
+                 'first_violation_source', 'fail_reason', 'exc', 'summaries')
+    def __init__(self):
+        self.count: int = 0
+        self.violation: bool = False
+        self.first_violation_at: int = -1
+        self.first_violation_seq: int = -1
+        self.first_violation_source: str | None = None
+        self.fail_reason: str = ''
+        self.exc: str | None = None
+        self.summaries: dict[int | str, ValueSummary] = {}
+
+    def _merge(self, other: ObservationSnapshot) -> None:
+        self.count += other.count
+        if other.violation and (not self.violation or other.first_violation_seq < self.first_violation_seq):
+            self.first_violation_at = other.first_violation_at
+            self.first_violation_seq = other.first_violation_seq
+            self.first_violation_source = other.first_violation_source
+            self.fail_reason = other.fail_reason
+            self.exc = other.exc
+        self.violation = self.violation or other.violation
+        for key, summary in other.summaries.items():
+            if key in self.summaries:
+                self.summaries[key].merge(summary)
+            else:
+                self.summaries[key] = summary.copy()
+
+    def _to_tuple(self) -> tuple:
+        return (self.count, self.violation, self.first_violation_at, self.first_violation_seq,
+                self.first_violation_source, self.fail_reason, self.exc, self.summaries)
+
+    @classmethod
+    def _from_tuple(cls, values: tuple) -> ObservationSnapshot:
+        snapshot = cls()
+        (snapshot.count, snapshot.violation, snapshot.first_violation_at, snapshot.first_violation_seq,
+         snapshot.first_violation_source, snapshot.fail_reason, snapshot.exc, snapshot.summaries) = values
+        return snapshot
+
+
+class ObserverSnapshot:
+    '''Picklable results of one or more ProcessObservers.
+
+    Created by ProcessObserver.snapshot(), combined by merge() or
+    merge_snapshots(), and serialized by to_bytes()/from_bytes().
+    Exceptions are kept as their repr() strings; violation context is
+    not included.
+    '''
+
+    __slots__ = ('sources', 'global_violation', 'global_fail_reason', 'global_exception',
+                 'observations', 'sequences')
+    def __init__(self):
+        self.sources: tuple[str, ...] = ()
+        self.global_violation: bool = False
+        self.global_fail_reason: str = ''
+        self.global_exception: str | None = None
+        self.observations: dict[str, ObservationSnapshot] = {}
+        self.sequences: dict[str, ObservationSnapshot] = {}
+
+    @property
+    def violation(self) -> bool:
+        return (self.global_violation
+                or any(o.violation for o in self.observations.values())
+                or any(s.violation for s in self.sequences.values()))
+
+    def get_violated(self) -> dict[str, ObservationSnapshot]:
+        return {k: v for k, v in self.observations.items() if v.violation}
+
+    def get_unevaluated(self) -> dict[str, ObservationSnapshot]:
+        return {k: v for k, v in self.observations.items() if v.count == 0}
+
+    def first_violation(self) -> tuple[str, ObservationSnapshot] | None:
+        '''The condition that was violated first across all sources, if any.'''
+        violated = self.get_violated()
+        if not violated:
+            return None
+        return min(violated.items(), key = lambda item: item[1].first_violation_seq)
+
+    def merge(self, other: ObserverSnapshot) -> ObserverSnapshot:
+        '''Return a new snapshot combining this one and `other`.'''
+        return merge_snapshots((self, other))
+
+    def to_bytes(self) -> bytes:
+        return pickle.dumps((
+            _FORMAT_VERSION, self.sources,
+            (self.global_violation, self.global_fail_reason, self.global_exception),
+            {k: v._to_tuple() for k, v in self.observations.items()},
+            {k: v._to_tuple() for k, v in self.sequences.items()},
+        ), protocol = pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> ObserverSnapshot:
+        '''Restore a snapshot. Only use data from trusted sources: it is unpickled.'''
+        version, sources, globals_, observations, sequences = pickle.loads(data)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot format version {version}")
+        snapshot = cls()
+        snapshot.sources = tuple(sources)
+        snapshot.global_violation, snapshot.global_fail_reason, snapshot.global_exception = globals_
+        snapshot.observations = {k: ObservationSnapshot._from_tuple(v) for k, v in observations.items()}
+        snapshot.sequences = {k: ObservationSnapshot._from_tuple(v) for k, v in sequences.items()}
+        return snapshot
+
+
+def merge_snapshots(snapshots: Iterable[ObserverSnapshot]) -> ObserverSnapshot:
+    '''Combine snapshots: counts add up, the earliest first violation (by sequence number) wins.'''
+    merged = ObserverSnapshot()
+    sources: list[str] = []
+    for snapshot in snapshots:
+        sources.extend(snapshot.sources)
+        if snapshot.global_violation and not merged.global_violation:
+            merged.global_violation = True
+            merged.global_fail_reason = snapshot.global_fail_reason
+            merged.global_exception = snapshot.global_exception
+        for target, items in ((merged.observations, snapshot.observations),
+                              (merged.sequences, snapshot.sequences)):
+            for key, observation in items.items():
+                if key not in target:
+                    target[key] = ObservationSnapshot()
+                target[key]._merge(observation)
+    merged.sources = tuple(sources)
+    return merged
@@ -0,0 +1,167 @@
+
+from __future__ import annotations
+
+import math
+
+
+class ValueSummary:
+    '''Streaming summary of numeric values in bounded memory.
+
+    Count, min, max, mean and variance are exact (Welford's method).
+    Quantiles come from a logarithmic bucket sketch: an estimate is
+    within `relative_accuracy` of the true value as long as no more than
+    `max_buckets` buckets per sign are needed; beyond that the buckets of
+    the smallest magnitudes are merged. Summaries with the same settings
+    can be merged.
+    '''
+
+    __slots__ = ('_count', '_mean', '_m2', '_min', '_max', '_skipped',
+                 '_relative_accuracy', '_max_buckets', '_gamma', '_log_gamma',
+                 '_positive', '_negative', '_zero')
+
+    _MIN_MAGNITUDE = 1e-12
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 1024):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        if max_buckets < 1:
+            raise ValueError("max_buckets must be positive")
+        self._relative_accuracy = relative_accuracy
+        self._max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.reset()
+
+    def reset(self) -> None:
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self._skipped = 0
+        self._positive: dict[int, int] = {}
+        self._negative: dict[int, int] = {}
+        self._zero = 0
+
+    def add(self, value: object) -> bool:
+        '''Add a value. Returns False (and counts it in `skipped`) if it is not a finite number.'''
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            self._skipped += 1
+            return False
+        x = float(value)
+        if not math.isfinite(x):
+            self._skipped += 1
+            return False
+
+        self._count += 1
+        delta = x - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (x - self._mean)
+        if x < self._min:
+            self._min = x
+        if x > self._max:
+            self._max = x
+
+        if x > self._MIN_MAGNITUDE:
+            self._add_bucket(self._positive, math.ceil(math.log(x) / self._log_gamma), 1)
+        elif x < -self._MIN_MAGNITUDE:
+            self._add_bucket(self._negative, math.ceil(math.log(-x) / self._log_gamma), 1)
+        else:
+            self._zero += 1
+        return True
+
+    def _add_bucket(self, store: dict[int, int], key: int, n: int) -> None:
+        store[key] = store.get(key, 0) + n
+        if len(store) > self._max_buckets:
+            lowest = min(store)
+            moved = store.pop(lowest)
+            following = min(store)
+            store[following] += moved
+
+    def _bucket_value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        '''Estimated value at quantile `q` (0.0-1.0); NaN if empty.'''
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self._count == 0:
+            return math.nan
+        rank = q * (self._count - 1)
+        seen = 0
+        estimate = self._max
+        for key in sorted(self._negative, reverse = True):
+            seen += self._negative[key]
+            if seen > rank:
+                estimate = -self._bucket_value(key)
+                break
+        else:
+            seen += self._zero
+            if seen > rank:
+                estimate = 0.0
+            else:
+                for key in sorted(self._positive):
+                    seen += self._positive[key]
+                    if seen > rank:
+                        estimate = self._bucket_value(key)
+                        break
+        return min(max(estimate, self._min), self._max)
+
+    def quantiles(self, *qs: float) -> dict[float, float]:
+        return {q: self.quantile(q) for q in qs}
+
+    def merge(self, other: ValueSummary) -> None:
+        '''Add the values summarized by `other` into this summary.'''
+        if (other._relative_accuracy != self._relative_accuracy
+                or other._max_buckets != self._max_buckets):
+            raise ValueError("summaries with different settings cannot be merged")
+        self._skipped += other._skipped
+        if other._count == 0:
+            return
+        total = self._count + other._count
+        delta = other._mean - self._mean
+        self._m2 += other._m2 + delta * delta * self._count * other._count / total
+        self._mean += delta * other._count / total
+        self._count = total
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        self._zero += other._zero
+        for key, n in other._positive.items():
+            self._add_bucket(self._positive, key, n)
+        for key, n in other._negative.items():
+            self._add_bucket(self._negative, key, n)
+
+    def copy(self) -> ValueSummary:
+        clone = ValueSummary(self._relative_accuracy, self._max_buckets)
+        clone.merge(self)
+        return clone
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def skipped(self) -> int:
+        '''Number of values that were not finite numbers.'''
+        return self._skipped
+
+    @property
+    def min(self) -> float:
+        return self._min if self._count else math.nan
+
+    @property
+    def max(self) -> float:
+        return self._max if self._count else math.nan
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self._count else math.nan
+
+    @property
+    def variance(self) -> float:
+        '''Sample variance; NaN with fewer than two values.'''
+        return self._m2 / (self._count - 1) if self._count > 1 else math.nan
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
@@ -25,14 +25,17 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 
 from threading import Lock
-from typing import Callable, ContextManager, Protocol, cast
+from typing import Callable, ContextManager, Iterable, Protocol, cast
 from contextlib import contextmanager
+from contextvars import ContextVar, Token
 
-from .port import Port, _create_port, _create_noop_port, _create_port_role
+from .port import Port, _create_port, _create_noop_port, _create_port_role, _create_routed_port, _Route
 from .port import _RoleTOC as _PortRoleTOC
 from .protocols import ListenFunction, SendFunction
-from .session import Session, SessionState
-from .exceptions import DeniedError
+from .session import EndReason, Session, SessionState, _BudgetListener
+from .exceptions import DeniedError, OccupiedError
+from .governor import OverheadBudget
+from . import _forksafe
 
 class SessionPolicy(ABC):
     """Management interface for creating Ports and sessions."""
@@ -45,7 +48,15 @@ class SessionPolicy(ABC):
         """Create a Port that rejects connections."""
 
     @abstractmethod
-    def session(self, listener: ListenFunction, target: Port) -> ContextManager[SessionState]:
+    def session(
+            self,
+            listener: ListenFunction,
+            target: Port,
+            *,
+            max_messages: int | None = None,
+            max_seconds: float | None = None,
+            until_tags: Iterable[str] | None = None
+    ) -> ContextManager[SessionState]:
         """
         Establish a connection to the specified Port.
 
@@ -54,6 +65,16 @@ class SessionPolicy(ABC):
                 Handler for inputs sent to the target.
             target:
                 The Port to connect to.
+            max_messages:
+                End the session after this many messages were delivered.
+            max_seconds:
+                End the session when this many seconds have passed.
+            until_tags:
+                End the session once every one of these tags was delivered.
+
+        When a budget ends the session, the Port returns to its detached
+        state while the context is still open, and SessionState.end_reason
+        tells which budget ended it. Ending by budget is not a failure.
 
         Raises:
             TypeError:
@@ -87,6 +108,8 @@ class _StateTOC(Protocol):
     entry_permit: object
     control_permit: object
 
+    route: ContextVar[dict[Port, _Route]] | None
+
 class _KernelTOC(Protocol):
     def create_port(self, bridge: _PortBridgeTOC) -> _PortRoleTOC | Port:
         ...
@@ -102,13 +125,19 @@ class _CoreTOC(Protocol):
     def unregister_session(self, target: Port) -> None:
         ...
 
+    def register_routed_session(self, listen: ListenFunction, target: Port) -> tuple[Session, Token]:
+        ...
+
+    def unregister_routed_session(self, target: Port, token: Token) -> None:
+        ...
+
     def create_port(self) -> Port:
         ...
     
     def create_noop_port(self) -> Port:
         ...
     
-    def session(self, listen: ListenFunction, target: Port) -> ContextManager[SessionState]:
+    def session(self, listen: ListenFunction, target: Port, budget: _BudgetListener | None = None) -> ContextManager[SessionState]:
         ...
 
 class _PortBridgeTOC(Protocol):
@@ -138,9 +167,15 @@ class _RoleTOC(Protocol):
 def _create_session_policy_role(
         *,
         block_port: bool = False,
-        message_validator: SendFunction | None = None
+        message_validator: SendFunction | None = None,
+        collect_stats: bool = False,
+        overhead_budget: OverheadBudget | None = None,
+        route_by_context: bool = False
 ) -> _RoleTOC:
 
+    if route_by_context and (collect_stats or overhead_budget is not None):
+        raise ValueError("route_by_context cannot be combined with collect_stats or overhead_budget")
+
     class _Constant(_ConstantTOC):
         __slots__ = ()
         SENTINELS = {"DEFAULT_MESSAGE_VALIDATOR": lambda tag, *a, **kw: None}
@@ -160,12 +195,25 @@ def _create_session_policy_role(
 
         mess_validator = (message_validator if message_validator else constant.SENTINELS["DEFAULT_MESSAGE_VALIDATOR"],)
 
+        route: ContextVar[dict[Port, _Route]] | None = (
+            ContextVar('fport_session_route', default = {}) if route_by_context else None)
+
     state = _State()
 
+    def reinit_lock(cls: type) -> None:
+        cls.local_lock = Lock()
+
+    _forksafe.register(_State, reinit_lock)
+
     class _Kernel(_KernelTOC):
         def create_port(self, bridge: _PortBridgeTOC) -> _PortRoleTOC | Port:
-            if not block_port:
-                return _create_port_role(port_bridge)
+            if not block_port and state.route is not None:
+                return _create_routed_port(port_bridge, state.route)
+            elif not block_port:
+                return _create_port_role(
+                    port_bridge,
+                    collect_stats = collect_stats,
+                    overhead_budget = overhead_budget)
             else:
                 return _create_noop_port(port_bridge)
         
@@ -179,13 +227,20 @@ def _create_session_policy_role(
         def register_session(self, listen: ListenFunction, target: Port) -> Session:
             with state.local_lock:
 
+                # A session detached by its budget keeps its entry until the context exits.
+                registered = state.session_map.get(target)
+                if registered is not None and registered.end_reason is not None:
+                    raise OccupiedError("Port is already occupied by another session.")
+
                 target._set_listen_func(state.control_permit, listen)
                 
-                if target in state.session_map:
+                if registered is not None:
                     target._remove_listen_func(state.control_permit)
                     raise RuntimeError("Internal error: A session for this target is already registered.")
                 
-                session = Session()
+                session = Session(
+                    target._get_stats(state.control_permit),
+                    target._get_governor(state.control_permit))
                 state.session_map[target] = session
             
             return session
@@ -198,6 +253,24 @@ def _create_session_policy_role(
                 except KeyError as e:
                     raise RuntimeError(f"Internal error: Session not found") from e
 
+        def register_routed_session(self, listen: ListenFunction, target: Port) -> tuple[Session, Token]:
+            route = cast(ContextVar, state.route)
+            target._accept_route(state.control_permit)
+            routes = route.get()
+            if target in routes:
+                raise OccupiedError("Port is already occupied by another session in this context.")
+            session = Session()
+            token = route.set({**routes, target: _Route(listen, session)})
+            return session, token
+
+        def unregister_routed_session(self, target: Port, token: Token) -> None:
+            route = cast(ContextVar, state.route)
+            try:
+                route.reset(token)
+            except ValueError:
+                # Ended in another context than it started; drop only this entry.
+                route.set({k: v for k, v in route.get().items() if k is not target})
+
         def create_port(self) -> Port:
             obj = kernel.create_port(port_bridge)
             return obj.interface if not isinstance(obj, Port) else obj
@@ -205,7 +278,7 @@ def _create_session_policy_role(
         def create_noop_port(self) -> Port:
             return kernel.create_noop_port(port_bridge)
         
-        def session(self, listen: ListenFunction, target: Port) -> ContextManager[SessionState]:
+        def session(self, listen: ListenFunction, target: Port, budget: _BudgetListener | None = None) -> ContextManager[SessionState]:
             if not isinstance(target, Port):
                 raise TypeError(f"target must be Port but receives '{type(target)}'")
             
@@ -214,10 +287,29 @@ def _create_session_policy_role(
             
             @contextmanager
             def session_context():
-                session = core.register_session(listen, target)
+                if budget is None:
+                    session = core.register_session(listen, target)
+                else:
+                    session = core.register_session(budget, target)
+                    budget.bind(session, lambda: target._remove_listen_func(state.control_permit))
                 yield session.get_state_reader()
                 core.unregister_session(target)
-                
+                session.end(EndReason.CLOSED)
+
+            @contextmanager
+            def routed_session_context():
+                session, token = core.register_routed_session(listen if budget is None else budget, target)
+                if budget is not None:
+                    budget.bind(session, lambda: None)
+                try:
+                    yield session.get_state_reader()
+                finally:
+                    core.unregister_routed_session(target, token)
+                    session.end(EndReason.CLOSED)
+
+            if state.route is not None:
+                return routed_session_context()
+
             return session_context()
     
     core = _Core()
@@ -245,8 +337,19 @@ def _create_session_policy_role(
         def create_noop_port(self) -> Port:
             return core.create_noop_port()
         
-        def session(self, listener: ListenFunction, target: Port) -> ContextManager[SessionState]:
-            return core.session(listener, target)
+        def session(
+                self,
+                listener: ListenFunction,
+                target: Port,
+                *,
+                max_messages: int | None = None,
+                max_seconds: float | None = None,
+                until_tags: Iterable[str] | None = None
+        ) -> ContextManager[SessionState]:
+            budget = None
+            if max_messages is not None or max_seconds is not None or until_tags is not None:
+                budget = _BudgetListener(listener, max_messages, max_seconds, until_tags)
+            return core.session(listener, target, budget)
 
     interface = _Interface()
 
@@ -272,7 +375,10 @@ def _create_session_policy_role(
 def create_session_policy(
         *,
         block_port = False,
-        message_validator: SendFunction | None = None
+        message_validator: SendFunction | None = None,
+        collect_stats: bool = False,
+        overhead_budget: OverheadBudget | None = None,
+        route_by_context: bool = False
 ) -> SessionPolicy:
     """
     Create a SessionPolicy interface.
@@ -286,6 +392,23 @@ def create_session_policy(
             Exceptions raised by this validator are not propagated from Port.send(),
             and instead the session ends silently. Such errors can be detected
             through the receiver's SessionState.
+        collect_stats:
+            If True, Ports count sends, deliveries and listener time per
+            session, readable through SessionState.stats. If False, Ports
+            are created without any of this bookkeeping.
+        overhead_budget:
+            If given, each session limits the share of wall time spent in
+            the listener by degrading delivery to sampling or detaching,
+            and recovers when the cost fits the budget again. Transitions
+            are readable through SessionState.governor.
+        route_by_context:
+            If True, sessions are bound to the current `contextvars` context
+            instead of occupying the Port. Each thread, and each asyncio
+            task, only delivers to the session it (or the context it was
+            created from) started, so independent sessions can share a Port
+            concurrently. A second session on the same Port in the same
+            context raises OccupiedError. Cannot be combined with
+            collect_stats or overhead_budget.
 
     Returns:
         SessionPolicy:
@@ -293,7 +416,10 @@ def create_session_policy(
     """
     role = _create_session_policy_role(
         block_port = block_port,
-        message_validator= message_validator)
+        message_validator= message_validator,
+        collect_stats = collect_stats,
+        overhead_budget = overhead_budget,
+        route_by_context = route_by_context)
     return role.interface
 
 
@@ -78,15 +78,22 @@ Scope of Port usage:
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from threading import Lock
+from time import perf_counter_ns
 from typing import TYPE_CHECKING, Protocol
 
 from .protocols import ListenFunction
 from .exceptions import OccupiedError, DeniedError
+from .span import Span
+from .stats import PortStats
+from .governor import OverheadBudget, OverheadGovernor
+from . import _forksafe
 
 if TYPE_CHECKING:
     from .policy import _PortBridgeTOC
+    from .session import Session
 
 class Port(ABC):
     """Interface for sending information from the implementation side.
@@ -96,7 +103,7 @@ class Port(ABC):
         - Thread-unsafe for send() execution to avoid unnecessary
           serialization in concurrent implementations.
     """
-    __slots__ = ()
+    __slots__ = ('__weakref__',)
     @abstractmethod
     def send(self, tag: str, *args, **kwargs) -> None:
         """Send arbitrary information to the registered listener.
@@ -118,6 +125,18 @@ class Port(ABC):
             **kwargs: Arbitrary keyword arguments.
         """
 
+    def span(self, tag: str) -> Span:
+        """Return a Span reporting a code section under the given tag.
+
+        The returned object works as a context manager and as a
+        decorator. Begin/end messages are sent only while a session
+        is attached. See `fport.span` for the message format.
+
+        Args:
+            tag (str): Identifier string for the span messages.
+        """
+        return Span(self, tag, _never_attached)
+
     @abstractmethod
     def _set_listen_func(self, key: object, listen: ListenFunction) -> None:
         """Register a listener callback (internal use only)."""
@@ -130,11 +149,29 @@ class Port(ABC):
     def _get_entry_permit(self) -> object:
         """Return the identifier of the SessionPolicy that created this Port."""
 
+    def _get_stats(self, key: object) -> PortStats | None:
+        """Return the statistics of the current session, if collected (internal use only)."""
+        return None
+
+    def _get_governor(self, key: object) -> OverheadGovernor | None:
+        """Return the overhead governor of the current session, if any (internal use only)."""
+        return None
+
+    def _accept_route(self, key: object) -> None:
+        """Verify that context-routed sessions may be attached (internal use only)."""
+        raise DeniedError("Port does not accept context-routed sessions.")
+
+
+def _never_attached() -> bool:
+    return False
+
 
 class _StateTOC(Protocol):
     lock: Lock
     listen_func: ListenFunction | None
     error: Exception | None
+    stats: PortStats | None
+    governor: OverheadGovernor | None
 
 
 class _RoleTOC(Protocol):
@@ -142,16 +179,26 @@ class _RoleTOC(Protocol):
     interface: Port
 
 
-def _create_port_role(bridge: _PortBridgeTOC) -> _RoleTOC:
+def _create_port_role(
+        bridge: _PortBridgeTOC,
+        *,
+        collect_stats: bool = False,
+        overhead_budget: OverheadBudget | None = None
+) -> _RoleTOC:
 
     @dataclass(slots = True)
     class _State(_StateTOC):
         lock: Lock = field(default_factory = Lock)
         listen_func: ListenFunction | None = field(default = None)
         error: Exception | None = field(default = None)
+        stats: PortStats | None = field(default = None)
+        governor: OverheadGovernor | None = field(default = None)
     
     state = _State()
 
+    def is_attached() -> bool:
+        return state.listen_func is not None and state.error is None
+
     class _Interface(Port):
         __slots__ = ()
         
@@ -169,6 +216,9 @@ def _create_port_role(bridge: _PortBridgeTOC) -> _RoleTOC:
                     session.set_error(e)
             finally:
                 return None
+
+        def span(self, tag: str) -> Span:
+            return Span(self, tag, is_attached)
         
         def _set_listen_func(self, key: object, listen: ListenFunction) -> None:
             with state.lock:
@@ -179,6 +229,10 @@ def _create_port_role(bridge: _PortBridgeTOC) -> _RoleTOC:
                     raise PermissionError("Verification failed")
                 if state.listen_func is not None:
                     raise OccupiedError("Port is already occupied by another session.")
+                if collect_stats:
+                    state.stats = PortStats()
+                if overhead_budget is not None:
+                    state.governor = OverheadGovernor(overhead_budget)
                 state.listen_func = listen
         
         def _remove_listen_func(self, key: object) -> None:
@@ -192,7 +246,72 @@ def _create_port_role(bridge: _PortBridgeTOC) -> _RoleTOC:
         def _get_entry_permit(self) -> object:
             return bridge.get_entry_permit()
 
-    interface = _Interface()
+        def _get_stats(self, key: object) -> PortStats | None:
+            if key is not bridge.get_control_permit():
+                raise PermissionError("Verification failed")
+            return state.stats
+
+        def _get_governor(self, key: object) -> OverheadGovernor | None:
+            if key is not bridge.get_control_permit():
+                raise PermissionError("Verification failed")
+            return state.governor
+
+    class _InstrumentedInterface(_Interface):
+        __slots__ = ()
+
+        def send(self, tag: str, *args, **kwargs) -> None:
+            try:
+                listen_func = state.listen_func
+                if not listen_func:
+                    return None
+                stats = state.stats
+                governor = state.governor
+                if stats is not None:
+                    stats.sends += 1
+                if state.error:
+                    if stats is not None:
+                        stats.filtered += 1
+                    return None
+                if governor is not None and not governor._admit():
+                    if stats is not None:
+                        stats.filtered += 1
+                    return None
+                start = perf_counter_ns()
+                try:
+                    bridge.get_message_validator()(tag, *args, **kwargs)
+                except Exception:
+                    if stats is not None:
+                        stats.filtered += 1
+                    raise
+                listen_start = perf_counter_ns()
+                try:
+                    listen_func(tag, *args, **kwargs)
+                except Exception:
+                    if stats is not None:
+                        stats.failed += 1
+                    raise
+                finally:
+                    end = perf_counter_ns()
+                    if stats is not None:
+                        stats._add_time(tag, end - listen_start)
+                    if governor is not None:
+                        governor._charge(end - start)
+                if stats is not None:
+                    stats.delivered += 1
+            except Exception as e:
+                state.error = e
+                session = bridge.get_session(self)
+                if session is not None:
+                    session.set_error(e)
+            finally:
+                return None
+
+    interface = _InstrumentedInterface() if collect_stats or overhead_budget else _Interface()
+
+    def reinit_lock(_interface: Port) -> None:
+        state.lock = Lock()
+
+    _forksafe.register(interface, reinit_lock)
 
     @dataclass(slots = True)
     class _Role(_RoleTOC):
@@ -232,3 +351,59 @@ def _create_noop_port(bridge: _PortBridgeTOC) -> Port:
 
     return interface
 
+
+
+@dataclass(slots = True)
+class _Route:
+    """A session bound to a context: its listener and latched error."""
+    listen_func: ListenFunction
+    session: Session
+    error: Exception | None = None
+
+
+def _create_routed_port(bridge: _PortBridgeTOC, route: ContextVar[dict[Port, _Route]]) -> Port:
+    """Factory: create a Port that delivers to the session of the current context."""
+
+    def is_attached() -> bool:
+        entry = route.get().get(interface)
+        return entry is not None and entry.error is None
+
+    class _Interface(Port):
+        __slots__ = ()
+
+        def send(self, tag: str, *args, **kwargs) -> None:
+            entry = None
+            try:
+                entry = route.get().get(self)
+                if entry is not None and not entry.error:
+                    bridge.get_message_validator()(tag, *args, **kwargs)
+                    entry.listen_func(tag, *args, **kwargs)
+            except Exception as e:
+                if entry is not None:
+                    entry.error = e
+                    entry.session.set_error(e)
+            finally:
+                return None
+
+        def span(self, tag: str) -> Span:
+            return Span(self, tag, is_attached)
+
+        def _set_listen_func(self, key: object, listen: ListenFunction) -> None:
+            if key is not bridge.get_control_permit():
+                raise PermissionError("Verification failed")
+            raise DeniedError("Port accepts context-routed sessions only.")
+
+        def _remove_listen_func(self, key: object) -> None:
+            if key is not bridge.get_control_permit():
+                raise PermissionError("Verification failed")
+
+        def _get_entry_permit(self) -> object:
+            return bridge.get_entry_permit()
+
+        def _accept_route(self, key: object) -> None:
+            if key is not bridge.get_control_permit():
+                raise PermissionError("Verification failed")
+
+    interface = _Interface()
+
+    return interface
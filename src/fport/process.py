@@ -0,0 +1,470 @@
+"""
+Cross-process delivery for fport.
+
+Ports and sessions live in a single process. ProcessRelay lets worker
+processes (multiprocessing, ProcessPoolExecutor, ...) send messages to
+a Port of the parent process, so that listeners attached there through
+a normal session receive them.
+
+    policy = create_session_policy()
+    port = policy.create_port()
+
+    with ProcessRelay(port) as relay, policy.session(listener, port):
+        remote = relay.handle()      # picklable
+        with ProcessPoolExecutor() as pool:
+            pool.map(work, [remote] * 8, range(8))
+
+    def work(port, n):
+        port.send("work", n)
+
+The handle is a Port. In the worker, it connects lazily to the relay on
+the first send through a local socket or pipe
+(`multiprocessing.connection`), buffers messages and ships them in
+batches. Batches are sent when `batch_size` messages are buffered, when
+the oldest buffered message is older than `max_delay` seconds at the
+time of a send, on flush(), and when the worker process exits normally.
+Per worker, messages arrive in the order they were sent.
+
+Design note:
+    Like Port.send(), the handle never raises to the sender; transport
+    errors disable the handle in that process. Arguments must be
+    picklable; a batch that cannot be pickled is dropped.
+
+    Buffering is thread-unsafe like Port.send(). Only the write of a
+    complete batch is serialized, so that batches of concurrent
+    threads do not interleave on the connection.
+
+    A handle inherited through fork() does not share the parent's
+    connection or buffer; it reconnects on first use in the child.
+
+When only per-tag counts are needed, SharedTagCounter counts messages
+of all processes in shared memory without shipping them at all.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import weakref
+from multiprocessing import shared_memory
+from multiprocessing import util as _mp_util
+from multiprocessing.connection import Client, Connection, Listener, wait
+from threading import Lock
+from time import monotonic
+from typing import Any, Iterable
+
+from ._wakeup import wake_listener
+from .port import Port
+from .protocols import ListenFunction
+from .exceptions import DeniedError
+from .span import NO_PARENT, Span
+
+
+class ProcessRelay:
+    """Parent-side receiver that re-sends messages from worker processes through a Port."""
+
+    def __init__(
+            self,
+            port: Port,
+            *,
+            address: Any = None,
+            family: str | None = None,
+            batch_size: int = 64,
+            max_delay: float = 0.1):
+        if not isinstance(port, Port):
+            raise TypeError(f"port must be Port but receives '{type(port)}'")
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self._port = port
+        self._authkey = os.urandom(16)
+        self._listener = Listener(address, family, authkey = self._authkey)
+        self._batch_size = batch_size
+        self._max_delay = max_delay
+        self._lock = Lock()
+        self._readers: list[threading.Thread] = []
+        self._closing = False
+        self._received = 0
+        self._acceptor = threading.Thread(
+            target = self._accept_loop, name = 'fport-relay-accept', daemon = True)
+        self._acceptor.start()
+
+    @property
+    def address(self) -> Any:
+        return self._listener.address
+
+    @property
+    def received(self) -> int:
+        """Number of messages re-sent through the Port so far."""
+        return self._received
+
+    def handle(self) -> RemotePort:
+        """Return a picklable Port for worker processes."""
+        return RemotePort(self._listener.address, self._authkey, self._batch_size, self._max_delay)
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                # Closed listener, or a client failing authentication.
+                if self._closing:
+                    return
+                continue
+            # Connections accepted while closing may still carry a final batch.
+            reader = threading.Thread(
+                target = self._read_loop, args = (conn,), name = 'fport-relay-read', daemon = True)
+            with self._lock:
+                self._readers.append(reader)
+            reader.start()
+            if self._closing:
+                return
+
+    def _read_loop(self, conn: Connection) -> None:
+        send = self._port.send
+        try:
+            while True:
+                if not wait([conn], 0.05):
+                    if self._closing:
+                        return
+                    continue
+                try:
+                    batch = conn.recv()
+                except EOFError:
+                    return
+                for tag, args, kwargs in batch:
+                    send(tag, *args, **kwargs)
+                with self._lock:
+                    self._received += len(batch)
+        except Exception:
+            return
+        finally:
+            conn.close()
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Stop accepting workers and finish reading.
+
+        Waits up to `timeout` seconds for connected workers to close
+        their connections, then stops reading.
+        """
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+        # Wake up the accept loop, which then sees the closing flag.
+        wake_listener(self._listener.address)
+        try:
+            self._listener.close()
+        except Exception:
+            pass
+        deadline = monotonic() + timeout
+        self._acceptor.join(max(0.0, deadline - monotonic()))
+        with self._lock:
+            readers = list(self._readers)
+        for reader in readers:
+            reader.join(max(0.0, deadline - monotonic()))
+
+    def __enter__(self) -> ProcessRelay:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+class RemotePort(Port):
+    """Port handle for worker processes. Created by ProcessRelay.handle().
+
+    Sessions cannot be attached to a RemotePort; listeners are attached
+    to the Port given to the relay in the parent process.
+
+    Spans are reported while the handle works. Their ids and parent ids
+    are combined with the worker's pid (``pid << 32 | id``), so spans of
+    different workers do not share ids.
+    """
+
+    __slots__ = ('_address', '_authkey', '_batch_size', '_max_delay',
+                 '_pid', '_conn', '_buffer', '_first_at', '_write_lock', '_broken', '_finalizer')
+
+    def __init__(self, address: Any, authkey: bytes, batch_size: int, max_delay: float):
+        self._address = address
+        self._authkey = authkey
+        self._batch_size = batch_size
+        self._max_delay = max_delay
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._conn: Connection | None = None
+        self._buffer: list[tuple[str, tuple, dict]] = []
+        self._first_at = 0.0
+        self._write_lock = Lock()
+        self._broken = False
+        self._finalizer = None
+
+    def __reduce__(self):
+        return (_restore_remote_port, (self._address, self._authkey, self._batch_size, self._max_delay))
+
+    def send(self, tag: str, *args, **kwargs) -> None:
+        try:
+            if self._pid != os.getpid():
+                self._reset()
+            if self._broken:
+                return None
+            if self._finalizer is None:
+                # Ship the last partial batch when the process exits.
+                self._finalizer = _mp_util.Finalize(
+                    None, RemotePort._finalize, args = (self,), exitpriority = 10)
+            buffer = self._buffer
+            if not buffer:
+                self._first_at = monotonic()
+            buffer.append((tag, args, kwargs))
+            if len(buffer) >= self._batch_size or monotonic() - self._first_at >= self._max_delay:
+                self.flush()
+        except Exception:
+            self._broken = True
+        finally:
+            return None
+
+    def span(self, tag: str) -> Span:
+        return Span(_RemoteSpanPort(self), tag, self._is_working)
+
+    def _is_working(self) -> bool:
+        return not self._broken or self._pid != os.getpid()
+
+    def flush(self) -> None:
+        """Ship buffered messages to the relay. Never raises."""
+        try:
+            if self._pid != os.getpid():
+                self._reset()
+                return
+            if self._broken or not self._buffer:
+                return
+            batch = self._buffer
+            self._buffer = []
+            with self._write_lock:
+                conn = self._conn
+                if conn is None:
+                    conn = self._conn = Client(self._address, authkey = self._authkey)
+                try:
+                    data = pickle.dumps(batch)
+                except Exception:
+                    return
+                conn.send_bytes(data)
+        except Exception:
+            self._broken = True
+
+    def _finalize(self) -> None:
+        self.flush()
+        try:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Flush and close the connection of this process."""
+        self._finalize()
+        self._conn = None
+        self._broken = True
+
+    def _set_listen_func(self, key: object, listen: ListenFunction) -> None:
+        raise DeniedError("Sessions cannot be attached to a RemotePort.")
+
+    def _remove_listen_func(self, key: object) -> None:
+        pass
+
+    def _get_entry_permit(self) -> object:
+        return None
+
+
+class _RemoteSpanPort:
+    '''Sends span messages through a RemotePort with ids made unique across processes.'''
+
+    __slots__ = ('_remote',)
+
+    def __init__(self, remote: RemotePort):
+        self._remote = remote
+
+    def send(self, tag: str, phase, span_id: int, parent_id: int, t_ns: int) -> None:
+        high = os.getpid() << 32
+        if parent_id != NO_PARENT:
+            parent_id |= high
+        self._remote.send(tag, phase, span_id | high, parent_id, t_ns)
+
+    def span(self, tag: str) -> Span:
+        return self._remote.span(tag)
+
+
+# Handles unpickled in the same process share one connection and buffer,
+# so that a pool worker does not connect once per task.
+_restored: dict[Any, RemotePort] = {}
+_restored_pid = os.getpid()
+
+
+def _restore_remote_port(address: Any, authkey: bytes, batch_size: int, max_delay: float) -> RemotePort:
+    global _restored_pid
+    if _restored_pid != os.getpid():
+        _restored.clear()
+        _restored_pid = os.getpid()
+    handle = _restored.get(address)
+    if handle is None or handle._authkey != authkey:
+        handle = _restored[address] = RemotePort(address, authkey, batch_size, max_delay)
+    return handle
+
+
+class SharedTagCounter:
+    """Per-tag message counter shared by a group of processes.
+
+    A counter-only listener: `listen` increments the count of the tag in
+    a `multiprocessing.shared_memory` block and discards the arguments.
+    Tags are interned up front; messages with other tags are counted
+    together in `other`.
+
+    Each process claims its own row of counters on first use and only
+    ever writes to that row, so no lock is taken per message. Reads sum
+    all rows. Rows are claimed through atomic file creation in a
+    private directory, which works with every start method and with
+    counters pickled into pool tasks.
+
+        counter = SharedTagCounter(["hit", "miss"])
+        # in each worker process
+        with policy.session(counter.listen, port):
+            ...
+        # in the parent
+        counter.counts()   # {"hit": ..., "miss": ...}
+
+    The creating process owns the shared memory and must call close()
+    (or use the counter as a context manager) to release it.
+
+    Note:
+        Like Port.send(), listen() does not serialize concurrent
+        threads of one process, so increments from threads of the same
+        process may race. When more than `max_processes` processes have
+        claimed rows, later processes share the last row.
+    """
+
+    def __init__(self, tags: Iterable[str], *, max_processes: int = 64, _attach: tuple | None = None):
+        self._tags = tuple(dict.fromkeys(tags))
+        self._index = {tag: i for i, tag in enumerate(self._tags)}
+        self._width = len(self._tags) + 1
+        self._rows = max_processes
+        if _attach is None:
+            if max_processes < 1:
+                raise ValueError("max_processes must be positive")
+            self._shm = shared_memory.SharedMemory(create = True, size = 8 * self._rows * self._width)
+            self._shm.buf[:] = bytes(len(self._shm.buf))
+            self._claim_dir = tempfile.mkdtemp(prefix = 'fport-counter-')
+            self._owner = True
+        else:
+            name, self._claim_dir = _attach
+            self._shm = _attach_shared_memory(name)
+            self._owner = False
+        self._view = self._shm.buf.cast('Q')
+        self._pid = -1
+        self._base = -1
+        self._release = weakref.finalize(
+            self, _release_shared_memory, self._view, self._shm,
+            os.getpid() if self._owner else None, self._claim_dir)
+
+    def __reduce__(self):
+        return (_restore_shared_counter, (self._shm.name, self._tags, self._rows, self._claim_dir))
+
+    def _claim_row(self) -> int:
+        for row in range(self._rows):
+            path = os.path.join(self._claim_dir, str(row))
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            os.close(fd)
+            return row
+        return self._rows - 1
+
+    def listen(self, tag: str, *args, **kwargs) -> None:
+        if self._pid != os.getpid():
+            self._base = self._claim_row() * self._width
+            self._pid = os.getpid()
+        self._view[self._base + self._index.get(tag, self._width - 1)] += 1
+
+    @property
+    def tags(self) -> tuple[str, ...]:
+        return self._tags
+
+    def _column(self, column: int) -> int:
+        view = self._view
+        width = self._width
+        return sum(view[row * width + column] for row in range(self._rows))
+
+    def count(self, tag: str) -> int:
+        """Total count of `tag` over all processes."""
+        return self._column(self._index[tag])
+
+    @property
+    def other(self) -> int:
+        """Total count of messages whose tag was not interned."""
+        return self._column(self._width - 1)
+
+    def counts(self) -> dict[str, int]:
+        """Total counts of all interned tags over all processes."""
+        totals = [0] * self._width
+        view = self._view
+        width = self._width
+        for row in range(self._rows):
+            base = row * width
+            for column in range(width):
+                totals[column] += view[base + column]
+        return dict(zip(self._tags, totals))
+
+    def close(self) -> None:
+        """Detach; in the creating process also release the shared memory."""
+        self._release()
+
+    @property
+    def closed(self) -> bool:
+        return not self._release.alive
+
+    def __enter__(self) -> SharedTagCounter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+def _release_shared_memory(
+        view: memoryview,
+        shm: shared_memory.SharedMemory,
+        owner_pid: int | None,
+        claim_dir: str) -> None:
+    view.release()
+    shm.close()
+    if owner_pid == os.getpid():
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(claim_dir, ignore_errors = True)
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    # Child processes share the resource tracker of the creating process,
+    # so attaching does not hand the block over to another tracker.
+    return shared_memory.SharedMemory(name)
+
+
+_attached: dict[str, SharedTagCounter] = {}
+_attached_pid = os.getpid()
+
+
+def _restore_shared_counter(name: str, tags: tuple[str, ...], rows: int, claim_dir: str) -> SharedTagCounter:
+    global _attached_pid
+    if _attached_pid != os.getpid():
+        _attached.clear()
+        _attached_pid = os.getpid()
+    counter = _attached.get(name)
+    if counter is None or counter.closed:
+        counter = _attached[name] = SharedTagCounter(tags, max_processes = rows, _attach = (name, claim_dir))
+    return counter
@@ -8,8 +8,25 @@ any error has occurred.
 
 from __future__ import annotations
 
+import enum
 from abc import ABC, abstractmethod
-from threading import Lock
+from threading import Event, Lock
+from time import monotonic
+from typing import Callable, Iterable
+
+from .stats import PortStats
+from .governor import OverheadGovernor
+from .protocols import ListenFunction
+from . import _forksafe
+
+
+class EndReason(enum.Enum):
+    CLOSED = 'session context exited'
+    ERROR = 'error recorded'
+    MESSAGE_BUDGET = 'message budget exhausted'
+    TIME_BUDGET = 'time budget exhausted'
+    TAG_COVERAGE = 'all goal tags observed'
+
 
 class SessionState(ABC):
     """Read-only interface for observing a session's state."""
@@ -24,6 +41,48 @@ class SessionState(ABC):
     def error(self) -> Exception | None:
         """Error that caused the session to stop, or None if none."""
 
+    @property
+    @abstractmethod
+    def stats(self) -> PortStats | None:
+        """Delivery statistics, or None if the policy does not collect them.
+
+        Reading does not take a lock.
+        """
+
+    @property
+    @abstractmethod
+    def governor(self) -> OverheadGovernor | None:
+        """Overhead governor state, or None if the policy has no budget.
+
+        Reading does not take a lock.
+        """
+
+    @property
+    @abstractmethod
+    def end_reason(self) -> EndReason | None:
+        """Why the session stopped delivering, or None while it delivers.
+
+        A session ended by its budget is not a failure: `ok` stays True.
+        """
+
+    @abstractmethod
+    def add_failure_callback(self, fn: Callable[[Exception], None]) -> None:
+        """Call `fn` with the first error when the session fails.
+
+        If the session has already failed, `fn` is called immediately.
+        Otherwise it is called on the thread that records the error,
+        which is usually the sender's thread inside Port.send().
+        Exceptions raised by `fn` are ignored.
+        """
+
+    @abstractmethod
+    def wait_failure(self, timeout: float | None = None) -> bool:
+        """Block until the session fails or `timeout` elapses.
+
+        Returns:
+            True if the session has failed.
+        """
+
 
 class Session:
     """Internal session controller.
@@ -32,11 +91,26 @@ class Session:
     a SessionState reader for external observers.
     """
     
-    __slots__ = ('_lock', '_active', '_error')
-    def __init__(self):
+    __slots__ = ('_lock', '_active', '_error', '_stats', '_governor',
+                 '_failed', '_failure_callbacks', '_end_reason', '_deadline', '__weakref__')
+    def __init__(self, stats: PortStats | None = None, governor: OverheadGovernor | None = None):
         self._lock = Lock()
         self._active = True
         self._error = None
+        self._stats = stats
+        self._governor = governor
+        self._failed = Event()
+        self._failure_callbacks: list[Callable[[Exception], None]] = []
+        self._end_reason: EndReason | None = None
+        self._deadline: float | None = None
+        _forksafe.register(self, Session._reinit_lock)
+
+    def _reinit_lock(self) -> None:
+        self._lock = Lock()
+        failed = Event()
+        if self._failed.is_set():
+            failed.set()
+        self._failed = failed
     
     @property
     def ok(self) -> bool:
@@ -50,12 +124,61 @@ class Session:
         with self._lock:
             return self._error
 
+    @property
+    def stats(self) -> PortStats | None:
+        """Delivery statistics of the session, if collected."""
+        return self._stats
+
+    @property
+    def governor(self) -> OverheadGovernor | None:
+        """Overhead governor of the session, if any."""
+        return self._governor
+
+    @property
+    def end_reason(self) -> EndReason | None:
+        """Why the session stopped delivering, if it did."""
+        with self._lock:
+            deadline = self._deadline
+            if self._end_reason is None and deadline is not None and monotonic() >= deadline:
+                self._end_reason = EndReason.TIME_BUDGET
+            return self._end_reason
+
+    def end(self, reason: EndReason) -> bool:
+        """Record why the session ended. Only the first reason is kept."""
+        with self._lock:
+            if self._end_reason is not None:
+                return False
+            self._end_reason = reason
+            return True
+
     def set_error(self, exc: Exception) -> None:
         """Mark the session as failed with the given exception."""
         with self._lock:
-            if self._error is None:
+            first = self._error is None
+            if first:
                 self._error = exc
+            if self._end_reason is None:
+                self._end_reason = EndReason.ERROR
             self._active = False
+            callbacks = self._failure_callbacks
+            self._failure_callbacks = []
+        if first:
+            self._failed.set()
+            for fn in callbacks:
+                _call_failure_callback(fn, exc)
+
+    def add_failure_callback(self, fn: Callable[[Exception], None]) -> None:
+        """Call `fn` with the first error once the session fails."""
+        with self._lock:
+            error = self._error
+            if error is None:
+                self._failure_callbacks.append(fn)
+                return
+        _call_failure_callback(fn, error)
+
+    def wait_failure(self, timeout: float | None = None) -> bool:
+        """Block until the session fails; return whether it has failed."""
+        return self._failed.wait(timeout)
     
     def get_state_reader(self):
         """Return a read-only view of the session state."""
@@ -70,8 +193,100 @@ class Session:
             @property
             def error(self) -> Exception | None:
                 return outer.error
+
+            @property
+            def stats(self) -> PortStats | None:
+                return outer._stats
+
+            @property
+            def governor(self) -> OverheadGovernor | None:
+                return outer._governor
+
+            @property
+            def end_reason(self) -> EndReason | None:
+                return outer.end_reason
+
+            def add_failure_callback(self, fn: Callable[[Exception], None]) -> None:
+                outer.add_failure_callback(fn)
+
+            def wait_failure(self, timeout: float | None = None) -> bool:
+                return outer.wait_failure(timeout)
         
         return _SessionState()
 
 
+def _call_failure_callback(fn: Callable[[Exception], None], exc: Exception) -> None:
+    try:
+        fn(exc)
+    except Exception:
+        pass
+
+
+class _BudgetListener:
+    """Listener wrapper that ends its session when a budget is exhausted.
+
+    Budgets are checked on the sender's thread without locks, so
+    concurrent sends may deliver slightly more than `max_messages`.
+    """
+
+    __slots__ = ('_listen', '_session', '_detach', '_remaining', '_max_seconds', '_deadline', '_pending_tags')
+    def __init__(
+            self,
+            listen: ListenFunction,
+            max_messages: int | None,
+            max_seconds: float | None,
+            until_tags: Iterable[str] | None):
+        if max_messages is not None and max_messages < 1:
+            raise ValueError("max_messages must be positive")
+        if max_seconds is not None and max_seconds <= 0:
+            raise ValueError("max_seconds must be positive")
+        self._listen = listen
+        self._session: Session | None = None
+        self._detach: Callable[[], None] = _no_detach
+        self._remaining = max_messages
+        self._max_seconds = max_seconds
+        self._deadline: float | None = None
+        self._pending_tags = None if until_tags is None else set(until_tags)
+        if self._pending_tags is not None and not self._pending_tags:
+            raise ValueError("until_tags must not be empty")
+
+    def bind(self, session: Session, detach: Callable[[], None]) -> None:
+        """Attach the session to end and the function returning the Port to its detached state."""
+        if self._max_seconds is not None:
+            self._deadline = monotonic() + self._max_seconds
+        session._deadline = self._deadline
+        self._session = session
+        self._detach = detach
+
+    def __call__(self, tag: str, *args, **kwargs) -> None:
+        session = self._session
+        if session is None:
+            self._listen(tag, *args, **kwargs)
+            return
+        if session._end_reason is not None:
+            self._detach()
+            return
+        if self._deadline is not None and monotonic() >= self._deadline:
+            session.end(EndReason.TIME_BUDGET)
+            self._detach()
+            return
+
+        self._listen(tag, *args, **kwargs)
+
+        reason = None
+        if self._remaining is not None:
+            self._remaining -= 1
+            if self._remaining <= 0:
+                reason = EndReason.MESSAGE_BUDGET
+        pending = self._pending_tags
+        if pending is not None:
+            pending.discard(tag)
+            if not pending and reason is None:
+                reason = EndReason.TAG_COVERAGE
+        if reason is not None:
+            session.end(reason)
+            self._detach()
+
 
+def _no_detach() -> None:
+    pass
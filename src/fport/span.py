@@ -0,0 +1,112 @@
+"""
+Span support for fport.
+
+A span marks a section of code on the implementation side. Entering
+and leaving the section is reported through the Port as a pair of
+messages sharing the same span id, so that listeners can measure
+the time spent in the section.
+
+Message format:
+    A span sends two messages under the span's tag:
+
+        port.send(tag, SpanPhase.BEGIN, span_id, parent_id, t_ns)
+        port.send(tag, SpanPhase.END, span_id, parent_id, t_ns)
+
+    ``t_ns`` is taken from ``time.perf_counter_ns()``.
+    ``parent_id`` is the id of the innermost enclosing span in the
+    current context, or -1 for a top level span.
+
+Design note:
+    Spans follow the same rules as Port.send(): nothing is sent and no
+    timestamp is taken while no session is attached, and exceptions are
+    never propagated to the implementation side. Exceptions raised by
+    the enclosed code are never suppressed.
+"""
+
+from __future__ import annotations
+
+import enum
+import functools
+import itertools
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from .port import Port
+
+
+NO_PARENT = -1
+
+# next() on itertools.count is atomic under the GIL.
+_id_source = itertools.count()
+
+_current_span: ContextVar[int] = ContextVar('fport_current_span', default = NO_PARENT)
+
+
+class SpanPhase(enum.Enum):
+    BEGIN = 'span begin'
+    END = 'span end'
+
+
+class Span:
+    """Context manager and decorator that reports a code section.
+
+    A Span instance is single-use as a context manager. When used as a
+    decorator, a new Span is created for each call of the decorated
+    function.
+    """
+
+    __slots__ = ('_port', '_tag', '_attached', '_id', '_parent', '_token')
+    def __init__(self, port: Port, tag: str, attached: Callable[[], bool]):
+        self._port = port
+        self._tag = tag
+        self._attached = attached
+        self._id = NO_PARENT
+        self._parent = NO_PARENT
+        self._token = None
+
+    def __enter__(self) -> Span:
+        try:
+            if not self._attached():
+                return self
+            self._id = next(_id_source)
+            self._parent = _current_span.get()
+            self._token = _current_span.set(self._id)
+            self._port.send(self._tag, SpanPhase.BEGIN, self._id, self._parent, perf_counter_ns())
+        except Exception:
+            pass
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            token = self._token
+            if token is None:
+                return False
+            self._token = None
+            t_ns = perf_counter_ns()
+            _current_span.reset(token)
+            self._port.send(self._tag, SpanPhase.END, self._id, self._parent, t_ns)
+        except Exception:
+            pass
+        return False
+
+    def __call__(self, fn: Callable) -> Callable:
+        port = self._port
+        tag = self._tag
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with port.span(tag):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    @property
+    def span_id(self) -> int:
+        """Id of this span, or -1 if nothing was reported."""
+        return self._id
+
+
+def is_span_message(args: tuple) -> bool:
+    """Whether positional arguments of a message form a span event."""
+    return len(args) == 4 and isinstance(args[0], SpanPhase)
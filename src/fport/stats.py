@@ -0,0 +1,73 @@
+"""
+Delivery statistics for fport.
+
+When a SessionPolicy is created with ``collect_stats=True``, each
+session gets a PortStats that counts what happened to the messages
+sent through its Port. The statistics are read through
+``SessionState.stats``.
+
+Design note:
+    Port.send() is thread-unsafe and never serializes the sender, and
+    the counters here follow the same rule: they are updated without
+    locks, so concurrent sends may lose increments. Reading never
+    takes a lock either.
+
+    Policies created without ``collect_stats`` use a Port implementation
+    that contains none of this bookkeeping.
+"""
+
+from __future__ import annotations
+
+
+class PortStats:
+    '''Counters of a single session on a Port.
+
+    Attributes:
+        sends: send() calls made while the session was attached.
+        delivered: Messages the listener returned from normally.
+        filtered: Messages not delivered because the message validator
+            rejected them or the session had already failed.
+        failed: Messages on which the listener raised.
+    '''
+
+    __slots__ = ('sends', 'delivered', 'filtered', 'failed', '_timings')
+    def __init__(self):
+        self.sends: int = 0
+        self.delivered: int = 0
+        self.filtered: int = 0
+        self.failed: int = 0
+        self._timings: dict[str, ListenerTiming] = {}
+
+    def _add_time(self, tag: str, elapsed_ns: int) -> None:
+        timing = self._timings.get(tag)
+        if timing is None:
+            timing = self._timings[tag] = ListenerTiming()
+        timing.calls += 1
+        timing.total_ns += elapsed_ns
+        if elapsed_ns > timing.max_ns:
+            timing.max_ns = elapsed_ns
+
+    def get_timing(self, tag: str) -> ListenerTiming:
+        return self._timings[tag]
+
+    def get_timings(self) -> dict[str, ListenerTiming]:
+        return dict(self._timings)
+
+    @property
+    def listener_ns(self) -> int:
+        """Total time spent in the listener over all tags."""
+        return sum(t.total_ns for t in list(self._timings.values()))
+
+
+class ListenerTiming:
+    '''Time spent in the listener for a tag, in nanoseconds.'''
+
+    __slots__ = ('calls', 'total_ns', 'max_ns')
+    def __init__(self):
+        self.calls: int = 0
+        self.total_ns: int = 0
+        self.max_ns: int = 0
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
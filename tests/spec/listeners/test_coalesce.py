@@ -0,0 +1,69 @@
+import fport
+from fport.listeners import Coalescer, Debouncer
+from fport.observer import ProcessObserver
+
+
+def test_coalescer_merges_runs():
+    """Consecutive identical messages must reach downstream once with a count."""
+    seen = []
+    coalescer = Coalescer(lambda tag, *args, **kwargs: seen.append((tag, args, kwargs)), count_key = "repeat")
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    with policy.session(coalescer.listen, port):
+        for _ in range(1000):
+            port.send("tick", 1)
+        port.send("tick", 2)
+        port.send("done")
+    coalescer.flush()
+
+    assert seen == [("tick", (1,), {"repeat": 1000}), ("tick", (2,), {"repeat": 1}),
+                    ("done", (), {"repeat": 1})]
+    assert coalescer.received == 1002 and coalescer.emitted == 3
+
+
+def test_coalescer_max_run_and_observer_downstream():
+    """A run must be cut at max_run and may feed a ProcessObserver."""
+    observer = ProcessObserver({"tick": lambda v, repeat: repeat <= 3})
+    coalescer = Coalescer(observer, count_key = "repeat", max_run = 3)
+    for _ in range(7):
+        coalescer.listen("tick", 0)
+    coalescer.flush()
+
+    assert observer.get_stat("tick").count == 3
+    assert not observer.violation
+
+
+def test_coalescer_and_debouncer_pass_messages_unchanged_by_default():
+    """Without count_key, existing conditions of a ProcessObserver must work downstream."""
+    observer = ProcessObserver({"tick": lambda v: v >= 0})
+    coalescer = Coalescer(observer)
+    debouncer = Debouncer(observer, 1.0, clock = lambda: 0.0)
+    for _ in range(3):
+        coalescer.listen("tick", 1)
+        debouncer.listen("tick", 2)
+    coalescer.flush()
+    debouncer.flush()
+
+    assert observer.get_stat("tick").count == 2
+    assert not observer.violation
+
+
+def test_debouncer_windows_per_tag():
+    """Only the last message of a window must be passed on, per tag."""
+    now = [0.0]
+    seen = []
+    debouncer = Debouncer(lambda tag, *args, **kwargs: seen.append((tag, args, kwargs)), 1.0,
+                          tags = ("progress",), count_key = "repeat", clock = lambda: now[0])
+    for i in range(5):
+        debouncer.listen("progress", i)
+    debouncer.listen("other", "x")
+    now[0] = 1.5
+    debouncer.listen("progress", 99)
+    debouncer.poll()
+    now[0] = 3.0
+    debouncer.poll()
+
+    assert seen == [("other", ("x",), {}),
+                    ("progress", (4,), {"repeat": 5}),
+                    ("progress", (99,), {"repeat": 1})]
@@ -0,0 +1,86 @@
+import csv
+import math
+import os
+from array import array
+
+import pytest
+
+import fport
+from fport.listeners import ColumnarCapture
+
+
+def test_columnar_capture_types_columns():
+    """Numeric fields must go to typed arrays and widen only when needed."""
+    capture = ColumnarCapture()
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    with policy.session(capture.listen, port):
+        port.send("req", 1, 0.5, ok = True)
+        port.send("req", 2, 1.5, ok = False)
+        port.send("req", 3.5, "x", ok = True, extra = 1)
+        port.send("req", 4)
+
+    table = capture.columns("req")
+    assert list(table) == ["0", "1", "ok"]
+    assert table["0"] == [1.0, 2.0, 3.5, 4.0]
+    assert table["1"][:3] == [0.5, 1.5, "x"] and table["1"][3] is None
+    assert table["ok"] == [True, False, True, None]
+    assert capture.dropped == 1 and capture.rows("req") == 4
+    column = capture._tables["req"].columns[0]
+    assert isinstance(column.data, array) and column.data.itemsize == 8
+
+
+def test_columnar_capture_missing_int_becomes_nan():
+    """A missing value in an int column must widen it to float with NaN."""
+    capture = ColumnarCapture(fields = {"v": (0, "w")})
+    capture.listen("v", 1, w = 2)
+    capture.listen("v", 2)
+    table = capture.columns("v")
+    assert table["0"] == [1, 2]
+    assert table["w"][0] == 2 and math.isnan(table["w"][1])
+
+
+def test_columnar_capture_spills_csv(tmp_path):
+    """Rows must be appended to the CSV file in chunks and cleared from memory."""
+    capture = ColumnarCapture(spill_dir = tmp_path, spill_rows = 2)
+    for i in range(5):
+        capture.listen("a/b", i, i * 2)
+    assert capture.rows("a/b") == 1
+    capture.flush()
+
+    (path,) = capture.spilled
+    assert os.path.dirname(path) == str(tmp_path) and path.endswith(".csv")
+    with open(path, newline = "") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["0", "1"]
+    assert rows[1:] == [[str(i), str(i * 2)] for i in range(5)]
+
+
+def test_columnar_capture_spill_files_are_unique_per_tag(tmp_path):
+    """Tags with the same sanitized name must not overwrite each other's files."""
+    capture = ColumnarCapture(spill_dir = tmp_path, spill_rows = 1)
+    capture.listen("a/b", 1)
+    capture.listen("a_b", 2)
+    capture.listen("a/b", 3)
+    assert len(set(capture.spilled)) == 2
+    assert capture.spilled[1] == str(tmp_path / "a_b.csv")
+    contents = []
+    for path in capture.spilled:
+        with open(path, newline = "") as f:
+            contents.append(list(csv.reader(f))[1:])
+    assert contents == [[["1"], ["3"]], [["2"]]]
+
+
+def test_columnar_capture_numpy(tmp_path):
+    """Columns must convert to NumPy and spill as .npy files."""
+    np = pytest.importorskip("numpy")
+    capture = ColumnarCapture(spill_dir = tmp_path, spill_rows = 3, spill_format = "npy")
+    for i in range(4):
+        capture.listen("t", i, flag = i % 2 == 0)
+    arrays = capture.to_numpy("t")
+    assert arrays["0"].tolist() == [3] and arrays["flag"].dtype == bool
+    capture.flush()
+
+    assert np.load(tmp_path / "t.0.00000.npy").tolist() == [0, 1, 2]
+    assert np.load(tmp_path / "t.flag.00001.npy").tolist() == [False]
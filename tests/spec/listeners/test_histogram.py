@@ -0,0 +1,123 @@
+import pickle
+import random
+
+import pytest
+
+import fport
+from fport.listeners import Histogram, HistogramListener, SpanAggregator
+from fport.span import SpanPhase
+
+
+def test_histogram_small_values_are_exact():
+    """Values below the sub-bucket count must be reported exactly."""
+    h = Histogram(sub_bucket_bits=7)
+    for v in range(100):
+        h.record(v)
+    assert h.count == 100
+    assert h.min == 0
+    assert h.max == 99
+    assert h.value_at_percentile(50) == 49
+    assert h.value_at_percentile(100) == 99
+
+
+def test_histogram_relative_error_is_bounded():
+    """Percentiles of large values must stay within the bucket precision."""
+    rng = random.Random(0)
+    values = sorted(rng.randrange(1, 10**9) for _ in range(10000))
+    h = Histogram(sub_bucket_bits=7)
+    for v in values:
+        h.record(v)
+    for p in (50, 99, 99.9):
+        exact = values[int(len(values) * p / 100 + 0.999999) - 1]
+        assert abs(h.value_at_percentile(p) - exact) <= exact * 2 / 128
+
+
+def test_histogram_rejects_negative_and_clamps_overflow():
+    h = Histogram(sub_bucket_bits=4, max_bits=16)
+    with pytest.raises(ValueError):
+        h.record(-1)
+    h.record(1 << 40)
+    assert h.count == 1
+    assert h.max == 1 << 40
+
+
+def test_histogram_merge_and_pickle():
+    """Histograms must merge and survive a pickle round trip."""
+    a = Histogram()
+    b = Histogram()
+    for v in range(1000):
+        (a if v % 2 else b).record(v)
+    b = pickle.loads(pickle.dumps(b))
+    a.merge(b)
+    assert a.count == 1000
+    assert a.min == 0
+    assert a.max == 999
+    with pytest.raises(ValueError):
+        a.merge(Histogram(sub_bucket_bits=3))
+
+
+def test_histogram_listener_records_spans_and_values():
+    """The listener must record span durations and numeric payloads per tag."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    listener = HistogramListener()
+
+    with policy.session(listener.listen, port) as state:
+        for i in range(10):
+            with port.span("section"):
+                pass
+            port.send("size", i)
+        port.send("size", "not a number")
+        assert state.ok
+
+    snapshot = listener.snapshot()
+    assert snapshot["section"].count == 10
+    assert snapshot["size"].count == 10
+    assert snapshot["size"].max == 9
+    assert listener.rejected == 1
+
+    other = HistogramListener()
+    other.listen("size", 100)
+    listener.merge(other)
+    assert listener.get_histogram("size").count == 11
+
+    old = listener.reset()
+    assert old["size"].count == 11
+    assert listener.snapshot() == {}
+
+
+def test_histogram_listener_scales_and_rejects_values():
+    """Fractional values need a scale; non-finite values must be rejected without ending the session."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    seconds = HistogramListener(scale = 1e9)
+    plain = HistogramListener()
+
+    def listen(tag, *args, **kwargs):
+        seconds.listen(tag, *args, **kwargs)
+        plain.listen(tag, *args, **kwargs)
+
+    with policy.session(listen, port) as state:
+        for value in (0.0012, 0.25, 0.9, float("nan"), float("inf"), -1.0, 3.0):
+            port.send("latency", value)
+        assert state.ok
+
+    histogram = seconds.get_histogram("latency")
+    assert histogram.count == 4 and histogram.min == 1_200_000
+    assert histogram.value_at_percentile(50) >= 250_000_000 * 0.98
+    assert seconds.rejected == 3
+    assert plain.get_histogram("latency").count == 1 and plain.rejected == 6
+
+
+def test_unmatched_span_begins_are_bounded():
+    """BEGINs without END must not be kept without limit."""
+    listener = HistogramListener(max_open_spans = 8)
+    aggregator = SpanAggregator(max_open_spans = 8)
+    for span_id in range(1000):
+        args = (SpanPhase.BEGIN, span_id, -1, span_id)
+        listener.listen("s", *args)
+        aggregator.listen("s", *args)
+    assert len(listener._matcher) == 8
+    assert aggregator.open_spans == 8 and aggregator.dropped_spans == 992
+    aggregator.listen("s", SpanPhase.END, 999, -1, 1005)
+    assert aggregator.get_stat("s").total_ns == 6
@@ -0,0 +1,60 @@
+import urllib.request
+
+import fport
+from fport.listeners import WindowedMetrics
+
+
+def _clocked(now):
+    return WindowedMetrics(10.0, clock = lambda: now[0])
+
+
+def test_metrics_report_last_completed_window():
+    """Gauges must describe the last completed window; counters all messages."""
+    now = [0.0]
+    metrics = _clocked(now)
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    with policy.session(metrics.listen, port):
+        for v in (1, 2, 3):
+            port.send("lat", v)
+        port.send('we"ird', "not a number")
+        now[0] = 10.0
+        port.send("lat", 100)
+
+    text = metrics.render()
+    assert 'fport_messages_total{tag="lat"} 4' in text
+    assert 'fport_value_sum_total{tag="lat"} 106' in text
+    assert 'fport_window_messages{tag="lat"} 3' in text
+    assert 'fport_window_value_max{tag="lat"} 3' in text
+    assert 'fport_window_value_mean{tag="lat"} 2.0' in text
+    assert 'fport_window_rate{tag="lat"} 0.3' in text
+    assert 'fport_window_messages{tag="we\\"ird"} 1' in text
+    assert 'fport_window_value_min{tag="we\\"ird"}' not in text
+
+    now[0] = 30.0
+    assert 'fport_window_messages{tag="lat"} 0' in metrics.render()
+
+
+def test_metrics_limit_tags():
+    """Tags beyond max_tags must only be counted as dropped."""
+    metrics = WindowedMetrics(max_tags = 1)
+    metrics.listen("a", 1)
+    metrics.listen("b", 1)
+    assert metrics.dropped == 1
+    assert 'tag="b"' not in metrics.render()
+
+
+def test_metrics_http_and_file(tmp_path):
+    """The HTTP endpoint and the file writer must expose render()."""
+    metrics = WindowedMetrics()
+    metrics.listen("a", 1)
+    with metrics.serve() as server:
+        host, port = server.address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            assert 'fport_messages_total{tag="a"} 1' in response.read().decode()
+
+    path = tmp_path / "fport.prom"
+    with metrics.write_to(path, interval = 60):
+        pass
+    assert 'fport_messages_total{tag="a"} 1' in path.read_text()
@@ -0,0 +1,52 @@
+import pytest
+
+import fport
+from fport.listeners import Pipeline
+
+
+def test_pipeline_filters_maps_and_tees():
+    """Each branch of a tee must see the message mapped before the tee."""
+    seen_a, seen_b = [], []
+    compiled = (Pipeline()
+                .filter_tags("value")
+                .filter(lambda tag, args, kwargs: args[0] > 0)
+                .map(lambda tag, args, kwargs: (tag, (args[0] * 10,), kwargs))
+                .tee(Pipeline().sink(lambda tag, *args, **kwargs: seen_a.append((tag, args, kwargs))),
+                     Pipeline()
+                     .map(lambda tag, args, kwargs: ("renamed", args, {"k": 1}))
+                     .sink(lambda tag, *args, **kwargs: seen_b.append((tag, args, kwargs))))
+                .build())
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    with policy.session(compiled.listen, port) as state:
+        port.send("value", 1)
+        port.send("value", -1)
+        port.send("other", 2)
+        port.send("value", 3)
+        assert state.ok
+
+    assert seen_a == [("value", (10,), {}), ("value", (30,), {})]
+    assert seen_b == [("renamed", (10,), {"k": 1}), ("renamed", (30,), {"k": 1})]
+    assert compiled.source.count("def ") == 1
+
+
+def test_pipeline_batches_and_flushes():
+    """Batches must be handed over when full and the rest on flush()."""
+    batches = []
+    compiled = Pipeline().batch(2, batches.append).build()
+    for i in range(5):
+        compiled.listen("t", i)
+    assert [len(b) for b in batches] == [2, 2]
+    compiled.flush()
+    assert batches[-1] == [("t", (4,), {})]
+
+
+def test_pipeline_requires_terminal_stage():
+    """A pipeline must end with exactly one terminal stage."""
+    with pytest.raises(ValueError):
+        Pipeline().filter_tags("a").build()
+    with pytest.raises(ValueError):
+        Pipeline().sink(print).map(lambda *m: m)
+    with pytest.raises(ValueError):
+        Pipeline().tee(Pipeline().filter_tags("a"))
@@ -0,0 +1,82 @@
+import io
+
+import fport
+from fport.listeners import FlightRecorder, RecordWriter, read_records
+from fport.observer import ProcessObserver
+
+
+def test_record_writer_round_trip():
+    """Written records must be read back in order; unpicklable args as repr."""
+    out = io.BytesIO()
+    writer = RecordWriter(out)
+    writer.listen("a", 1, key = "x")
+    writer.listen("b", lambda: None)
+    writer.close()
+
+    out.seek(0)
+    records = list(read_records(out))
+    assert [(r.seq, r.tag) for r in records] == [(0, "a"), (1, "b")]
+    assert records[0].args == (1,) and records[0].kwargs == {"key": "x"}
+    assert isinstance(records[1].args[0], str)
+
+
+def test_flight_recorder_dumps_ring_and_post_trigger(tmp_path):
+    """A trigger tag must dump the last messages plus the following ones."""
+    recorder = FlightRecorder(tmp_path, capacity = 3, trigger_tags = ("boom",), post_trigger = 2)
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    with policy.session(recorder.listen, port):
+        for i in range(5):
+            port.send("tick", i)
+        port.send("boom")
+        assert recorder.triggered
+        port.send("after", 0)
+        port.send("after", 1)
+        port.send("ignored")
+
+    assert len(recorder.dumps) == 1
+    records = list(read_records(recorder.dumps[0]))
+    assert [(r.tag, r.args) for r in records] == [
+        ("tick", (2,)), ("tick", (3,)), ("tick", (4,)),
+        ("boom", ()), ("after", (0,)), ("after", (1,))]
+
+
+def test_flight_recorder_per_tag_rings_and_predicate(tmp_path):
+    """Per-tag rings must keep `capacity` messages of each tag."""
+    recorder = FlightRecorder(
+        tmp_path, capacity = 1, per_tag = True, trigger = lambda tag, args, kwargs: args == (-1,))
+    for i in range(3):
+        recorder.listen("a", i)
+        recorder.listen("b", i)
+    recorder.listen("a", -1)
+
+    records = list(read_records(recorder.dumps[0]))
+    assert [(r.tag, r.args) for r in records] == [("a", (2,)), ("b", (2,)), ("a", (-1,))]
+
+
+def test_flight_recorder_triggers_on_observer_violation(tmp_path):
+    """A new violation of the wrapped observer must fire the recorder."""
+    observer = ProcessObserver({"value": lambda v: v >= 0})
+    recorder = FlightRecorder(tmp_path, observer = observer)
+    recorder.listen("value", 1)
+    assert recorder.dumps == ()
+    recorder.listen("value", -1)
+
+    assert observer.violation
+    records = list(read_records(recorder.dumps[0]))
+    assert [r.args for r in records] == [(1,), (-1,)]
+
+
+def test_flight_recorder_triggers_on_each_new_violation(tmp_path):
+    """The first violation of every condition must fire, repeats must not."""
+    observer = ProcessObserver({"a": lambda v: v >= 0, "b": lambda v: v >= 0})
+    recorder = FlightRecorder(tmp_path, observer = observer, max_dumps = 3)
+    recorder.listen("a", -1)
+    recorder.listen("a", -2)
+    recorder.listen("b", -1)
+    recorder.listen("c")
+
+    assert len(recorder.dumps) == 3
+    assert [[(r.tag, r.args) for r in read_records(path)] for path in recorder.dumps] == [
+        [("a", (-1,))], [("a", (-2,)), ("b", (-1,))], [("c", ())]]
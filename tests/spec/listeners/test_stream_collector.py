@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import fport
+from fport.collector import AUTHKEY_ENV, Collector, _load_listener, main
+from fport.listeners import SocketStreamer
+from fport.observer import ProcessObserver
+
+
+def test_streamer_to_collector_feeds_observer(tmp_path):
+    """Messages streamed from a session must reach an observer behind the collector."""
+    address = str(tmp_path / "collector.sock")
+    observer = ProcessObserver({"value": lambda v: v >= 0})
+    done = threading.Event()
+
+    collector = Collector(address, observer.listen, authkey = b"secret")
+    server = threading.Thread(target = collector.serve, args = (done,))
+    server.start()
+
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    with SocketStreamer(address, authkey = b"secret", batch_size = 16) as streamer:
+        with policy.session(streamer.listen, port) as state:
+            for i in range(100):
+                port.send("value", i)
+            port.send("value", -1)
+            port.send("value", lambda: None)  # cannot be pickled
+            assert state.ok
+    assert streamer.error is None
+    assert streamer.sent == 101
+    assert streamer.dropped == 1
+
+    deadline = time.monotonic() + 5
+    while collector.received < 101 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    done.set()
+    server.join(5)
+
+    obs = observer.get_all()["value"]
+    assert obs.count == 101
+    assert obs.violation
+    assert obs.first_violation_at == 100
+
+
+def test_streamer_drops_when_queue_is_full(tmp_path):
+    streamer = SocketStreamer(str(tmp_path / "missing.sock"), max_pending = 2, flush_interval = 10)
+    for i in range(5):
+        streamer.listen("x", i)
+    streamer.close()
+    assert streamer.dropped >= 3
+    assert streamer.error is not None
+
+
+def test_load_listener_resolves_listen_attribute():
+    assert _load_listener("fport:example") is fport.example
+    with pytest.raises(ValueError):
+        _load_listener("fport")
+
+
+def test_collector_module_runs_as_script(tmp_path):
+    address = str(tmp_path / "cli.sock")
+    env = dict(os.environ, FPORT_COLLECTOR_AUTHKEY = "k")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "fport.collector", "--unix", address],
+        stdout = subprocess.PIPE, text = True, env = env)
+    try:
+        assert "listening" in proc.stdout.readline()
+        with SocketStreamer(address, authkey = b"k") as streamer:
+            streamer.listen("hello", 1)
+        assert proc.stdout.readline().startswith("Received: hello, args=(1,)")
+    finally:
+        proc.terminate()
+        proc.wait(5)
+
+
+def test_tcp_collector_requires_authkey(monkeypatch):
+    """A TCP collector unpickles what it receives, so it must not run without an authkey."""
+    with pytest.raises(ValueError):
+        Collector(("127.0.0.1", 0), lambda tag, *a, **kw: None)
+    monkeypatch.delenv(AUTHKEY_ENV, raising = False)
+    with pytest.raises(SystemExit):
+        main(["--tcp", "127.0.0.1:0"])
+
+    received = []
+    collector = Collector(("127.0.0.1", 0), lambda tag, *a, **kw: received.append(tag), authkey = b"k")
+    done = threading.Event()
+    server = threading.Thread(target = collector.serve, args = (done,))
+    server.start()
+    with SocketStreamer(collector.address, authkey = b"k") as streamer:
+        streamer.listen("hello")
+    done.set()
+    server.join(5)
+    collector.close(timeout = 0)
+    assert received == ["hello"]
@@ -0,0 +1,56 @@
+import io
+import json
+import threading
+
+import fport
+from fport.listeners import ChromeTraceWriter
+
+
+def test_trace_writer_streams_valid_json(tmp_path):
+    """The closed capture must be a JSON array of trace events."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    path = tmp_path / "trace.json"
+
+    with ChromeTraceWriter(path, buffer_events = 2) as writer:
+        with policy.session(writer.listen, port) as state:
+            with port.span("work"):
+                port.send("value", "x" * 200, key = 1)
+            assert state.ok
+
+    events = json.loads(path.read_text())
+    phases = [e["ph"] for e in events if e["ph"] != "M"]
+    assert phases == ["B", "i", "E"]
+    instant = next(e for e in events if e["ph"] == "i")
+    assert instant["name"] == "value"
+    assert instant["tid"] == threading.get_ident()
+    assert len(instant["args"]["0"]) == 64
+    assert instant["args"]["key"] == "1"
+    assert any(e["ph"] == "M" and e["name"] == "thread_name" for e in events)
+
+
+def test_trace_writer_buffers_until_flush():
+    """Events must not reach the file before the buffer fills or is flushed."""
+    out = io.StringIO()
+    writer = ChromeTraceWriter(out, buffer_events = 100)
+    writer.listen("a")
+    assert out.getvalue() == "[\n"
+    writer.flush()
+    assert '"name": "a"' in out.getvalue()
+    writer.close()
+    writer.listen("late")
+    assert len(json.loads(out.getvalue())) == 2  # thread metadata + "a"
+
+
+def test_trace_writer_records_each_thread():
+    out = io.StringIO()
+    writer = ChromeTraceWriter(out)
+    threads = [threading.Thread(target = writer.listen, args = ("t",)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+    events = json.loads(out.getvalue())
+    assert len([e for e in events if e["ph"] == "i"]) == 4
+    assert len({e["tid"] for e in events}) >= 1
@@ -0,0 +1,92 @@
+import importlib.util
+
+import pytest
+
+from fport.observer import BatchObserver, ProcessObserver, vectorized
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+@pytest.mark.skipif(HAS_NUMPY, reason = "numpy is installed")
+def test_batch_observer_requires_numpy():
+    """Without numpy, the batch mode must raise ImportError."""
+    with pytest.raises(ImportError):
+        BatchObserver(ProcessObserver({}))
+
+
+def test_batch_observer_exact_first_violation():
+    """Chunks must give the same results as evaluating per message."""
+    np = pytest.importorskip("numpy")
+    seen = []
+    observer = ProcessObserver({
+        "v": vectorized(lambda v: v >= 0),
+        "pair": vectorized(lambda a, b: a < b, fields = (0, "b"), dtype = "q"),
+        "plain": lambda s: isinstance(s, str),
+    })
+    observer.set_violation_handler("v", seen.append)
+    batch = BatchObserver(observer, chunk_size = 4)
+    for i in range(10):
+        batch.listen("v", -1 if i in (6, 9) else i)
+        batch.listen("pair", i, b = i + 1)
+    batch.listen("plain", "x")
+    batch.flush()
+
+    v = observer.get_all()["v"]
+    assert v.count == 10 and v.first_violation_at == 6
+    assert len(seen) == 2
+    assert observer.get_stat("pair").count == 10 and not observer.get_stat("pair").violation
+    assert observer.get_stat("plain").count == 1
+
+    batch.evaluate("pair", np.arange(1000), np.arange(1000) + (np.arange(1000) != 500))
+    pair = observer.get_all()["pair"]
+    assert pair.count == 1010 and pair.first_violation_at == 510
+
+
+def test_batch_observer_non_numeric_and_single_call():
+    """Non-numeric fields are recorded as exceptions in order; the condition also works per message."""
+    pytest.importorskip("numpy")
+    condition = vectorized(lambda v: v < 10)
+    assert condition(3) and not condition(30)
+
+    observer = ProcessObserver({"v": condition})
+    batch = BatchObserver(observer)
+    batch.listen("v", 1)
+    batch.listen("v", "text")
+    batch.flush()
+    obs = observer.get_all()["v"]
+    assert obs.count == 2 and obs.first_violation_at == 1
+    assert isinstance(obs.exc, TypeError)
+
+
+def test_batch_observer_first_violation_seq_at_arrival():
+    """A batched violation must be ordered by when the message arrived, not when its chunk was evaluated."""
+    pytest.importorskip("numpy")
+    clock = iter(range(100))
+    observer = ProcessObserver({"v": vectorized(lambda v: v >= 0), "plain": lambda ok: ok},
+                               seq_source = lambda: next(clock))
+    batch = BatchObserver(observer, chunk_size = 100)
+    batch.listen("v", 1)
+    batch.listen("v", -1)
+    batch.listen("plain", False)
+    batch.flush()
+
+    assert observer.get_all()["v"].first_violation_seq == 1
+    assert observer.get_all()["plain"].first_violation_seq == 2
+    assert observer.snapshot().first_violation()[0] == "v"
+
+
+def test_batch_observer_advances_sequences_and_recent_tags():
+    """Batched tags must reach sequence rules and recent tags in arrival order."""
+    pytest.importorskip("numpy")
+    observer = ProcessObserver({"open": lambda: True, "read": vectorized(lambda v: v >= 0),
+                                "close": lambda: True},
+                               sequences = {"p": "open read close"}, recent_tags = 3)
+    batch = BatchObserver(observer, chunk_size = 100)
+    batch.listen("open")
+    batch.listen("read", 1)
+    batch.listen("close")
+    batch.flush()
+
+    assert not observer.violation
+    assert observer.get_sequences()["p"].complete
+    assert observer.get_stat("read").count == 1
@@ -0,0 +1,42 @@
+import pytest
+
+from fport.observer import ProcessObserver
+
+
+def test_context_snapshot_on_first_violation():
+    """The first violation must keep the last K messages of the tag and recent tags."""
+    observer = ProcessObserver({"v": lambda v, note = None: v >= 0, "w": lambda: True},
+                               context = 3, recent_tags = 4)
+    for i in range(10):
+        observer.listen("v", i, note = i)
+        observer.listen("w")
+    observer.listen("v", -1)
+    observer.listen("v", -2)
+
+    obs = observer.get_all()["v"]
+    assert obs.context == (((8,), {"note": 8}), ((9,), {"note": 9}), ((-1,), {}))
+    assert obs.recent_tags == ("w", "v", "w", "v")
+    assert observer.get_all()["w"].context == ()
+
+
+def test_context_per_tag_and_exception():
+    """Only selected tags keep context; a raising condition snapshots too."""
+    observer = ProcessObserver({"v": lambda v: 1 / v > 0, "w": lambda v: False},
+                               context = {"v": 2})
+    observer.listen("v", 1)
+    observer.listen("v", 0)
+    observer.listen("w", 0)
+
+    assert observer.get_all()["v"].context == (((1,), {}), ((0,), {}))
+    assert observer.get_all()["w"].context == ()
+    assert observer.get_all()["v"].recent_tags == ()
+
+    observer.reset_observations()
+    observer.listen("v", 0)
+    assert observer.get_all()["v"].context == (((0,), {}),)
+
+
+def test_context_requires_known_tag():
+    """Context sizes can only be set for defined conditions."""
+    with pytest.raises(ValueError):
+        ProcessObserver({"v": lambda v: True}, context = {"w": 2})
@@ -0,0 +1,57 @@
+import pytest
+
+from fport.observer import DeltaBounds, Invariant, Monotonic, ProcessObserver, RateLimit
+
+
+def test_monotonic_reports_through_observation():
+    """A decreasing counter must be a violation with a descriptive reason."""
+    observer = ProcessObserver({"counter": Monotonic(strict = True),
+                                "level": Monotonic("value", decreasing = True)})
+    for v in (1, 2, 3, 3):
+        observer.listen("counter", v)
+    for v in (5, 5, 1):
+        observer.listen("level", value = v)
+
+    obs = observer.get_all()["counter"]
+    assert obs.violation and obs.first_violation_at == 3
+    assert obs.fail_reason == "not strictly increasing: 3 -> 3"
+    assert not observer.get_all()["level"].violation
+
+
+def test_delta_bounds_and_reset():
+    """Deltas must be checked against the previous value; reset clears state."""
+    observer = ProcessObserver({"ts": DeltaBounds(0, 10)})
+    observer.listen("ts", 100)
+    observer.listen("ts", 105)
+    assert not observer.violation
+    observer.listen("ts", 200)
+    assert "delta 95" in observer.get_all()["ts"].fail_reason
+
+    observer.reset_observations()
+    observer.listen("ts", 0)
+    assert not observer.violation
+    with pytest.raises(ValueError):
+        DeltaBounds()
+
+
+def test_rate_limit_token_bucket():
+    """More than max_count messages per period must be a violation."""
+    now = [0.0]
+    observer = ProcessObserver({"tick": RateLimit(3, 1.0, clock = lambda: now[0])})
+    for _ in range(3):
+        observer.listen("tick")
+    assert not observer.violation
+    now[0] = 0.5
+    observer.listen("tick")
+    assert not observer.violation
+    observer.listen("tick")
+    assert observer.get_all()["tick"].fail_reason == "more than 3 messages per 1.0s"
+
+
+def test_invariant_subclass_must_define_call():
+    """An invariant without __call__ must fail at construction."""
+    class Incomplete(Invariant):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
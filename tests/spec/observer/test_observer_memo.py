@@ -0,0 +1,51 @@
+from fport.observer import ProcessObserver, pure
+
+
+def test_pure_condition_is_memoized_per_tag():
+    """Repeated arguments must reuse the result within the LRU bound."""
+    calls = []
+
+    @pure(maxsize = 2)
+    def ok_status(code):
+        calls.append(code)
+        return code < 500
+
+    observer = ProcessObserver({"a": ok_status, "b": pure(lambda code: code < 500)})
+    for code in (200, 200, 404, 200, 503, 200):
+        observer.listen("a", code)
+
+    memo = observer.get_all()["a"].memo
+    assert calls == [200, 404, 503]
+    assert memo.hits == 3 and memo.misses == 3 and len(memo) == 2
+    assert observer.get_all()["a"].first_violation_at == 4
+    assert observer.get_all()["b"].memo.hits == 0
+
+
+def test_pure_condition_keys_by_type_and_skips_unhashable():
+    """1 and True must not share a result; unhashable args are evaluated directly."""
+    observer = ProcessObserver({"v": pure(lambda v, **kw: type(v) is int)})
+    observer.listen("v", 1)
+    observer.listen("v", True)
+    observer.listen("v", [1])
+    observer.listen("v", 1, extra = [2])
+
+    obs = observer.get_all()["v"]
+    assert obs.first_violation_at == 1
+    assert obs.memo.uncached == 2 and obs.memo.hits == 0
+    assert observer.get_stat("v").count == 4
+
+    observer.reset_observations()
+    assert len(observer.get_all()["v"].memo) == 0
+
+
+def test_pure_condition_keys_nested_values_by_type():
+    """Values inside tuples and frozensets must be told apart by type too."""
+    observer = ProcessObserver({"v": pure(lambda v: type(v[0]) is int)})
+    observer.listen("v", (1,))
+    observer.listen("v", (True,))
+    observer.listen("v", (1,))
+    observer.listen("v", ((1.0,),))
+
+    obs = observer.get_all()["v"]
+    assert obs.first_violation_at == 1
+    assert obs.memo.hits == 1 and obs.memo.misses == 3
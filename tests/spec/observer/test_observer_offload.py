@@ -0,0 +1,69 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import fport
+from fport.observer import Monotonic, OffloadedObserver, ProcessObserver
+
+
+def _positive(v):
+    return v > 0
+
+
+def test_offloaded_observer_keeps_order_and_handlers():
+    """Results must be recorded in listen order with handlers called once per violation."""
+    def slow(v):
+        time.sleep(0.01 if v == 0 else 0)
+        return v > 0
+
+    violations = []
+    observer = ProcessObserver({"v": slow, "n": Monotonic()}, context = 2)
+    observer.set_violation_handler("v", lambda obs: violations.append(obs.first_violation_at))
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    with OffloadedObserver(observer, max_workers = 4) as offloaded:
+        with policy.session(offloaded.listen, port) as state:
+            for v in (1, 2, 0, 3, -1):
+                port.send("v", v)
+            for n in (1, 2, 1):
+                port.send("n", n)
+            assert state.ok
+        assert offloaded.join(5.0)
+        assert offloaded.pending == 0
+
+    obs = observer.get_all()["v"]
+    assert obs.count == 5 and obs.first_violation_at == 2
+    assert obs.context == (((2,), {}), ((0,), {}))
+    assert violations == [2, 2]
+    assert observer.get_all()["n"].first_violation_at == 2
+
+
+def test_offloaded_observer_does_not_block_sender():
+    """listen() must return before a slow condition finishes."""
+    release = threading.Event()
+    observer = ProcessObserver({"v": lambda v: release.wait(5.0)})
+    offloaded = OffloadedObserver(observer)
+    offloaded.listen("v", 1)
+    assert not offloaded.join(0.05)
+    release.set()
+    offloaded.close()
+    assert observer.get_stat("v").count == 1 and not observer.violation
+
+
+def test_offloaded_observer_with_process_pool():
+    """A process pool must evaluate picklable conditions."""
+    try:
+        ctx = multiprocessing.get_context("fork")
+    except ValueError:
+        pytest.skip("fork start method is not available")
+    observer = ProcessObserver({"v": _positive})
+    with ProcessPoolExecutor(2, mp_context = ctx) as pool:
+        with OffloadedObserver(observer, executor = pool) as offloaded:
+            for v in (1, -1, 2):
+                offloaded.listen("v", v)
+    assert observer.get_all()["v"].first_violation_at == 1
+    assert observer.get_stat("v").count == 3
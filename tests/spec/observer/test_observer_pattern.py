@@ -0,0 +1,75 @@
+import re
+
+import pytest
+
+from fport.observer import PatternIndex, ProcessObserver
+
+
+def test_pattern_index_resolution_order():
+    """Longest prefix first, then other patterns in order."""
+    index = PatternIndex(["cache.*", "cache.hit.*", "*.miss", re.compile(r"db\.(?P<op>\w+)"), "db.*x"])
+    assert index.resolve("cache.hit.eu") == "cache.hit.*"
+    assert index.resolve("cache.put") == "cache.*"
+    assert index.resolve("store.miss") == "*.miss"
+    assert index.resolve("db.read") == r"db\.(?P<op>\w+)"
+    assert index.resolve("other") is None
+
+
+def test_pattern_index_with_flags_and_bounded_cache():
+    """Patterns with flags must still resolve; the cache must stay bounded."""
+    index = PatternIndex([re.compile("ab+", re.IGNORECASE), "x?"], cache_size = 2)
+    assert index.resolve("ABB") == "ab+"
+    assert index.resolve("xy") == "x?"
+    assert index.resolve("zz") is None
+    assert len(index._cache) <= 2
+
+
+def test_observer_applies_pattern_conditions():
+    """Parameterized tags must be checked by their pattern condition."""
+    observer = ProcessObserver({"exact": lambda: True},
+                               patterns = {"cache.hit.*": lambda ms: ms < 10,
+                                           re.compile(r"job\.\d+"): lambda ok: ok})
+    observer.listen("exact")
+    observer.listen("cache.hit.eu", 5)
+    observer.listen("cache.hit.us", 20)
+    observer.listen("job.7", True)
+    assert not observer.global_violation
+
+    observer.listen("job.x", True)
+    assert observer.global_fail_reason == "wrong tag 'job.x'"
+    hit = observer.get_all()["cache.hit.*"]
+    assert hit.count == 2 and hit.first_violation_at == 1
+    assert observer.get_stat(r"job\.\d+").count == 1
+
+
+def test_observer_pattern_handler_and_duplicates():
+    """Violation handlers are set by pattern key; keys must be unique."""
+    seen = []
+    observer = ProcessObserver({}, patterns = {"v.*": lambda v: v > 0})
+    observer.set_violation_handler("v.*", seen.append)
+    observer.listen("v.a", -1)
+    assert len(seen) == 1
+    with pytest.raises(ValueError):
+        ProcessObserver({"v.*": lambda: True}, patterns = {"v.*": lambda: True})
+
+
+def test_observer_pattern_conditions_of_sequence_tags():
+    """Tags of a sequence rule must still be checked by their pattern condition."""
+    observer = ProcessObserver({}, patterns = {"file.*": lambda n: n > 0},
+                               sequences = {"s": "file.open file.close"})
+    observer.listen("file.open", -1)
+    assert observer.get_all()["file.*"].first_violation_at == 0
+    observer.listen("file.close", 1)
+    assert observer.get_all()["file.*"].count == 2
+    assert not observer.global_violation
+    assert observer.get_sequences()["s"].complete
+
+
+def test_pattern_index_keeps_capture_groups():
+    """Backreferences of regex patterns must match as on their own, in the given order."""
+    index = PatternIndex([re.compile(r"(a)b"), "q*", re.compile(r"(x)\1"), "x?", "y?"])
+    assert index.resolve("xx") == r"(x)\1"
+    assert index.resolve("ab") == "(a)b"
+    assert index.resolve("xy") == "x?"
+    assert index.resolve("ya") == "y?"
+    assert index.resolve("zz") is None
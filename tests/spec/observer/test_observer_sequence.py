@@ -0,0 +1,62 @@
+import pytest
+
+from fport.observer import ProcessObserver, SequenceRule
+
+
+def test_sequence_rule_compiles_to_automaton():
+    """The rule must accept exactly the sequences of its pattern."""
+    rule = SequenceRule("open (read | write)* close")
+
+    def run(tags):
+        state = 0
+        for tag in tags:
+            state = rule.step(state, tag)
+            if state < 0:
+                return None
+        return rule.accepting(state)
+
+    assert rule.alphabet == {"open", "read", "write", "close"}
+    assert run(["open", "read", "write", "read", "close"]) is True
+    assert run(["open", "close"]) is True
+    assert run(["open", "read"]) is False
+    assert run(["read"]) is None
+    assert run(["open", "close", "close"]) is None
+    assert SequenceRule("a+ b?").step(0, "b") == -1
+
+
+@pytest.mark.parametrize("pattern", ["", "a |", "(a b", "a )", "* a"])
+def test_sequence_rule_rejects_invalid_pattern(pattern):
+    """Malformed patterns must raise ValueError."""
+    with pytest.raises(ValueError):
+        SequenceRule(pattern)
+
+
+def test_observer_reports_violating_transition_immediately():
+    """A disallowed tag must be reported when it arrives."""
+    observer = ProcessObserver({"read": lambda n: n > 0},
+                               sequences = {"file": "open read* close"})
+    observer.listen("open")
+    observer.listen("read", 1)
+    assert not observer.violation
+    observer.listen("open")
+
+    seq = observer.get_sequences()["file"]
+    assert observer.violation and observer.local_violation
+    assert not observer.global_violation
+    assert seq.first_violation_at == 2
+    assert "'open'" in seq.fail_reason and "'close'" in seq.fail_reason
+    assert observer.get_stat("read").count == 1
+
+
+def test_observer_finish_sequences_detects_incomplete():
+    """A sequence that is not allowed to end must be reported on finish."""
+    observer = ProcessObserver({}, sequences = {"file": "open close", "any": "tick*"})
+    observer.listen("open")
+    assert observer.finish_sequences().keys() == {"file"}
+    assert observer.violation
+
+    observer.reset_observations()
+    observer.listen("open")
+    observer.listen("close")
+    assert observer.finish_sequences() == {}
+    assert observer.get_sequences()["file"].complete
@@ -0,0 +1,73 @@
+import itertools
+import multiprocessing
+
+import pytest
+
+from fport.observer import ObserverSnapshot, ProcessObserver, merge_snapshots
+
+
+def _conditions():
+    return {"v": lambda v: v >= 0, "w": lambda: True}
+
+
+def _worker(values):
+    observer = ProcessObserver(_conditions(), summarize = {"v": 0})
+    for v in values:
+        observer.listen("v", v)
+    return observer.snapshot().to_bytes()
+
+
+def test_snapshot_round_trip():
+    """A serialized snapshot must restore counts, violations and summaries."""
+    observer = ProcessObserver(_conditions(), summarize = {"v": 0}, sequences = {"s": "w w"})
+    observer.listen("v", 1)
+    observer.listen("v", -1)
+    observer.listen("w")
+    observer.listen("wrong")
+
+    restored = ObserverSnapshot.from_bytes(observer.snapshot("main").to_bytes())
+    v = restored.observations["v"]
+    assert restored.sources == ("main",)
+    assert v.count == 2 and v.violation and v.first_violation_at == 1
+    assert v.first_violation_source == "main" and v.fail_reason == "condition violation"
+    assert v.summaries[0].count == 2
+    assert restored.global_violation and restored.global_fail_reason == "wrong tag 'wrong'"
+    assert restored.sequences["s"].count == 1
+    assert restored.get_unevaluated() == {}
+
+
+def test_merge_orders_first_violation_by_sequence():
+    """Merging must add counts and keep the earliest first violation."""
+    seq = itertools.count()
+    a = ProcessObserver(_conditions(), seq_source = lambda: next(seq))
+    b = ProcessObserver(_conditions(), seq_source = lambda: next(seq))
+    b.listen("v", 1)
+    b.listen("v", -2)
+    a.listen("v", -1)
+    a.listen("w")
+
+    merged = merge_snapshots([a.snapshot("a"), b.snapshot("b")])
+    v = merged.observations["v"]
+    assert merged.sources == ("a", "b")
+    assert v.count == 3
+    assert (v.first_violation_source, v.first_violation_at) == ("b", 1)
+    assert merged.first_violation()[0] == "v"
+    assert merged.get_unevaluated() == {}
+    assert a.snapshot("a").merge(b.snapshot("b")).observations["w"].count == 1
+
+
+def test_merge_snapshots_from_worker_processes():
+    """Snapshots from worker processes must merge into a combined view."""
+    try:
+        ctx = multiprocessing.get_context("fork")
+    except ValueError:
+        pytest.skip("fork start method is not available")
+    with ctx.Pool(2) as pool:
+        blobs = pool.map(_worker, [[1, 2, 3], [4, -5], []])
+
+    merged = merge_snapshots(ObserverSnapshot.from_bytes(b) for b in blobs)
+    v = merged.observations["v"]
+    assert v.count == 5 and v.violation and v.first_violation_at == 1
+    assert v.summaries[0].count == 5 and v.summaries[0].min == -5
+    assert set(merged.get_unevaluated()) == {"w"}
+    assert len(merged.sources) == 3
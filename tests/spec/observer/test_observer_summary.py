@@ -0,0 +1,63 @@
+import math
+import random
+import statistics
+
+import pytest
+
+from fport.observer import ProcessObserver, ValueSummary
+
+
+def test_observer_summaries_by_position_and_keyword():
+    """Summaries must cover the configured argument of every listened message."""
+    observer = ProcessObserver({"req": lambda latency, size = 0: latency < 50},
+                               summarize = {"req": (0, "size")})
+    values = [random.uniform(0, 100) for _ in range(5000)]
+    for v in values:
+        observer.listen("req", v, size = 3)
+
+    stat = observer.get_stat("req")
+    latency = stat.summary(0)
+    assert stat.count == 5000 and stat.violation
+    assert latency.count == 5000
+    assert latency.min == min(values) and latency.max == max(values)
+    assert latency.mean == pytest.approx(statistics.fmean(values))
+    assert latency.variance == pytest.approx(statistics.variance(values))
+    exact = sorted(values)[int(0.99 * (len(values) - 1))]
+    assert latency.quantile(0.99) == pytest.approx(exact, rel = 0.03)
+    assert stat.summaries["size"].mean == 3
+
+
+def test_observer_summary_is_snapshot_and_reset():
+    """get_stat must copy the summaries and reset_observations must clear them."""
+    observer = ProcessObserver({"v": lambda v: True}, summarize = {"v": 0})
+    observer.listen("v", 1)
+    stat = observer.get_stat("v")
+    observer.listen("v", 2)
+    assert stat.summary().count == 1
+    observer.reset_observations()
+    assert observer.get_stat("v").summary().count == 0
+    assert observer.get_stat("v").summaries.keys() == {0}
+
+
+def test_observer_summarize_requires_known_tag():
+    """Summaries can only be requested for defined conditions."""
+    with pytest.raises(ValueError):
+        ProcessObserver({"v": lambda v: True}, summarize = {"w": 0})
+
+
+def test_value_summary_bounded_and_mergeable():
+    """Bucket count must stay bounded and merge must match a single summary."""
+    a, b, both = ValueSummary(max_buckets = 64), ValueSummary(max_buckets = 64), ValueSummary(max_buckets = 64)
+    for i in range(1, 20001):
+        x = i * 1.5 if i % 2 else -i
+        (a if i % 3 else b).add(x)
+        both.add(x)
+    assert not a.add("text") and a.skipped == 1
+    a.merge(b)
+
+    assert len(a._positive) <= 64 and len(a._negative) <= 64
+    assert a.count == both.count == 20000
+    assert a.mean == pytest.approx(both.mean)
+    assert a.variance == pytest.approx(both.variance)
+    assert a.quantile(0.9) == pytest.approx(both.quantile(0.9), rel = 0.03)
+    assert math.isnan(ValueSummary().quantile(0.5))
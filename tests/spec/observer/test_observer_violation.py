@@ -293,4 +293,20 @@ def test_process_observer_reset_after_exception():
     assert not observer.violation
     obs = observer.get_all()["positive"]
     assert obs.count == 1
-    assert not obs.violation
\ No newline at end of file
+    assert not obs.violation
+
+def test_violation_count_counts_first_violations():
+    """violation_count must grow once per violated condition, sequence rule and global violation."""
+    observer = ProcessObserver({"a": lambda v: v >= 0, "b": lambda v: 1 / v > 0},
+                               sequences = {"s": "a+ b"})
+    observer.listen("a", -1)
+    observer.listen("a", -2)
+    assert observer.violation_count == 1
+    observer.listen("b", 0)
+    assert observer.violation_count == 2
+    observer.listen("a", 1)
+    observer.listen("x")
+    observer.listen("y")
+    assert observer.violation_count == 4
+    observer.reset_observations()
+    assert observer.violation_count == 0
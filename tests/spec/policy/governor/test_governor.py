@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+import fport
+from fport import OverheadBudget, DeliveryMode
+from fport.governor import OverheadGovernor
+
+
+def _busy(ns):
+    end = time.perf_counter_ns() + ns
+    while time.perf_counter_ns() < end:
+        pass
+
+
+def test_budget_validation():
+    with pytest.raises(ValueError):
+        OverheadBudget(budget = 0)
+    with pytest.raises(ValueError):
+        OverheadBudget(budget = 0.1, mode = DeliveryMode.FULL)
+    with pytest.raises(ValueError):
+        OverheadBudget(budget = 0.1, sample_every = 0)
+
+
+def test_governor_degrades_and_recovers_deterministically():
+    """Window evaluation must step down on overload and back up when calm."""
+    gov = OverheadGovernor(OverheadBudget(budget = 0.1, sample_every = 4, recover_after = 2))
+    start = gov._window_start
+
+    gov._charge(500)
+    gov._roll(start + 1000)  # ratio 0.5
+    assert gov.mode is DeliveryMode.SAMPLED
+
+    gov._charge(300)
+    gov._roll(start + 2000)  # sampled ratio 0.3 still over budget
+    assert gov.mode is DeliveryMode.DETACHED
+
+    gov._roll(start + 3000)
+    assert gov.mode is DeliveryMode.DETACHED
+    gov._roll(start + 4000)
+    assert gov.mode is DeliveryMode.SAMPLED
+
+    gov._charge(10)
+    gov._roll(start + 5000)  # 0.01 * 4 fits
+    gov._charge(10)
+    gov._roll(start + 6000)
+    assert gov.mode is DeliveryMode.FULL
+
+    modes = [(t.before, t.after) for t in gov.transitions]
+    assert modes == [
+        (DeliveryMode.FULL, DeliveryMode.SAMPLED),
+        (DeliveryMode.SAMPLED, DeliveryMode.DETACHED),
+        (DeliveryMode.DETACHED, DeliveryMode.SAMPLED),
+        (DeliveryMode.SAMPLED, DeliveryMode.FULL),
+    ]
+
+
+def test_sampled_mode_delivers_one_in_n():
+    gov = OverheadGovernor(OverheadBudget(budget = 0.1, window = 3600, sample_every = 5))
+    gov._switch(gov._window_start, DeliveryMode.SAMPLED, 1.0)
+    assert sum(gov._admit() for _ in range(50)) == 10
+
+
+def test_session_degrades_expensive_listener():
+    """An expensive listener must be degraded and the transition visible in SessionState."""
+    budget = OverheadBudget(budget = 0.05, window = 0.01, mode = DeliveryMode.DETACHED, recover_after = 1000)
+    policy = fport.create_session_policy(overhead_budget = budget, collect_stats = True)
+    port = policy.create_port()
+
+    delivered = []
+    def listener(tag, *args, **kwargs):
+        delivered.append(tag)
+        _busy(200_000)
+
+    with policy.session(listener, port) as state:
+        deadline = time.perf_counter() + 2.0
+        while state.governor.mode is DeliveryMode.FULL and time.perf_counter() < deadline:
+            port.send("hot")
+        assert state.ok
+        assert state.governor.mode is DeliveryMode.DETACHED
+        transition = state.governor.transitions[0]
+        assert transition.before is DeliveryMode.FULL
+        assert transition.ratio > 0.05
+
+        n = len(delivered)
+        for _ in range(100):
+            port.send("hot")
+        assert len(delivered) == n
+        assert state.stats.filtered >= 100
+
+
+def test_governor_is_none_without_budget():
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    with policy.session(lambda tag, *a, **kw: None, port) as state:
+        assert state.governor is None
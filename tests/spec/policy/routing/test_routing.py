@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+import pytest
+
+import fport
+from fport.exceptions import DeniedError, OccupiedError
+
+
+def test_threads_have_independent_sessions_on_shared_port():
+    """Each thread must only receive messages sent within its own session."""
+    policy = fport.create_session_policy(route_by_context = True)
+    port = policy.create_port()
+
+    results = {}
+    errors = []
+    barrier = threading.Barrier(4)
+
+    def worker(n):
+        received = []
+        try:
+            with policy.session(lambda tag, *a, **kw: received.append(a[0]), port) as state:
+                barrier.wait()
+                for i in range(100):
+                    port.send("v", (n, i))
+                barrier.wait()
+                assert state.ok
+        except Exception as e:
+            errors.append(e)
+        results[n] = received
+
+    threads = [threading.Thread(target = worker, args = (n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    for n in range(4):
+        assert results[n] == [(n, i) for i in range(100)]
+
+
+def test_asyncio_tasks_have_independent_sessions():
+    policy = fport.create_session_policy(route_by_context = True)
+    port = policy.create_port()
+
+    async def task(n):
+        received = []
+        with policy.session(lambda tag, *a, **kw: received.append(a[0]), port):
+            for i in range(3):
+                port.send("v", n)
+                await asyncio.sleep(0)
+        return received
+
+    async def main():
+        return await asyncio.gather(*(task(n) for n in range(5)))
+
+    assert asyncio.run(main()) == [[n] * 3 for n in range(5)]
+
+
+def test_second_session_in_same_context_is_occupied():
+    policy = fport.create_session_policy(route_by_context = True)
+    port = policy.create_port()
+    listener = lambda tag, *a, **kw: None
+    with policy.session(listener, port):
+        with pytest.raises(OccupiedError):
+            with policy.session(listener, port):
+                pass
+    # Released after the first session ends, even on exceptions.
+    with pytest.raises(RuntimeError):
+        with policy.session(listener, port):
+            raise RuntimeError("boom")
+    with policy.session(listener, port):
+        pass
+
+
+def test_routed_session_latches_listener_error():
+    policy = fport.create_session_policy(route_by_context = True)
+    port = policy.create_port()
+    calls = []
+
+    def listener(tag, *args, **kwargs):
+        calls.append(tag)
+        raise ValueError("listener failed")
+
+    with policy.session(listener, port) as state:
+        port.send("a")
+        port.send("b")
+        assert not state.ok
+        assert isinstance(state.error, ValueError)
+        with port.span("s") as span:
+            pass
+        assert span.span_id == -1
+    assert calls == ["a"]
+
+
+def test_routed_policy_still_denies_blocked_ports():
+    policy = fport.create_session_policy(route_by_context = True)
+    with pytest.raises(DeniedError):
+        with policy.session(lambda tag, *a, **kw: None, policy.create_noop_port()):
+            pass
+    with pytest.raises(ValueError):
+        fport.create_session_policy(route_by_context = True, collect_stats = True)
@@ -0,0 +1,130 @@
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import fport
+from fport.exceptions import DeniedError
+from fport.listeners import SpanAggregator
+from fport.process import ProcessRelay, RemotePort
+from fport.span import is_span_message
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason = "requires fork start method")
+
+
+def _work(port, n):
+    for i in range(n):
+        port.send("work", n, i)
+    return n
+
+
+def _work_in_spans(port):
+    with port.span("outer") as outer:
+        with port.span("inner") as inner:
+            port.send("work", outer.span_id, inner.span_id)
+    port.flush()
+
+
+def _child_session(port_role, policy_role):
+    # The lock was held by the parent while forking.
+    with policy_role.core.session(lambda tag, *a, **kw: None, port_role.interface):
+        port_role.interface.send("x")
+
+
+def test_remote_port_is_picklable_and_denies_sessions():
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    with ProcessRelay(port) as relay:
+        handle = pickle.loads(pickle.dumps(relay.handle()))
+        assert isinstance(handle, RemotePort)
+        assert isinstance(handle, fport.Port)
+        with pytest.raises(DeniedError):
+            policy.session(lambda tag, *a, **kw: None, handle).__enter__()
+
+
+def test_relay_delivers_from_process_pool():
+    """Messages sent in pool workers must reach the parent session in per-worker order."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    received = []
+    def listener(tag, *args, **kwargs):
+        received.append((tag, args))
+
+    ctx = multiprocessing.get_context("fork")
+    with policy.session(listener, port) as state:
+        with ProcessRelay(port, batch_size = 8) as relay:
+            handle = relay.handle()
+            with ProcessPoolExecutor(max_workers = 3, mp_context = ctx) as pool:
+                assert list(pool.map(_work, [handle] * 4, [5, 10, 20, 3])) == [5, 10, 20, 3]
+        assert state.ok
+
+    assert relay.received == 38
+    assert len(received) == 38
+    for n in (5, 10, 20, 3):
+        assert [i for tag, (m, i) in received if m == n] == list(range(n))
+
+
+def test_relay_delivers_from_forked_process():
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    received = []
+
+    ctx = multiprocessing.get_context("fork")
+    with policy.session(lambda tag, *a, **kw: received.append(a), port):
+        with ProcessRelay(port, batch_size = 1000, max_delay = 60) as relay:
+            process = ctx.Process(target = _work, args = (relay.handle(), 7))
+            process.start()
+            process.join(10)
+            assert process.exitcode == 0
+    assert [i for _, i in received] == list(range(7))
+
+
+def test_relay_delivers_spans_from_forked_processes():
+    """Spans in workers must reach the parent with ids that do not collide across workers."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    received = []
+    aggregator = SpanAggregator(lambda tag, *a, **kw: received.append(a))
+    spans = []
+    def listener(tag, *args, **kwargs):
+        if is_span_message(args):
+            spans.append((tag,) + args[:3])
+        aggregator.listen(tag, *args, **kwargs)
+
+    ctx = multiprocessing.get_context("fork")
+    with policy.session(listener, port):
+        with ProcessRelay(port, batch_size = 1000, max_delay = 60) as relay:
+            processes = [ctx.Process(target = _work_in_spans, args = (relay.handle(),)) for _ in range(2)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join(10)
+                assert process.exitcode == 0
+
+    assert len(received) == 2 and all(outer >= 0 and inner >= 0 for outer, inner in received)
+    assert len(spans) == 8
+    assert len({span_id for _, _, span_id, _ in spans}) == 4
+    for tag, phase, span_id, parent_id in spans:
+        if tag == "inner":
+            assert (span_id >> 32) == (parent_id >> 32) and parent_id != -1
+    assert aggregator.get_stat("outer").count == 2
+    assert aggregator.get_stat("inner").count == 2
+    assert aggregator.open_spans == 0
+
+
+def test_locks_are_reinitialized_in_forked_child():
+    """A lock held by the parent at fork time must not deadlock the child."""
+    policy_role = fport.policy._create_session_policy_role()
+    port_role = policy_role.kernel.create_port(policy_role.port_bridge)
+
+    ctx = multiprocessing.get_context("fork")
+    with port_role.state.lock, policy_role.state.local_lock:
+        process = ctx.Process(target = _child_session, args = (port_role, policy_role))
+        process.start()
+    process.join(10)
+    if process.exitcode is None:
+        process.kill()
+    assert process.exitcode == 0
@@ -0,0 +1,66 @@
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import fport
+from fport.process import SharedTagCounter
+
+pytestmark = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason = "requires fork start method")
+
+
+_policy = fport.create_session_policy()
+_port = _policy.create_port()
+
+
+def _count_in_worker(counter, n):
+    with _policy.session(counter.listen, _port):
+        for i in range(n):
+            _port.send("even" if i % 2 == 0 else "odd", i)
+        _port.send("unknown")
+    return n
+
+
+def test_counter_counts_in_single_process():
+    with SharedTagCounter(["a", "b"]) as counter:
+        counter.listen("a")
+        counter.listen("a", 1, k=2)
+        counter.listen("c")
+        assert counter.counts() == {"a": 2, "b": 0}
+        assert counter.count("a") == 2
+        assert counter.other == 1
+
+
+def test_counter_sums_across_pool_workers():
+    """Counts from pool workers must be summed in the parent."""
+    ctx = multiprocessing.get_context("fork")
+    with SharedTagCounter(["even", "odd"]) as counter:
+        with ProcessPoolExecutor(max_workers = 4, mp_context = ctx) as pool:
+            sizes = [10, 20, 31, 7, 100, 1]
+            assert list(pool.map(_count_in_worker, [counter] * len(sizes), sizes)) == sizes
+        assert counter.count("even") == sum((n + 1) // 2 for n in sizes)
+        assert counter.count("odd") == sum(n // 2 for n in sizes)
+        assert counter.other == len(sizes)
+
+
+def test_counter_in_forked_processes_uses_separate_rows():
+    ctx = multiprocessing.get_context("fork")
+    with SharedTagCounter(["even", "odd"], max_processes = 8) as counter:
+        counter.listen("even")
+        processes = [ctx.Process(target = _count_in_worker, args = (counter, 10)) for _ in range(3)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join(10)
+            assert p.exitcode == 0
+        assert counter.counts() == {"even": 16, "odd": 15}
+
+
+def test_counter_pickles_to_an_attached_view():
+    with SharedTagCounter(["x"]) as counter:
+        clone = pickle.loads(pickle.dumps(counter))
+        clone.listen("x")
+        assert counter.count("x") == 1
+        assert pickle.loads(pickle.dumps(counter)) is clone
@@ -95,3 +95,49 @@ def test_session_state_reflects_listener_exception():
         assert not session_state.ok
         assert isinstance(session_state.error, CustomError)
 
+
+
+def test_failure_callback_fires_once_with_first_error():
+    """Callbacks registered before failure run once with the first error."""
+    s = Session()
+    state = s.get_state_reader()
+    received = []
+    state.add_failure_callback(received.append)
+    state.add_failure_callback(lambda e: (_ for _ in ()).throw(RuntimeError("ignored")))
+
+    assert not state.wait_failure(0)
+    err1 = RuntimeError("first")
+    s.set_error(err1)
+    s.set_error(ValueError("second"))
+
+    assert received == [err1]
+    assert state.wait_failure(0)
+
+    # Registering after failure calls immediately
+    late = []
+    state.add_failure_callback(late.append)
+    assert late == [err1]
+
+
+def test_failure_is_pushed_from_port_send():
+    """A listener failure inside Port.send must wake waiters and run callbacks."""
+    import threading
+    policy = fport.policy.create_session_policy()
+    port = policy.create_port()
+
+    def bad_listener(tag, *args, **kwargs):
+        raise KeyError(tag)
+
+    with policy.session(bad_listener, port) as state:
+        woke = []
+        waiter = threading.Thread(target = lambda: woke.append(state.wait_failure(5)))
+        waiter.start()
+        stop = threading.Event()
+        state.add_failure_callback(lambda e: stop.set())
+
+        port.send("boom")
+        waiter.join(5)
+
+        assert stop.is_set()
+        assert woke == [True]
+        assert isinstance(state.error, KeyError)
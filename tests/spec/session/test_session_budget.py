@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+import fport
+from fport import EndReason
+
+
+def test_message_budget_detaches_port():
+    """After max_messages deliveries the port must stop delivering."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    role_received = []
+
+    with policy.session(lambda tag, *a, **kw: role_received.append(a[0]), port, max_messages = 3) as state:
+        for i in range(10):
+            port.send("x", i)
+        assert role_received == [0, 1, 2]
+        assert state.end_reason is EndReason.MESSAGE_BUDGET
+        assert state.ok
+        assert state.error is None
+        with port.span("s") as span:
+            pass
+        assert span.span_id == -1
+    assert state.end_reason is EndReason.MESSAGE_BUDGET
+
+    # The port can be used by a new session afterwards
+    with policy.session(lambda tag, *a, **kw: role_received.append(a[0]), port) as state:
+        port.send("x", 99)
+        assert state.end_reason is None
+    assert role_received[-1] == 99
+    assert state.end_reason is EndReason.CLOSED
+
+
+def test_tag_coverage_goal_ends_session():
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    seen = []
+    with policy.session(lambda tag, *a, **kw: seen.append(tag), port, until_tags = ["a", "b"]) as state:
+        for tag in ["a", "a", "b", "c", "a"]:
+            port.send(tag)
+        assert state.end_reason is EndReason.TAG_COVERAGE
+    assert seen == ["a", "a", "b"]
+
+
+def test_time_budget_ends_session():
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    seen = []
+    with policy.session(lambda tag, *a, **kw: seen.append(tag), port, max_seconds = 0.05) as state:
+        port.send("early")
+        time.sleep(0.1)
+        assert state.end_reason is EndReason.TIME_BUDGET
+        port.send("late")
+    assert seen == ["early"]
+
+
+def test_error_is_reported_as_end_reason():
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    def bad(tag, *args, **kwargs):
+        raise RuntimeError("x")
+
+    with policy.session(bad, port, max_messages = 5) as state:
+        port.send("a")
+        assert state.end_reason is EndReason.ERROR
+        assert not state.ok
+
+
+def test_budget_in_routed_sessions():
+    policy = fport.create_session_policy(route_by_context = True)
+    port = policy.create_port()
+    seen = []
+    with policy.session(lambda tag, *a, **kw: seen.append(tag), port, max_messages = 1) as state:
+        port.send("a")
+        port.send("b")
+        assert state.end_reason is EndReason.MESSAGE_BUDGET
+    assert seen == ["a"]
+
+
+def test_invalid_budgets_are_rejected():
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    listener = lambda tag, *a, **kw: None
+    with pytest.raises(ValueError):
+        policy.session(listener, port, max_messages = 0)
+    with pytest.raises(ValueError):
+        policy.session(listener, port, until_tags = [])
+
+
+def test_new_session_in_open_budget_context_is_occupied():
+    """A port detached by its budget stays occupied until the context exits."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    with policy.session(lambda tag, *a, **kw: None, port, max_messages = 1) as state:
+        port.send("x")
+        assert state.end_reason is EndReason.MESSAGE_BUDGET
+        with pytest.raises(fport.OccupiedError):
+            with policy.session(lambda tag, *a, **kw: None, port):
+                pass
+    with policy.session(lambda tag, *a, **kw: None, port) as state:
+        port.send("x")
+    assert state.end_reason is EndReason.CLOSED
@@ -0,0 +1,78 @@
+import fport
+from fport.stats import PortStats
+
+
+def test_stats_is_none_when_disabled():
+    """Policies without collect_stats must not expose statistics."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+    with policy.session(lambda tag, *a, **kw: None, port) as state:
+        port.send("x")
+        assert state.stats is None
+
+
+def test_stats_counts_delivery_and_listener_time():
+    """Sends, deliveries and per-tag listener time must be counted."""
+    policy = fport.create_session_policy(collect_stats = True)
+    port = policy.create_port()
+
+    port.send("before")  # detached, not counted
+
+    with policy.session(lambda tag, *a, **kw: None, port) as state:
+        for i in range(5):
+            port.send("a", i)
+        port.send("b")
+        stats = state.stats
+        assert isinstance(stats, PortStats)
+        assert stats.sends == 6
+        assert stats.delivered == 6
+        assert stats.filtered == 0
+        assert stats.failed == 0
+        assert stats.get_timing("a").calls == 5
+        assert stats.get_timing("b").calls == 1
+        assert stats.get_timing("a").max_ns <= stats.get_timing("a").total_ns
+        assert set(stats.get_timings()) == {"a", "b"}
+        assert stats.listener_ns >= 0
+
+
+def test_stats_counts_failed_and_filtered():
+    """A failing listener counts once as failed, later sends as filtered."""
+    def validator(tag, *args, **kwargs):
+        if tag == "bad":
+            raise ValueError("rejected")
+
+    policy = fport.create_session_policy(collect_stats = True, message_validator = validator)
+    port = policy.create_port()
+
+    def listener(tag, *args, **kwargs):
+        if tag == "boom":
+            raise RuntimeError("listener failed")
+
+    with policy.session(listener, port) as state:
+        port.send("boom")
+        port.send("ok")
+        assert not state.ok
+        stats = state.stats
+        assert stats.sends == 2
+        assert stats.failed == 1
+        assert stats.filtered == 1
+        assert stats.delivered == 0
+
+    with policy.session(listener, port) as state:
+        port.send("bad")
+        assert isinstance(state.error, ValueError)
+        assert state.stats.filtered == 1
+        assert state.stats.sends == 1
+
+
+def test_stats_are_per_session():
+    """Each session must start from fresh counters."""
+    policy = fport.create_session_policy(collect_stats = True)
+    port = policy.create_port()
+    with policy.session(lambda tag, *a, **kw: None, port) as first:
+        port.send("x")
+    with policy.session(lambda tag, *a, **kw: None, port) as second:
+        port.send("x")
+        port.send("x")
+    assert first.stats.sends == 1
+    assert second.stats.sends == 2
@@ -0,0 +1,89 @@
+import pytest
+
+import fport
+from fport.span import SpanPhase, NO_PARENT
+from fport.listeners import SpanAggregator
+
+
+def test_span_sends_nothing_when_detached():
+    """A span on a detached port must not send or fail."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    with port.span("work") as span:
+        pass
+    assert span.span_id == NO_PARENT
+
+
+def test_span_sends_begin_and_end_with_nesting():
+    """Nested spans must report begin/end pairs and the parent span id."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    received = []
+    def listener(tag, *args, **kwargs):
+        received.append((tag, args))
+
+    with policy.session(listener, port) as state:
+        with port.span("outer") as outer:
+            with port.span("inner") as inner:
+                pass
+        assert state.ok
+
+    assert [(tag, args[0]) for tag, args in received] == [
+        ("outer", SpanPhase.BEGIN),
+        ("inner", SpanPhase.BEGIN),
+        ("inner", SpanPhase.END),
+        ("outer", SpanPhase.END),
+    ]
+    _, (_, outer_id, outer_parent, t0) = received[0]
+    _, (_, inner_id, inner_parent, _) = received[1]
+    _, (_, _, _, t3) = received[3]
+    assert outer_id == outer.span_id
+    assert inner_id == inner.span_id
+    assert outer_parent == NO_PARENT
+    assert inner_parent == outer_id
+    assert t3 >= t0
+
+
+def test_span_decorator_and_exception_passthrough():
+    """The decorator must report each call and never swallow exceptions."""
+    policy = fport.create_session_policy()
+    port = policy.create_port()
+
+    @port.span("job")
+    def job(x):
+        if x < 0:
+            raise ValueError("negative")
+        return x * 2
+
+    aggregator = SpanAggregator()
+    with policy.session(aggregator.listen, port) as state:
+        assert job(2) == 4
+        with pytest.raises(ValueError):
+            job(-1)
+        assert state.ok
+
+    stat = aggregator.get_stat("job")
+    assert stat.count == 2
+    assert stat.min_ns <= stat.max_ns
+    assert stat.total_ns >= stat.max_ns
+    assert aggregator.open_spans == 0
+
+
+def test_span_on_noop_port_is_silent():
+    """Spans on a no-op port must behave as a plain context manager."""
+    policy = fport.create_session_policy()
+    port = policy.create_noop_port()
+    with port.span("x") as span:
+        pass
+    assert span.span_id == NO_PARENT
+
+
+def test_aggregator_forwards_plain_messages():
+    """Non-span messages must be forwarded to the downstream listener."""
+    forwarded = []
+    aggregator = SpanAggregator(lambda tag, *a, **kw: forwarded.append((tag, a, kw)))
+    aggregator.listen("plain", 1, k=2)
+    assert forwarded == [("plain", (1,), {"k": 2})]
+    assert aggregator.get_all() == {}